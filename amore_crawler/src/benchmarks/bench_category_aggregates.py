@@ -0,0 +1,147 @@
+"""
+build_features.build_category_aggregates 벤치마크 (합성 category_map).
+
+- 이전 구현(groupby.apply 3회 + Python lambda + row별 json/tuple 분해)과 현재 벡터화 구현의 결과 비교
+- 이전 구현은 --legacy-sample 상품만 돌려 전체 시간을 추정
+
+이전 구현은 groupby(as_index=False).apply가 list를 반환하면 pandas에서 에러가 나고,
+"string" dtype 결측(<NA>)이 None 검사에 걸리지 않아 "<NA>"가 섞이므로
+비교 기준은 그 두 곳만 의도대로(as_index=True, 결측 제외) 고친 버전이다.
+
+python -m src.benchmarks.bench_category_aggregates --rows 3000000
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.pipelines.build_features import _to_json_list, build_category_aggregates
+
+DEPTH1 = ["스킨케어", "메이크업", "바디케어", "헤어케어", "향수", "남성"]
+DEPTH2 = ["클렌징", "토너", "에센스", "크림", "선케어", "립", "베이스", "샴푸", "로션", "세트"]
+DEPTH3 = ["클렌징 폼", "오일", "미스트", "패드", "앰플", "아이크림", "쿠션", "틴트", None, ""]
+
+def make_category_map(rows: int, seed: int = 0) -> pd.DataFrame:
+    """상품당 평균 3행, 같은 path 중복/결측 depth/공백 포함"""
+    rng = np.random.default_rng(seed)
+    n_prod = max(1, rows // 3)
+    prod_sn = rng.integers(100_000, 100_000 + n_prod, size=rows)
+    d1 = np.asarray(DEPTH1, dtype=object)[rng.integers(0, len(DEPTH1), size=rows)]
+    d2 = np.asarray(DEPTH2, dtype=object)[rng.integers(0, len(DEPTH2), size=rows)]
+    d3 = np.asarray(DEPTH3, dtype=object)[rng.integers(0, len(DEPTH3), size=rows)]
+    d2 = np.where(rng.random(rows) < 0.03, " " + d2.astype(str) + " ", d2)
+    path = pd.Series(d1).str.cat([pd.Series(d2).str.strip(), pd.Series(d3).fillna("")], sep=">").str.rstrip(">")
+    path = path.where(rng.random(rows) > 0.02, None)
+    day = rng.integers(1, 28, size=rows)
+    return pd.DataFrame({
+        "prod_sn": prod_sn,
+        "category_path": path.to_numpy(dtype=object),
+        "category_depth1": d1,
+        "category_depth2": d2,
+        "category_depth3": d3,
+        "collected_at": [f"2026-01-{d:02d} 00:00:00" for d in day],
+    })
+
+# ============================================================
+# 이전 구현 (비교 기준)
+# ============================================================
+def _unique_preserve_order(seq):
+    out = []
+    for x in seq:
+        if x is None or x is pd.NA:
+            continue
+        x = str(x).strip()
+        if not x:
+            continue
+        if x not in out:
+            out.append(x)
+    return out
+
+def legacy_category_aggregates(category_map: pd.DataFrame) -> pd.DataFrame:
+    cm = category_map.copy()
+    cm = cm.dropna(subset=["prod_sn"])
+    cm["prod_sn"] = cm["prod_sn"].astype(int)
+    for c in ["category_path", "category_depth1", "category_depth2", "category_depth3"]:
+        cm[c] = cm[c].astype("string")
+    if "collected_at" in cm.columns:
+        cm["collected_at"] = cm["collected_at"].astype("string")
+        cm = cm.sort_values(["prod_sn", "collected_at", "category_path"], na_position="last")
+    else:
+        cm = cm.sort_values(["prod_sn", "category_path"])
+
+    def agg_paths(g):
+        return _unique_preserve_order(g["category_path"].tolist())
+
+    def agg_names(g):
+        vals = []
+        vals += g["category_depth1"].tolist()
+        vals += g["category_depth2"].tolist()
+        vals += g["category_depth3"].tolist()
+        return _unique_preserve_order(vals)
+
+    def primary_depths(g):
+        first = g.iloc[0]
+        d1 = str(first["category_depth1"]).strip() if pd.notna(first["category_depth1"]) else None
+        d2 = str(first["category_depth2"]).strip() if pd.notna(first["category_depth2"]) else None
+        d3 = str(first["category_depth3"]).strip() if pd.notna(first["category_depth3"]) else None
+        return d1 or None, d2 or None, d3 or None
+
+    grouped = cm.groupby("prod_sn")
+    paths_series = grouped.apply(lambda g: agg_paths(g), include_groups=False)
+    names_series = grouped.apply(lambda g: agg_names(g), include_groups=False)
+    prim_series = grouped.apply(lambda g: primary_depths(g), include_groups=False)
+
+    agg_df = pd.DataFrame({
+        "prod_sn": paths_series.index.astype(int),
+        "category_paths_all": paths_series.values,
+        "category_names_all": names_series.values,
+        "primary_depths": prim_series.values,
+    })
+    agg_df["category_paths_all_json"] = agg_df["category_paths_all"].apply(_to_json_list)
+    agg_df["category_names_all_json"] = agg_df["category_names_all"].apply(_to_json_list)
+    agg_df["category_depth1_primary"] = agg_df["primary_depths"].apply(lambda t: t[0] if t else None)
+    agg_df["category_depth2_primary"] = agg_df["primary_depths"].apply(lambda t: t[1] if t else None)
+    agg_df["category_depth3_primary"] = agg_df["primary_depths"].apply(lambda t: t[2] if t else None)
+    return agg_df.drop(columns=["category_paths_all", "category_names_all", "primary_depths"])
+
+# ============================================================
+# 비교
+# ============================================================
+def _values(df: pd.DataFrame) -> dict[str, list]:
+    df = df.reset_index(drop=True)
+    return {c: [None if pd.isna(v) else v for v in df[c].tolist()] for c in df.columns}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=3_000_000, help="category_map 행 수")
+    parser.add_argument("--legacy-sample", type=int, default=20_000, help="이전 구현을 돌릴 상품 수 (전체 시간은 비례 추정)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    cm = make_category_map(args.rows, args.seed)
+    n_prod = cm["prod_sn"].nunique()
+    print(f"category_map rows={len(cm)} products={n_prod}")
+
+    t0 = time.perf_counter()
+    new = build_category_aggregates(cm)
+    t_new = time.perf_counter() - t0
+    print(f"vectorized: {t_new:.2f}s")
+
+    sample_sns = np.sort(cm["prod_sn"].unique())[:args.legacy_sample]
+    sample = cm[cm["prod_sn"].isin(sample_sns)]
+    t0 = time.perf_counter()
+    legacy = legacy_category_aggregates(sample)
+    t_old = time.perf_counter() - t0
+    est = t_old / max(len(sample_sns), 1) * n_prod
+    print(f"legacy:     {t_old:.2f}s for {len(sample_sns)} products (~{est:.0f}s estimated for {n_prod})")
+
+    a = _values(new[new["prod_sn"].isin(sample_sns)])
+    b = _values(legacy)
+    ok = list(a) == list(b) and all(a[c] == b[c] for c in a)
+    print(f"identical (first {len(sample_sns)} products): {ok}")
+    if not ok:
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""
+derive_product_concerns / derive_product_concern_final 벤치마크 (합성 데이터).
+
+- 이전 구현(상품별 iterrows + 전체 프레임 boolean filter, groupby lambda)과 현재 벡터화 구현의 결과가 같은지 확인
+- 현재 구현은 --n 전체, 이전 구현은 --legacy-sample 상품만 돌려 전체 시간을 추정
+  (이전 구현은 상품 1개마다 전체 프레임을 스캔하므로 상품 수 × 행 수에 비례)
+
+python -m src.benchmarks.bench_derive_concerns --n 1000000
+python -m src.benchmarks.bench_derive_concerns --n 2000 --legacy-sample 2000   # 전체 parity
+"""
+import argparse
+import io
+import time
+
+import numpy as np
+import pandas as pd
+
+from src.collectors.derive_product_concern_final import TOPK_PRED, build_concern_final
+from src.collectors.derive_product_concerns import build_product_concerns
+
+CONCERN_TYPES = [f"C{i:02d}" for i in range(12)]
+
+def make_inputs(n: int, seed: int = 0) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    """detail(prod_sn), concern_map(prod_sn, concern_type, concern_name), pred_map(prod_sn, concern_type, concern_name, rank)"""
+    rng = np.random.default_rng(seed)
+    prod_sns = rng.permutation(np.arange(100_000, 100_000 + n, dtype=np.int64))
+    detail = pd.DataFrame({"prod_sn": prod_sns})
+
+    # 공식 매핑: 40% 상품에 1~4개 (중복 행/같은 이름 다른 type 포함)
+    has = prod_sns[rng.random(n) < 0.4]
+    cnt = rng.integers(1, 5, size=len(has))
+    m_sn = np.repeat(has, cnt)
+    m_ct = rng.choice(CONCERN_TYPES, size=len(m_sn))
+    cmap = pd.DataFrame({
+        "prod_sn": m_sn,
+        "concern_type": m_ct,
+        "concern_name": pd.Series(m_ct).str.replace("C", "고민", regex=False).to_numpy(),
+    })
+    dup = cmap.sample(frac=0.05, random_state=seed)
+    cmap = pd.concat([cmap, dup], ignore_index=True).sample(frac=1.0, random_state=seed).reset_index(drop=True)
+
+    # 추정 매핑: 70% 상품에 1~5개 (derive_product_concern_pred_map처럼 상품 안에서 rank 유일)
+    has = prod_sns[rng.random(n) < 0.7]
+    cnt = rng.integers(1, 6, size=len(has))
+    p_sn = np.repeat(has, cnt)
+    p_ct = rng.choice(CONCERN_TYPES, size=len(p_sn))
+    rank = np.concatenate([np.arange(1, c + 1) for c in cnt]) if len(cnt) else np.array([], dtype=int)
+    pred = pd.DataFrame({
+        "prod_sn": p_sn,
+        "concern_type": p_ct,
+        "concern_name": pd.Series(p_ct).str.replace("C", "추정", regex=False).to_numpy(),
+        "rank": rank,
+    }).sample(frac=1.0, random_state=seed + 1).reset_index(drop=True)
+    return detail, cmap, pred
+
+# ============================================================
+# 이전 구현 (비교 기준)
+# ============================================================
+def legacy_product_concerns(m: pd.DataFrame, all_prod: pd.DataFrame) -> pd.DataFrame:
+    agg = (
+        m.sort_values(["prod_sn", "concern_type"])
+         .groupby("prod_sn", as_index=False)
+         .agg(
+            concern_types=("concern_type", lambda x: list(dict.fromkeys(x.tolist()))),
+            concerns=("concern_name", lambda x: list(dict.fromkeys(x.tolist()))),
+         )
+    )
+    out_df = all_prod.merge(agg, on="prod_sn", how="left")
+    out_df["concern_types"] = out_df["concern_types"].apply(lambda x: x if isinstance(x, list) else [])
+    out_df["concerns"] = out_df["concerns"].apply(lambda x: x if isinstance(x, list) else [])
+    return out_df
+
+def legacy_concern_final(detail: pd.DataFrame, official: pd.DataFrame, pred: pd.DataFrame, created_at: str) -> pd.DataFrame:
+    rows = []
+    for _, r in detail.iterrows():
+        prod_sn = int(r["prod_sn"])
+        off = official[official["prod_sn"] == prod_sn]
+        if not off.empty and len(off.iloc[0]["concerns"]) > 0:
+            rows.append({
+                "prod_sn": prod_sn, "source": "official",
+                "concerns": off.iloc[0]["concerns"], "concern_types": off.iloc[0]["concern_types"],
+                "created_at": created_at,
+            })
+            continue
+        p = pred[pred["prod_sn"] == prod_sn].sort_values("rank").head(TOPK_PRED)
+        if not p.empty:
+            rows.append({
+                "prod_sn": prod_sn, "source": "predicted",
+                "concerns": p["concern_name"].tolist(), "concern_types": p["concern_type"].tolist(),
+                "created_at": created_at,
+            })
+        else:
+            rows.append({
+                "prod_sn": prod_sn, "source": "none", "concerns": [], "concern_types": [], "created_at": created_at,
+            })
+    return pd.DataFrame(rows)
+
+# ============================================================
+# 비교
+# ============================================================
+def _as_lists(df: pd.DataFrame) -> pd.DataFrame:
+    df = df.reset_index(drop=True).copy()
+    for c in ("concerns", "concern_types"):
+        df[c] = df[c].map(list)
+    return df
+
+def same(a: pd.DataFrame, b: pd.DataFrame) -> bool:
+    a, b = _as_lists(a), _as_lists(b)
+    if list(a.columns) != list(b.columns) or len(a) != len(b):
+        return False
+    return all(a[c].tolist() == b[c].tolist() for c in a.columns)
+
+def parquet_roundtrip(df: pd.DataFrame) -> pd.DataFrame:
+    # 실제 파이프라인처럼 product_concerns를 parquet에서 읽은 형태(list → ndarray)로
+    buf = io.BytesIO()
+    df.to_parquet(buf, index=False)
+    buf.seek(0)
+    return pd.read_parquet(buf)
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    out = fn(*args)
+    return out, time.perf_counter() - t0
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=1_000_000, help="상품 수")
+    parser.add_argument("--legacy-sample", type=int, default=200, help="이전 구현을 돌릴 상품 수 (전체 시간은 비례 추정)")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    detail, cmap, pred = make_inputs(args.n, args.seed)
+    created_at = "2026-01-01 00:00:00"
+    print(f"products={len(detail)} concern_map_rows={len(cmap)} pred_rows={len(pred)}")
+
+    concerns, t_pc = timed(build_product_concerns, cmap, detail)
+    official = parquet_roundtrip(concerns)
+    final, t_pf = timed(build_concern_final, detail, official, pred, created_at)
+    print(f"vectorized: product_concerns={t_pc:.2f}s concern_final={t_pf:.2f}s")
+
+    # 이전 구현: product_concerns는 전체, concern_final은 sample만 (나머지는 추정)
+    legacy_concerns, t_lc = timed(legacy_product_concerns, cmap, detail)
+    k = min(args.legacy_sample, len(detail))
+    sample = detail.head(k)
+    legacy_final, t_lf = timed(legacy_concern_final, sample, parquet_roundtrip(legacy_concerns), pred, created_at)
+    est = t_lf / max(k, 1) * len(detail)
+    print(f"legacy:     product_concerns={t_lc:.2f}s concern_final={t_lf:.2f}s for {k} products "
+          f"(~{est:.0f}s = {est / 3600:.1f}h estimated for {len(detail)})")
+
+    ok_pc = same(concerns, legacy_concerns)
+    ok_pf = same(final.head(k), legacy_final)
+    print(f"identical: product_concerns={ok_pc} concern_final(first {k})={ok_pf}")
+    if not (ok_pc and ok_pf):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Selenium 프로필(full vs scrape) 비교 벤치마크.
+
+- 상품당 page load 시간(driver.get) / 로드된 페이지에서 상세이미지 추출 시간 (페이지는 한 번만 로드)
+- 두 프로필이 뽑은 상세설명 이미지 URL 집합이 같은지 확인
+
+python -m src.benchmarks.bench_driver_profile --n 20
+"""
+import argparse
+import statistics
+import time
+
+from src.collectors.collect_product_desc_images_html import extract_desc_images_v1_base
+from src.common.logger import get_logger
+from src.common.selenium_driver import PROFILES, create_driver
+from src.common.storage import load_latest_table
+
+log = get_logger("bench_driver_profile")
+
+def run_profile(profile: str, tasks: list[tuple]) -> dict:
+    driver = create_driver(profile=profile)
+    load_s, extract_s, urls = [], [], {}
+    try:
+        # 워밍업 (프로세스 기동/캐시 영향 제거)
+        driver.get(tasks[0][1])
+
+        for prod_sn, url, code in tasks:
+            t0 = time.perf_counter()
+            driver.get(url)
+            load_s.append(time.perf_counter() - t0)
+
+            t0 = time.perf_counter()
+            got = extract_desc_images_v1_base(driver, url, prod_sn, code, navigate=False)
+            extract_s.append(time.perf_counter() - t0)
+            urls[prod_sn] = set(got)
+    finally:
+        driver.quit()
+
+    return {"load_s": load_s, "extract_s": extract_s, "urls": urls}
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=20, help="비교할 상품 수 (detail_urls_all 앞에서부터)")
+    args = parser.parse_args()
+
+    detail_df = load_latest_table("./data/raw/detail_urls", "detail_urls_all").head(args.n)
+    tasks = [
+        (int(r["prod_sn"]), r["detail_url"], r.get("online_prod_code"))
+        for r in detail_df.to_dict("records")
+    ]
+    if not tasks:
+        raise RuntimeError("detail_urls_all empty")
+
+    res = {p: run_profile(p, tasks) for p in PROFILES}
+
+    print(f"products={len(tasks)}")
+    print(f"{'profile':<8} {'load_avg_s':>10} {'load_p50_s':>10} {'extract_avg_s':>13} {'total_avg_s':>11}")
+    for p in PROFILES:
+        r = res[p]
+        print(
+            f"{p:<8} {statistics.mean(r['load_s']):>10.3f} {statistics.median(r['load_s']):>10.3f} "
+            f"{statistics.mean(r['extract_s']):>13.3f} {statistics.mean(r['load_s']) + statistics.mean(r['extract_s']):>11.3f}"
+        )
+
+    full, scrape = res["full"], res["scrape"]
+    saved_load = statistics.mean(full["load_s"]) - statistics.mean(scrape["load_s"])
+    saved_extract = statistics.mean(full["extract_s"]) - statistics.mean(scrape["extract_s"])
+    print(
+        f"saved per product: load={saved_load:.3f}s extract={saved_extract:.3f}s "
+        f"total={saved_load + saved_extract:.3f}s"
+    )
+
+    mismatch = [sn for sn in full["urls"] if full["urls"][sn] != scrape["urls"].get(sn)]
+    print(f"image url sets identical: {len(tasks) - len(mismatch)}/{len(tasks)}")
+    for sn in mismatch:
+        log.warning(
+            f"mismatch prod_sn={sn} full_only={sorted(full['urls'][sn] - scrape['urls'][sn])} "
+            f"scrape_only={sorted(scrape['urls'][sn] - full['urls'][sn])}"
+        )
+
+if __name__ == "__main__":
+    main()
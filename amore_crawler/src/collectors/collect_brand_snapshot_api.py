@@ -0,0 +1,174 @@
+"""
+by-brand 목록 API를 한 번만 페이징해서 raw 스냅샷을 저장하고,
+같은 스냅샷에서 products / category_map / detail_urls_all 세 테이블을 파생한다.
+
+(기존 collect_products_api / collect_category_map_api / collect_detail_urls_api를
+각각 돌리면 같은 엔드포인트를 3번 처음부터 페이징하게 됨)
+
+detail_urls_all은 collect_detail_urls_api와 같은 요청 파라미터(containsFilter/categorySns, run.limit/run.sort_type)로
+만들어야 URL 집합이 같으므로, 그 파라미터가 목록 스냅샷과 다르면 detail 쿼리만 따로 한 번 더 페이징해
+스냅샷에 query="detail"로 함께 저장한다 (같으면 목록 스냅샷을 그대로 공유).
+
+python -m src.collectors.collect_brand_snapshot_api
+python -m src.collectors.collect_brand_snapshot_api --from-snapshot   # 네트워크 없이 마지막 스냅샷에서 재파생
+"""
+import argparse
+import json
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+import yaml
+
+from src.collectors.collect_category_map_api import build_category_rows, finalize_category_map
+from src.collectors.collect_detail_urls_api import build_detail_url_rows, detail_query, finalize_detail_urls
+from src.collectors.collect_products_api import build_product_rows, finalize_products
+from src.common.amore_api import build_headers, build_params, request_page
+from src.common.http import HttpClient
+from src.common.journal import Journal
+from src.common.logger import get_logger
+from src.common.paging import RateLimiter, fetch_all_pages, paging_options
+from src.common.storage import load_latest_table, save_table
+
+log = get_logger("collect_brand_snapshot_api")
+
+SNAPSHOT_DIR = "./data/raw/brand_snapshot"
+SNAPSHOT_PREFIX = "brand_snapshot"
+
+# 스냅샷 query 컬럼 값: brand = products/category_map용 목록, detail = detail_urls_all용 필터 목록
+BRAND_QUERY = "brand"
+DETAIL_QUERY = "detail"
+
+def now_dt():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def _listing_query(cfg: dict) -> tuple[list[int], int, Optional[str]]:
+    brand_sns = cfg["brand_entry"]["brand_sns"]
+    brand_sns = [int(x) for x in brand_sns] if isinstance(brand_sns, list) else [int(brand_sns)]
+    limit = int(cfg.get("run", {}).get("api_limit", 40))
+    sort_type = cfg.get("run", {}).get("api_sort_type", None)
+    return brand_sns, limit, sort_type
+
+def detail_shares_listing(cfg: dict) -> bool:
+    """detail_urls_all 요청 파라미터가 목록 스냅샷과 완전히 같으면 True (추가 페이징 불필요)"""
+    brand_sns, limit, sort_type = _listing_query(cfg)
+    d_sn, d_limit, d_sort, d_extra = detail_query(cfg)
+    return len(brand_sns) == 1 and build_params(brand_sns[0], limit, 0, sort_type) == build_params(
+        d_sn, d_limit, 0, d_sort, d_extra
+    )
+
+def fetch_snapshot(cfg: dict, journal: Journal | None = None) -> dict[str, list[tuple[int, dict]]]:
+    """
+    query별 (page offset, raw item) 목록. 페이지 순서/페이지 내 순서를 그대로 유지.
+    brand_entry.brand_sns가 리스트면 브랜드별로 동시에 페이징(politeness 예산은 공유).
+    detail 파라미터가 목록과 다르면 detail 쿼리도 같은 예산으로 함께 페이징.
+    journal이 있으면 받은 페이지를 기록하고, 기록된 페이지는 다시 요청하지 않음.
+    """
+    brand_sns, limit, sort_type = _listing_query(cfg)
+    opts = paging_options(cfg)
+
+    headers = build_headers(cfg)
+    session = HttpClient()
+    limiter = RateLimiter(opts["requests_per_sec"], burst=opts["max_in_flight"])
+
+    def _paged(prefix: str, sn: int, lim: int, sort: Optional[str], extra: Optional[list] = None) -> list[tuple[int, dict]]:
+        return fetch_all_pages(
+            lambda off: request_page(session, headers, sn, lim, off, sort, extra),
+            limit=lim,
+            max_in_flight=opts["max_in_flight"],
+            limiter=limiter,
+            journal=journal,
+            journal_prefix=prefix,
+        )
+
+    jobs = [(BRAND_QUERY, (f"{sn}:", sn, limit, sort_type)) for sn in brand_sns]
+    if not detail_shares_listing(cfg):
+        d_sn, d_limit, d_sort, d_extra = detail_query(cfg)
+        jobs.append((DETAIL_QUERY, (f"{DETAIL_QUERY}:{d_sn}:", d_sn, d_limit, d_sort, d_extra)))
+
+    with ThreadPoolExecutor(max_workers=len(jobs)) as ex:
+        results = list(ex.map(lambda job: _paged(*job[1]), jobs))
+
+    out: dict[str, list[tuple[int, dict]]] = {}
+    for (query, _), paged in zip(jobs, results):
+        out.setdefault(query, []).extend(paged)
+    log.info(f"fetched brands={brand_sns} " + " ".join(f"{q}_items={len(v)}" for q, v in out.items()))
+    session.log_stats()
+    return out
+
+def snapshot_frame(paged: dict[str, list[tuple[int, dict]]], collected_at: str) -> pd.DataFrame:
+    rows = [(query, off, it) for query, items in paged.items() for off, it in items]
+    return pd.DataFrame({
+        "query": [q for q, _, _ in rows],
+        "prod_sn": [int(it["onlineProdSn"]) if it.get("onlineProdSn") else None for _, _, it in rows],
+        "page_offset": [off for _, off, _ in rows],
+        "item_json": [json.dumps(it, ensure_ascii=False) for _, _, it in rows],
+        "collected_at": collected_at,
+    })
+
+def items_from_snapshot(snap: pd.DataFrame, query: str = BRAND_QUERY) -> list[dict]:
+    """
+    query 행의 raw item 목록.
+    detail 행이 없으면(파라미터가 목록과 같아 공유했거나 query 컬럼 이전 스냅샷) 목록 행을 사용.
+    """
+    if "query" not in snap.columns:
+        return [json.loads(s) for s in snap["item_json"].tolist()]
+    rows = snap[snap["query"] == query]
+    if rows.empty and query == DETAIL_QUERY:
+        rows = snap[snap["query"] == BRAND_QUERY]
+    return [json.loads(s) for s in rows["item_json"].tolist()]
+
+def derive_tables(snap: pd.DataFrame, cfg: dict, collected_at: str) -> dict[str, pd.DataFrame]:
+    brand = cfg.get("brand", "innisfree")
+    items = items_from_snapshot(snap, BRAND_QUERY)
+    detail_items = items_from_snapshot(snap, DETAIL_QUERY)
+    return {
+        "products": finalize_products(build_product_rows(items, brand, collected_at), cfg),
+        "category_map": finalize_category_map(build_category_rows(items, brand, collected_at)),
+        "detail_urls_all": finalize_detail_urls(build_detail_url_rows(detail_items, brand, collected_at)),
+    }
+
+# 파생 테이블 -> (저장 경로, prefix)
+OUTPUTS = {
+    "products": ("./data/raw/products", "products"),
+    "category_map": ("./data/raw/category_map", "category_map"),
+    "detail_urls_all": ("./data/raw/detail_urls", "detail_urls_all"),
+}
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--from-snapshot", action="store_true", help="API 호출 없이 마지막 raw 스냅샷에서 재파생")
+    parser.add_argument("--resume", action="store_true", help="중단된 실행의 journal에서 이어서 페이징")
+    args = parser.parse_args(argv)
+
+    cfg = yaml.safe_load(open("./config/targets.yaml", "r", encoding="utf-8"))
+
+    journal = None
+    if args.from_snapshot:
+        snap = load_latest_table(SNAPSHOT_DIR, SNAPSHOT_PREFIX)
+        collected_at = str(snap["collected_at"].iloc[0]) if len(snap) else now_dt()
+    else:
+        collected_at = now_dt()
+        journal = Journal("brand_snapshot", resume=args.resume)
+        snap = snapshot_frame(fetch_snapshot(cfg, journal), collected_at)
+        if snap.empty:
+            raise RuntimeError("brand_snapshot empty. API 응답/파라미터 확인 필요")
+        out = save_table(snap, SNAPSHOT_DIR, SNAPSHOT_PREFIX)
+        log.info(f"saved: {out} rows={len(snap)}")
+
+    if args.from_snapshot and not detail_shares_listing(cfg) and (
+        "query" not in snap.columns or not (snap["query"] == DETAIL_QUERY).any()
+    ):
+        log.warning("snapshot has no detail query rows; detail_urls_all derived from the unfiltered listing")
+    tables = derive_tables(snap, cfg, collected_at)
+    for name, df in tables.items():
+        out_dir, prefix = OUTPUTS[name]
+        out = save_table(df, out_dir, prefix)
+        log.info(f"saved: {out} rows={len(df)}")
+
+    if journal is not None:
+        journal.finish()
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
+import argparse
 import re
-import time
 from datetime import datetime
 from typing import Dict, List, Optional
 
@@ -8,8 +8,10 @@ import yaml
 from selenium.webdriver.common.by import By
 
 from src.common.logger import get_logger
-from src.common.selenium_driver import create_driver
+from src.common.driver_pool import DriverPool
+from src.common.journal import Journal
 from src.common.storage import load_latest_table, save_table, dedupe
+from src.common.waits import WAIT_STATS, wait_for_settle
 from src.common.config import apply_sample
 
 log = get_logger("collect_product_concern_map")
@@ -44,25 +46,30 @@ def uniq_keep_order(xs: List[int]) -> List[int]:
 def scroll_to_end(driver, max_rounds: int = 60, sleep: float = 1.0):
     """
     무한 스크롤/추가 로딩을 고려해 페이지 끝까지 내림.
-    - scrollHeight가 3회 연속으로 변하지 않으면 종료.
+    - 매 라운드 DOM/이미지가 quiet 동안 조용하고 진행 중인 fetch·XHR이 없을 때까지 대기 (상한 2*sleep초)
+    - 높이가 그대로인데 안정 조건까지 만족하면 더 올 추가 로딩이 없으므로 바로 종료
+    - 안정되지 않은 채(timeout) 높이가 3회 연속 그대로면 종료
     """
     last_h = 0
     stable = 0
     for _ in range(max_rounds):
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(sleep)
+        # quiet은 스크롤 핸들러 debounce 뒤에 시작되는 추가 로딩 요청까지 잡을 만큼 둠
+        settled = wait_for_settle(driver, "list_scroll", quiet_ms=500, timeout_s=max(sleep, 0.3) * 2, network_idle=True)
         h = driver.execute_script("return document.body.scrollHeight;")
-        if h == last_h:
-            stable += 1
-        else:
+        if h != last_h:
             stable = 0
             last_h = h
+            continue
+        if settled:
+            break
+        stable += 1
         if stable >= 3:
             break
 
 def collect_prod_sns_from_list_page(driver, url: str) -> List[int]:
     driver.get(url)
-    time.sleep(1.3)
+    wait_for_settle(driver, "list_load", quiet_ms=400, timeout_s=5.0)
 
     scroll_to_end(driver)
 
@@ -77,63 +84,65 @@ def collect_prod_sns_from_list_page(driver, url: str) -> List[int]:
 
     return uniq_keep_order(prod_sns)
 
-def main():
-    cfg = load_yaml("./config/concerns_filter_urls.yaml")
-    brand = cfg.get("brand", "unknown")
-    concerns: Dict[str, Dict] = cfg["concerns"]
-
-    # QA 조인을 위해 기존 detail_urls_all 로드 (prod_sn 기준)
-    detail_df = load_latest_table("./data/raw/detail_urls", "detail_urls_all")
-    detail_df = apply_sample(detail_df, cfg)  # targets.yaml 샘플링과 동일한 컨벤션을 쓰고 있으면 유지
-
-    valid_prod_sns = set(detail_df["prod_sn"].astype(int).tolist())
-
-    driver = create_driver()
-
+def scrape_concern_lists(concerns: Dict[str, Dict], journal: Optional[Journal] = None) -> Dict[str, List[int]]:
+    """
+    concern 목록 페이지별로 병렬 스크롤 → {concern_type: prod_sns} (concerns 설정 순서 유지)
+    journal이 있으면 상품을 찾은 concern만 기록하고, 기록된 concern은 다시 스크롤하지 않음
+    (빈 결과는 일시적 로딩 실패일 수 있으므로 기록하지 않음 → --resume에서 다시 시도)
+    """
+    # 이전 버전이 남긴 빈 기록도 완료로 보지 않음
+    done = {k: v for k, v in (journal.done() if journal is not None else {}).items() if v}
+
+    def _scrape(driver, item) -> List[int]:
+        concern_type, meta = item
+        prod_sns = collect_prod_sns_from_list_page(driver, meta["url"])
+        if prod_sns and journal is not None:
+            journal.record(concern_type, prod_sns)
+        return prod_sns
+
+    items = [(k, v) for k, v in concerns.items() if k not in done]
+    scraped = DriverPool().map(_scrape, items)
+    WAIT_STATS.log_summary()
+
+    got = {concern_type: (prod_sns or []) for (concern_type, _), prod_sns in zip(items, scraped)}
+    return {k: (done[k] if k in done else got[k]) for k in concerns}
+
+def build_concern_rows(
+    concerns: Dict[str, Dict],
+    prod_sns_by_concern: Dict[str, List[int]],
+    valid_prod_sns: set,
+    brand: str,
+    collected_at: str,
+) -> List[dict]:
     rows = []
-    collected_at = now_dt()
-
-    try:
-        for concern_type, meta in concerns.items():
-            concern_name = meta["name"]
-            url = meta["url"]
-
-            prod_sns = collect_prod_sns_from_list_page(driver, url)
-            log.info(f"concern={concern_type} scraped={len(prod_sns)}")
-
-            # 우리 제품 목록(180개) 기준으로만 필터링
-            prod_sns_in_scope = [sn for sn in prod_sns if sn in valid_prod_sns]
-            log.info(f"concern={concern_type} in_scope={len(prod_sns_in_scope)}")
-
-            for sn in prod_sns_in_scope:
-                rows.append({
-                    "brand": brand,
-                    "prod_sn": int(sn),
-                    "concern_type": concern_type,
-                    "concern_name": concern_name,
-                    "source_url": url,
-                    "collected_at": collected_at,
-                })
-
-            time.sleep(0.2)
-
-    finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
-
+    for concern_type, meta in concerns.items():
+        concern_name = meta["name"]
+        url = meta["url"]
+        prod_sns = prod_sns_by_concern.get(concern_type) or []
+        log.info(f"concern={concern_type} scraped={len(prod_sns)}")
+
+        # 우리 제품 목록(180개) 기준으로만 필터링
+        prod_sns_in_scope = [sn for sn in prod_sns if sn in valid_prod_sns]
+        log.info(f"concern={concern_type} in_scope={len(prod_sns_in_scope)}")
+
+        for sn in prod_sns_in_scope:
+            rows.append({
+                "brand": brand,
+                "prod_sn": int(sn),
+                "concern_type": concern_type,
+                "concern_name": concern_name,
+                "source_url": url,
+                "collected_at": collected_at,
+            })
+    return rows
+
+def finalize_concern_map(rows: List[dict]) -> pd.DataFrame:
     df = pd.DataFrame(rows)
     if df.empty:
         raise RuntimeError("product_concern_map empty. 셀렉터/스크롤 로직 또는 목록 페이지 구조를 점검하세요.")
+    return dedupe(df, ["prod_sn", "concern_type"])
 
-    df = dedupe(df, ["prod_sn", "concern_type"])
-    out = save_table(df, "./data/raw/product_concern_map", "product_concern_map")
-    log.info(f"saved: {out} rows={len(df)}")
-
-    # --------------------
-    # QA 리포트 출력
-    # --------------------
+def log_concern_qa(df: pd.DataFrame, valid_prod_sns: set) -> None:
     mapped = df.groupby("prod_sn")["concern_type"].nunique()
     total = len(valid_prod_sns)
     mapped_products = mapped.index.nunique()
@@ -149,5 +158,35 @@ def main():
     if unmapped:
         log.info(f"QA: unmapped_sample={unmapped[:10]}")
 
+def load_valid_prod_sns(cfg: dict) -> set:
+    # QA 조인을 위해 기존 detail_urls_all 로드 (prod_sn 기준)
+    detail_df = load_latest_table("./data/raw/detail_urls", "detail_urls_all", columns=["prod_sn"])
+    detail_df = apply_sample(detail_df, cfg)  # targets.yaml 샘플링과 동일한 컨벤션을 쓰고 있으면 유지
+    return set(detail_df["prod_sn"].astype(int).tolist())
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--resume", action="store_true", help="중단된 실행의 journal에서 완료된 concern은 건너뜀")
+    args = parser.parse_args()
+
+    cfg = load_yaml("./config/concerns_filter_urls.yaml")
+    brand = cfg.get("brand", "unknown")
+    concerns: Dict[str, Dict] = cfg["concerns"]
+
+    valid_prod_sns = load_valid_prod_sns(cfg)
+    collected_at = now_dt()
+
+    journal = Journal("product_concern_map", resume=args.resume)
+    rows = build_concern_rows(concerns, scrape_concern_lists(concerns, journal), valid_prod_sns, brand, collected_at)
+    df = finalize_concern_map(rows)
+    out = save_table(df, "./data/raw/product_concern_map", "product_concern_map")
+    log.info(f"saved: {out} rows={len(df)}")
+    journal.finish()
+
+    # --------------------
+    # QA 리포트 출력
+    # --------------------
+    log_concern_qa(df, valid_prod_sns)
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,135 @@
+"""
+product_concern_map을 by-brand 목록 API(skinConcernTypes 필터)로 수집.
+
+Selenium 버전(collect_product_concern_map)은 concern별 목록 페이지를 끝까지 스크롤하지만,
+같은 필터가 API에도 반영되므로 concern별로 동시에 API 페이징만 하면 된다.
+필터가 무시된 응답(모든 상품이 모든 concern에 매핑)은 필터 없는 전체 목록과 비교해 저장 전에 실패 처리.
+출력 스키마/경로는 Selenium 버전과 동일.
+
+python -m src.collectors.collect_product_concern_map_api
+python -m src.collectors.collect_product_concern_map_api --verify   # Selenium 목록 페이지 결과와 비교
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import yaml
+
+from src.collectors.collect_product_concern_map import (
+    build_concern_rows,
+    finalize_concern_map,
+    load_valid_prod_sns,
+    log_concern_qa,
+    scrape_concern_lists,
+)
+from src.common.amore_api import build_headers, request_page
+from src.common.http import HttpClient
+from src.common.logger import get_logger
+from src.common.paging import RateLimiter, fetch_all_pages, paging_options
+from src.common.storage import save_table
+
+log = get_logger("collect_product_concern_map_api")
+
+def load_yaml(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+def now_dt() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def fetch_concern_prod_sns(
+    concerns: Dict[str, Dict], cfg: dict, brand_sn: int
+) -> Tuple[Dict[str, List[int]], List[int]]:
+    """
+    ({concern_type: prod_sns(API 노출 순서)}, 필터 없는 brand 전체 prod_sns).
+    concern별 + 전체 목록을 동시 페이징, politeness 예산은 공유
+    """
+    limit = int(cfg.get("run", {}).get("api_limit", 40))
+    sort_type = cfg.get("run", {}).get("api_sort_type", None)
+    opts = paging_options(cfg)
+
+    headers = build_headers(cfg)
+    session = HttpClient()
+    limiter = RateLimiter(opts["requests_per_sec"], burst=opts["max_in_flight"])
+
+    def _list(concern_type: Optional[str]) -> List[int]:
+        # 다른 필터 호출(detail_urls)과 같이 containsFilter=true가 있어야 필터가 적용됨
+        extra = [("containsFilter", "true"), ("skinConcernTypes", concern_type)] if concern_type else []
+        paged = fetch_all_pages(
+            lambda off: request_page(session, headers, brand_sn, limit, off, sort_type, extra),
+            limit=limit,
+            max_in_flight=opts["max_in_flight"],
+            limiter=limiter,
+        )
+        return [int(it["onlineProdSn"]) for _, it in paged if it.get("onlineProdSn")]
+
+    types = list(concerns.keys())
+    with ThreadPoolExecutor(max_workers=len(types) + 1) as ex:
+        results = list(ex.map(_list, types + [None]))
+    session.log_stats()
+    return dict(zip(types, results[:-1])), results[-1]
+
+def check_filter_applied(api_sns: Dict[str, List[int]], all_sns: List[int]) -> None:
+    """
+    API가 skinConcernTypes 필터를 무시하면 모든 상품이 모든 concern에 매핑됨 → 저장 전에 실패.
+    - concern 결과가 필터 없는 전체 목록과 같음
+    - concern이 2개 이상인데 모든 concern 결과가 같음
+    """
+    full = set(all_sns)
+    sets = {c: set(sns) for c, sns in api_sns.items()}
+    unfiltered = sorted(c for c, s in sets.items() if s and len(full) > 1 and s == full)
+    if unfiltered:
+        raise RuntimeError(
+            f"skinConcernTypes 필터가 적용되지 않았습니다: concern={unfiltered} 결과가 brand 전체 목록(n={len(full)})과 같음"
+        )
+    distinct = {frozenset(s) for s in sets.values()}
+    if len(sets) > 1 and len(distinct) == 1 and next(iter(distinct)):
+        raise RuntimeError(f"skinConcernTypes 필터가 적용되지 않았습니다: 모든 concern({len(sets)}개)의 결과가 같음")
+
+def verify_against_selenium(concerns: Dict[str, Dict], api_sns: Dict[str, List[int]], valid_prod_sns: set) -> bool:
+    """Selenium 목록 페이지 결과와 concern별 (in-scope) prod_sn 집합 비교"""
+    sel_sns = scrape_concern_lists(concerns)
+    ok = True
+    for concern_type in concerns:
+        a = set(api_sns.get(concern_type, [])) & valid_prod_sns
+        s = set(sel_sns.get(concern_type, [])) & valid_prod_sns
+        if a == s:
+            log.info(f"verify concern={concern_type} match n={len(a)}")
+            continue
+        ok = False
+        log.warning(
+            f"verify concern={concern_type} mismatch api={len(a)} selenium={len(s)} "
+            f"api_only={sorted(a - s)[:10]} selenium_only={sorted(s - a)[:10]}"
+        )
+    return ok
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verify", action="store_true", help="Selenium 목록 페이지 스크롤 결과와 비교 (저장은 API 결과)")
+    args = parser.parse_args(argv)
+
+    cfg = load_yaml("./config/concerns_filter_urls.yaml")
+    targets = load_yaml("./config/targets.yaml")
+    brand = cfg.get("brand", "unknown")
+    brand_sn = int(cfg.get("brand_sn") or targets["brand_entry"]["brand_sns"])
+    concerns: Dict[str, Dict] = cfg["concerns"]
+
+    valid_prod_sns = load_valid_prod_sns(cfg)
+    collected_at = now_dt()
+
+    api_sns, all_sns = fetch_concern_prod_sns(concerns, targets, brand_sn)
+    check_filter_applied(api_sns, all_sns)
+    rows = build_concern_rows(concerns, api_sns, valid_prod_sns, brand, collected_at)
+    df = finalize_concern_map(rows)
+    out = save_table(df, "./data/raw/product_concern_map", "product_concern_map")
+    log.info(f"saved: {out} rows={len(df)}")
+
+    log_concern_qa(df, valid_prod_sns)
+
+    if args.verify:
+        if not verify_against_selenium(concerns, api_sns, valid_prod_sns):
+            raise SystemExit("verify failed: API와 Selenium 목록 페이지의 concern 매핑이 다릅니다")
+
+if __name__ == "__main__":
+    main()
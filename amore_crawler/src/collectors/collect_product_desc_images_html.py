@@ -1,16 +1,26 @@
 # src/collectors/collect_product_desc_images_html.py
-import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+from functools import partial
 from typing import Optional, List
+from urllib.parse import urljoin
 
 import pandas as pd
 import yaml
+from lxml import html as lxml_html
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from src.common.catalog_diff import catalog_fingerprints, unchanged_prod_sns
+from src.common.driver_pool import DriverPool
+from src.common.http import HttpClient
+from src.common.journal import Journal
 from src.common.logger import get_logger
+from src.common.paging import RateLimiter, paging_options
 from src.common.selenium_driver import create_driver
+from src.common.waits import WAIT_STATS, wait_for_settle
 from src.common.storage import load_latest_table, save_table, dedupe
 from src.common.config import apply_sample
 
@@ -34,6 +44,27 @@ DESC_IMG_FALLBACK_SELECTORS = [
     "#productDesc .contenteditor-root img",   # root는 넓지만 #productDesc 내부로만 제한
 ]
 
+# 브라우저 없이 HTML만 파싱할 때 쓰는 같은 범위의 XPath (CSS 셀렉터와 1:1 대응)
+def _has_class(name: str) -> str:
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+DESC_IMG_XPATHS = [
+    f"//div[{_has_class('contenteditor-htmlcode')}]//img",
+    f"//*[@id='productDesc']//div[{_has_class('prdImgWrap')}]//img",
+]
+DESC_IMG_FALLBACK_XPATHS = [
+    "//*[@id='productDesc']//div[@data-itemtype='htmlcode']//img",
+    f"//*[@id='productDesc']//*[{_has_class('contenteditor-root')}]//img",
+]
+
+# 상세설명 이미지 상한 (넘으면 대표/배너가 섞인 것으로 보고 자름)
+MAX_DESC_IMGS = 12
+
+OUT_DIR = "./data/raw/product_ocr_text"
+OUT_PREFIX = "product_ocr_text"
+# 마지막 수집 시점의 prod_sn별 카탈로그 fingerprint (증분 수집 기준)
+FP_PREFIX = "desc_image_fingerprints"
+
 # ============================================================
 # 유틸
 # ============================================================
@@ -61,7 +92,7 @@ def _scroll_to(driver, css: str, block: str = "center") -> bool:
     if not els:
         return False
     driver.execute_script(f"arguments[0].scrollIntoView({{block:'{block}'}});", els[0])
-    time.sleep(0.25)
+    wait_for_settle(driver, "scroll_to", quiet_ms=150, timeout_s=1.0)
     return True
 
 def _click(driver, css: str) -> bool:
@@ -71,7 +102,7 @@ def _click(driver, css: str) -> bool:
     el = els[0]
     try:
         driver.execute_script("arguments[0].scrollIntoView({block:'center'});", el)
-        time.sleep(0.2)
+        wait_for_settle(driver, "click_scroll", quiet_ms=100, timeout_s=1.0)
         el.click()
         return True
     except Exception:
@@ -125,6 +156,86 @@ def _debug_desc_dom(driver, prod_sn: int, online_prod_code: Optional[str]) -> No
         f"imgs(htmlcode)={n_imgs_a} imgs(prdImgWrap)={n_imgs_b} imgs(itemtype)={n_imgs_c}"
     )
 
+def _cap_desc_urls(urls: List[str], prod_sn: int) -> List[str]:
+    # 과수집 방지: 이 범위에서 20장 이상이면 구조가 잘못 잡힌 것(대표/배너 섞임 가능)
+    if len(urls) > MAX_DESC_IMGS:
+        log.warning(f"too many desc imgs ({len(urls)}) prod_sn={prod_sn} -> trim")
+        urls = urls[:MAX_DESC_IMGS]
+    return urls
+
+# ============================================================
+# fast path: 브라우저 없이 HTML fetch + lxml 파싱
+# ============================================================
+def _get_img_url_html(img, base_url: str) -> Optional[str]:
+    """_get_img_url과 같은 우선순위. 원본 HTML은 상대/프로토콜 상대 경로일 수 있어 base_url로 보정"""
+    for attr in ("data-origin", "data-src", "src"):
+        v = (img.get(attr) or "").strip()
+        if v and not v.startswith("data:"):
+            u = urljoin(base_url, v)
+            if u.startswith("http"):
+                return u
+
+    srcset = (img.get("srcset") or "").strip()
+    if srcset:
+        first = urljoin(base_url, srcset.split(",")[0].strip().split(" ")[0])
+        if first.startswith("http"):
+            return first
+
+    return None
+
+def extract_desc_images_from_html(page_html: str, base_url: str, prod_sn: int) -> List[str]:
+    """
+    extract_desc_images_v1_base와 같은 범위(#productDesc / contenteditor-htmlcode)만 탐색.
+    메인 XPath에서 없을 때만 fallback XPath 사용.
+    """
+    if not page_html:
+        return []
+    try:
+        tree = lxml_html.fromstring(page_html)
+    except Exception:
+        return []
+
+    imgs = []
+    for xp in DESC_IMG_XPATHS:
+        imgs += tree.xpath(xp)
+    if not imgs:
+        for xp in DESC_IMG_FALLBACK_XPATHS:
+            imgs += tree.xpath(xp)
+
+    urls = uniq_keep_order([_get_img_url_html(img, base_url) for img in imgs])
+    return _cap_desc_urls(urls, prod_sn)
+
+def fetch_desc_images_http(client: HttpClient, task: tuple) -> List[str]:
+    """(prod_sn, detail_url, online_prod_code) -> 이미지 URL 목록. 실패/미검출이면 빈 리스트"""
+    prod_sn, product_url, _ = task
+    try:
+        r = client.get(product_url)
+    except Exception as e:
+        log.warning(f"http fail prod_sn={prod_sn} err={e}")
+        return []
+    return extract_desc_images_from_html(r.text, r.url or product_url, prod_sn)
+
+def fetch_desc_images_fast(tasks: List[tuple], cfg: dict, journal: Optional[Journal] = None) -> List[List[str]]:
+    """
+    fast path를 목록 API와 같은 politeness 예산(run.max_in_flight / requests_per_sec)으로 병렬 수행.
+    이미지를 찾은 상품만 journal에 기록 (못 찾은 상품은 Selenium fallback 대상)
+    """
+    opts = paging_options(cfg)
+    client = HttpClient(cache_mode="off")   # 상세페이지 HTML은 HTTP 응답 캐시에 쌓지 않음
+    limiter = RateLimiter(opts["requests_per_sec"], burst=opts["max_in_flight"])
+
+    def _one(task: tuple) -> List[str]:
+        limiter.acquire()
+        urls = fetch_desc_images_http(client, task)
+        if urls and journal is not None:
+            journal.record(task[0], urls)
+        return urls
+
+    with ThreadPoolExecutor(max_workers=max(1, opts["max_in_flight"])) as ex:
+        results = list(ex.map(_one, tasks))
+    client.log_stats()
+    return results
+
 # ============================================================
 # 핵심: v1 베이스 상세설명 이미지 수집
 # ============================================================
@@ -133,15 +244,18 @@ def extract_desc_images_v1_base(
     product_url: str,
     prod_sn: int,
     online_prod_code: Optional[str],
+    navigate: bool = True,
 ) -> List[str]:
     """
     v1 방식 그대로:
+    - 상품 페이지 로드 (navigate=False면 이미 열린 페이지를 그대로 사용)
     - #productDesc로 이동
     - 더보기 클릭(있으면)
     - 스크롤/대기 반복하면서 상세설명 컨테이너 내부 img만 수집
     - 전역 img 수집 절대 금지
     """
-    driver.get(product_url)
+    if navigate:
+        driver.get(product_url)
 
     # #productDesc가 나타날 때까지 대기(없으면 바로 실패)
     try:
@@ -156,15 +270,15 @@ def extract_desc_images_v1_base(
         return []
 
     # 더보기(있으면) 클릭
-    _click(driver, DESC_MORE_BTN)
-    time.sleep(0.9)
+    if _click(driver, DESC_MORE_BTN):
+        wait_for_settle(driver, "more_click", quiet_ms=300, timeout_s=3.0, scope_css=DESC_SECTION)
 
     urls: List[str] = []
 
     # lazy-load 대응: v1처럼 3회 반복 스크롤
     for _ in range(3):
         driver.execute_script("window.scrollBy(0, 1200);")
-        time.sleep(0.9)
+        wait_for_settle(driver, "desc_scroll", quiet_ms=300, timeout_s=3.0, scope_css=DESC_SECTION)
 
         imgs = []
 
@@ -195,12 +309,7 @@ def extract_desc_images_v1_base(
         if len(urls) >= 3:
             break
 
-    urls = uniq_keep_order(urls)
-
-    # 과수집 방지: 이 범위에서 20장 이상이면 구조가 잘못 잡힌 것(대표/배너 섞임 가능)
-    if len(urls) > 12:
-        log.warning(f"too many desc imgs ({len(urls)}) prod_sn={prod_sn} -> trim")
-        urls = urls[:12]
+    urls = _cap_desc_urls(uniq_keep_order(urls), prod_sn)
 
     # 디버그: 끝까지 못 잡으면 최소 DOM 신호 출력
     if not urls:
@@ -208,63 +317,136 @@ def extract_desc_images_v1_base(
 
     return urls
 
+def scrape_desc_images(driver, task: tuple) -> List[str]:
+    """DriverPool task: (prod_sn, detail_url, online_prod_code) -> 상세설명 이미지 URL 목록"""
+    prod_sn, product_url, online_prod_code = task
+    img_urls = extract_desc_images_v1_base(
+        driver=driver,
+        product_url=product_url,
+        prod_sn=prod_sn,
+        online_prod_code=online_prod_code,
+    )
+    return img_urls
+
+# ============================================================
+# 증분 수집
+# ============================================================
+def _load_latest_or_none(in_dir: str, prefix: str) -> Optional[pd.DataFrame]:
+    try:
+        return load_latest_table(in_dir, prefix)
+    except FileNotFoundError:
+        return None
+
+def plan_incremental(
+    detail_df: pd.DataFrame,
+    cur_fp: pd.DataFrame,
+    prev_rows: Optional[pd.DataFrame],
+    prev_fp: Optional[pd.DataFrame],
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    (이번에 Selenium으로 수집할 detail_df, 이전 결과에서 그대로 가져갈 이미지 rows)
+    - fingerprint가 같고 이전에 이미지가 잡혔던 prod_sn만 carry-forward
+    - 신규/변경/이전 실패분은 다시 수집
+    """
+    if prev_rows is None or prev_rows.empty:
+        return detail_df, pd.DataFrame()
+
+    unchanged = unchanged_prod_sns(cur_fp, prev_fp) & set(int(x) for x in prev_rows["prod_sn"])
+    carried = prev_rows[prev_rows["prod_sn"].astype("int64").isin(unchanged)].reset_index(drop=True)
+    todo = detail_df[~detail_df["prod_sn"].astype("int64").isin(unchanged)].reset_index(drop=True)
+    return todo, carried
+
 # ============================================================
 # main
 # ============================================================
-def main():
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--full", action="store_true", help="증분 무시하고 전체 상세페이지 재수집")
+    parser.add_argument("--selenium-only", action="store_true", help="HTML fast path 없이 Selenium으로만 수집")
+    parser.add_argument("--resume", action="store_true", help="중단된 실행의 journal에서 완료된 상품은 건너뜀")
+    args = parser.parse_args(argv)
+
     cfg = load_yaml("./config/targets.yaml")
+    incremental = bool(cfg.get("run", {}).get("desc_images_incremental", True)) and not args.full
 
     # 입력 테이블: detail_urls_all
     detail_df = load_latest_table("./data/raw/detail_urls", "detail_urls_all")
     detail_df = apply_sample(detail_df, cfg)
 
+    cur_fp = catalog_fingerprints(detail_df, _load_latest_or_none("./data/raw/products", "products"))
+    carried = pd.DataFrame()
+    if incremental:
+        detail_df, carried = plan_incremental(
+            detail_df,
+            cur_fp,
+            _load_latest_or_none(OUT_DIR, OUT_PREFIX),
+            _load_latest_or_none(OUT_DIR, FP_PREFIX),
+        )
+        log.info(
+            f"incremental: scrape={len(detail_df)} "
+            f"carry_forward={carried['prod_sn'].nunique() if not carried.empty else 0}"
+        )
+
     collected_at = now_dt()
+    tasks = [
+        (int(r["prod_sn"]), r["detail_url"], r.get("online_prod_code"))
+        for r in detail_df.to_dict("records")
+    ]
+    fast_path = bool(cfg.get("run", {}).get("desc_images_fast_path", True)) and not args.selenium_only
+
+    # 상품 단위 진행 기록: 완료된 prod_sn은 재시작 시 건너뜀
+    journal = Journal("desc_images", resume=args.resume)
+    # 빈 결과(이전 버전이 기록한 실패/timeout)는 완료로 보지 않고 다시 수집
+    done = {sn: urls for sn, urls in journal.done().items() if urls}
+    pending = [t for t in tasks if str(t[0]) not in done]
+
+    def _scrape_and_record(driver, task: tuple) -> List[str]:
+        # fast path와 같이 이미지를 찾은 상품만 기록 (실패/timeout은 --resume 때 재시도)
+        urls = scrape_desc_images(driver, task)
+        if urls:
+            journal.record(task[0], urls)
+        return urls
+
+    # 1) HTML fast path → 2) 못 찾은 상품만 Selenium fallback
+    results: List[List[str]] = [[] for _ in pending]
+    if fast_path and pending:
+        results = fetch_desc_images_fast(pending, cfg, journal)
+    miss = [i for i, urls in enumerate(results) if not urls]
+    log.info(
+        f"desc images: resumed={len(tasks) - len(pending)} "
+        f"fast_path_hits={len(pending) - len(miss)} selenium_fallback={len(miss)}"
+    )
+    if miss:
+        # 상세설명 img의 src/data-src 속성만 읽으므로 이미지 차단 프로필로 충분 (bench_driver_profile로 URL 집합 동일 확인)
+        pool = DriverPool(factory=partial(create_driver, profile="scrape"))
+        fallback = pool.map(_scrape_and_record, [pending[i] for i in miss])
+        for i, urls in zip(miss, fallback):
+            results[i] = urls
+        WAIT_STATS.log_summary()
+
+    by_sn = {str(sn): urls for sn, urls in done.items()}
+    by_sn.update({str(t[0]): urls for t, urls in zip(pending, results)})
+
+    # 병렬 처리와 무관하게 detail_df 순서대로 병합
     rows = []
+    for prod_sn, _, online_prod_code in tasks:
+        img_urls = by_sn.get(str(prod_sn))
+        if not img_urls:
+            log.warning(f"no desc images prod_sn={prod_sn} onlineProdCode={online_prod_code}")
+            continue
 
-    driver = create_driver()
-
-    try:
-        for _, r in detail_df.iterrows():
-            prod_sn = int(r["prod_sn"])
-            product_url = r["detail_url"]
-            online_prod_code = r.get("online_prod_code")
-
-            img_urls = []
-            try:
-                img_urls = extract_desc_images_v1_base(
-                    driver=driver,
-                    product_url=product_url,
-                    prod_sn=prod_sn,
-                    online_prod_code=online_prod_code,
-                )
-            except Exception as e:
-                log.warning(f"selenium fail prod_sn={prod_sn} err={e}")
-                img_urls = []
-
-            if not img_urls:
-                log.warning(f"no desc images prod_sn={prod_sn} onlineProdCode={online_prod_code}")
-                continue
-
-            for seq, img_url in enumerate(img_urls):
-                rows.append(
-                    {
-                        "prod_sn": prod_sn,
-                        "online_prod_code": online_prod_code,
-                        "image_seq": seq,
-                        "image_url": img_url,
-                        "collected_at": collected_at,
-                    }
-                )
-
-            time.sleep(0.05)
-
-    finally:
-        try:
-            driver.quit()
-        except Exception:
-            pass
-
-    df = pd.DataFrame(rows)
+        for seq, img_url in enumerate(img_urls):
+            rows.append(
+                {
+                    "prod_sn": prod_sn,
+                    "online_prod_code": online_prod_code,
+                    "image_seq": seq,
+                    "image_url": img_url,
+                    "collected_at": collected_at,
+                }
+            )
+
+    df = pd.concat([carried, pd.DataFrame(rows)], ignore_index=True)
     if df.empty:
         raise RuntimeError(
             "product_ocr_text empty. "
@@ -272,8 +454,13 @@ def main():
         )
 
     df = dedupe(df, ["prod_sn", "image_url"])
-    out = save_table(df, "./data/raw/product_ocr_text", "product_ocr_text")
+    out = save_table(df, OUT_DIR, OUT_PREFIX)
     log.info(f"saved: {out} rows={len(df)}")
 
+    # 이미지가 잡힌 prod_sn만 기록 → 실패/0장인 상품은 다음 실행에서 다시 시도
+    fp = cur_fp[cur_fp["prod_sn"].isin(df["prod_sn"].astype("int64"))]
+    save_table(fp.reset_index(drop=True), OUT_DIR, FP_PREFIX)
+    journal.finish()
+
 if __name__ == "__main__":
     main()
@@ -1,6 +1,9 @@
 from datetime import datetime
+
+import numpy as np
 import pandas as pd
 
+from src.common.frames import grouped_lists
 from src.common.logger import get_logger
 from src.common.storage import load_latest_table, save_table
 
@@ -11,58 +14,72 @@ TOPK_PRED = 3  # 추정 concern 최대 개수
 def now_dt() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
 
+def top_pred_lists(pred: pd.DataFrame, k: int = TOPK_PRED) -> pd.DataFrame:
+    """prod_sn별 rank 상위 k개 → prod_sn, pred_concerns, pred_concern_types (rank 동점은 입력 순서)"""
+    top = pred.sort_values(["prod_sn", "rank"], kind="stable")
+    top = top[top.groupby("prod_sn", sort=False).cumcount().to_numpy() < k]
+    return grouped_lists(top, "prod_sn", ["concern_name", "concern_type"]).rename(
+        columns={"concern_name": "pred_concerns", "concern_type": "pred_concern_types"}
+    )
+
+def build_concern_final(detail: pd.DataFrame, official: pd.DataFrame, pred: pd.DataFrame, created_at: str) -> pd.DataFrame:
+    """
+    detail: prod_sn (전체 상품, 순서 유지)
+    official: prod_sn, concerns, concern_types (product_concerns)
+    pred: prod_sn, rank, concern_name, concern_type (product_concern_pred_map)
+
+    공식 concern이 있으면 official, 없으면 rank 상위 TOPK_PRED개 predicted, 둘 다 없으면 none.
+    """
+    # 같은 prod_sn이 여러 행이면 첫 행 기준
+    off = (
+        official.drop_duplicates("prod_sn", keep="first")[["prod_sn", "concerns", "concern_types"]]
+        .rename(columns={"concerns": "off_concerns", "concern_types": "off_concern_types"})
+    )
+
+    df = (
+        detail[["prod_sn"]]
+        .merge(off, on="prod_sn", how="left")
+        .merge(top_pred_lists(pred), on="prod_sn", how="left")
+    )
+
+    has_off = (df["off_concerns"].map(len, na_action="ignore") > 0).to_numpy()
+    has_pred = df["pred_concerns"].notna().to_numpy() & ~has_off
+    none = ~(has_off | has_pred)
+    empty = pd.Series([[] for _ in range(int(none.sum()))], index=df.index[none], dtype=object)
+
+    def pick(off_col: str, pred_col: str) -> pd.Series:
+        s = df[off_col].where(has_off, df[pred_col])
+        s.loc[none] = empty
+        return s
+
+    return pd.DataFrame({
+        "prod_sn": df["prod_sn"].to_numpy(),
+        "source": np.select([has_off, has_pred], ["official", "predicted"], "none"),
+        "concerns": pick("off_concerns", "pred_concerns").to_numpy(),
+        "concern_types": pick("off_concern_types", "pred_concern_types").to_numpy(),
+        "created_at": created_at,
+    })
+
 def main():
     # 전체 상품 기준
-    detail = load_latest_table("./data/raw/detail_urls", "detail_urls_all")[["prod_sn"]]
+    detail = load_latest_table("./data/raw/detail_urls", "detail_urls_all", columns=["prod_sn"])
     detail["prod_sn"] = detail["prod_sn"].astype(int)
 
     # 공식 concern
-    official = load_latest_table("./data/derived/product_concerns", "product_concerns")
+    official = load_latest_table(
+        "./data/derived/product_concerns", "product_concerns", columns=["prod_sn", "concerns", "concern_types"]
+    )
     official["prod_sn"] = official["prod_sn"].astype(int)
 
     # 추정 concern
-    pred = load_latest_table("./data/derived/product_concern_pred_map", "product_concern_pred_map")
+    pred = load_latest_table(
+        "./data/derived/product_concern_pred_map",
+        "product_concern_pred_map",
+        columns=["prod_sn", "rank", "concern_name", "concern_type"],
+    )
     pred["prod_sn"] = pred["prod_sn"].astype(int)
 
-    rows = []
-    created_at = now_dt()
-
-    for _, r in detail.iterrows():
-        prod_sn = int(r["prod_sn"])
-
-        off = official[official["prod_sn"] == prod_sn]
-        if not off.empty and len(off.iloc[0]["concerns"]) > 0:
-            # 공식 concern 사용
-            rows.append({
-                "prod_sn": prod_sn,
-                "source": "official",
-                "concerns": off.iloc[0]["concerns"],
-                "concern_types": off.iloc[0]["concern_types"],
-                "created_at": created_at,
-            })
-            continue
-
-        # 공식이 없으면 추정 concern 사용
-        p = pred[pred["prod_sn"] == prod_sn].sort_values("rank").head(TOPK_PRED)
-        if not p.empty:
-            rows.append({
-                "prod_sn": prod_sn,
-                "source": "predicted",
-                "concerns": p["concern_name"].tolist(),
-                "concern_types": p["concern_type"].tolist(),
-                "created_at": created_at,
-            })
-        else:
-            # 둘 다 없으면 빈 리스트
-            rows.append({
-                "prod_sn": prod_sn,
-                "source": "none",
-                "concerns": [],
-                "concern_types": [],
-                "created_at": created_at,
-            })
-
-    out_df = pd.DataFrame(rows)
+    out_df = build_concern_final(detail, official, pred, now_dt())
 
     out = save_table(out_df, "./data/derived/product_concern_final", "product_concern_final")
     log.info(f"saved: {out} rows={len(out_df)}")
@@ -1,11 +1,15 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
+import numpy as np
 import pandas as pd
 import yaml
 
 from src.common.logger import get_logger
-from src.common.storage import load_latest_table, save_table
+from src.common.storage import load_file, load_latest_table, save_table
+from src.common.trigger_matcher import TriggerMatcher
 
 log = get_logger("derive_product_concern_pred_map")
 
@@ -14,6 +18,11 @@ RULES_PATH = "./config/concern_pred_rules.yaml"
 
 # 상품당 추정 concern 상한
 TOPK_PER_PRODUCT = 3
+# 상품당 evidence 키워드 상한
+MAX_EVIDENCE = 5
+
+BATCH_SIZE = int(os.getenv("CONCERN_PRED_BATCH_SIZE", "5000"))
+_WORKERS = int(os.getenv("CONCERN_PRED_WORKERS", "0")) or (os.cpu_count() or 1)
 
 def now_dt() -> str:
     return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -25,84 +34,166 @@ def load_yaml(path: str) -> dict:
 def norm(s: str) -> str:
     return (s or "").strip().lower()
 
-def score_product(keywords: List[str], rules: Dict[str, Any]):
+class CompiledRules:
+    """
+    concern_pred_rules.yaml을 한 번만 정규화/컴파일.
+    - 모든 concern의 trigger를 하나의 Aho-Corasick 오토마톤으로 → 키워드당 한 번 스캔으로 매칭 trigger 집합
+    - 키워드 → 매칭 trigger, 매칭 trigger 집합 → concern 점수는 memo (상품 간 반복이 많음)
+    """
+
+    def __init__(self, rules: Dict[str, Any]):
+        self.concern_types = list(rules)
+        self.concern_names = [meta.get("name", ctype) for ctype, meta in rules.items()]
+        self.weights = [float(meta.get("weight", 1.0)) for meta in rules.values()]
+
+        ids: dict[str, int] = {}
+        # concern별 trigger id (yaml 순서, 중복 제거)
+        self.concern_triggers: list[list[int]] = []
+        for meta in rules.values():
+            ts = dict.fromkeys(norm(t) for t in (meta.get("triggers") or []))
+            self.concern_triggers.append([ids.setdefault(t, len(ids)) for t in ts])
+        self.triggers = list(ids)
+        self.matcher = TriggerMatcher(self.triggers)
+
+        self._kw_memo: dict[str, frozenset] = {}
+        self._score_memo: dict[frozenset, list] = {}
+
+    def _hits(self, kw: str) -> frozenset:
+        hit = self._kw_memo.get(kw)
+        if hit is None:
+            hit = self.matcher.match(kw)
+            if len(self._kw_memo) < 1_000_000:
+                self._kw_memo[kw] = hit
+        return hit
+
+    def score(self, keywords: List[str]) -> list[tuple[int, float, list[str]]]:
+        """
+        [(concern 번호, score, evidence_keywords)] (매칭 있는 concern만, yaml 순서)
+        - 부분일치 기반 (trigger in keyword)
+        - score = 매칭 트리거 수 * weight
+        """
+        matched: set = set()
+        for k in keywords:
+            if isinstance(k, str) and k.strip():
+                matched |= self._hits(norm(k))
+        if not matched:
+            return []
+
+        key = frozenset(matched)
+        out = self._score_memo.get(key)
+        if out is None:
+            out = []
+            for ci, tids in enumerate(self.concern_triggers):
+                hits = [t for t in tids if t in key]
+                if hits:
+                    out.append((ci, len(hits) * self.weights[ci], [self.triggers[t] for t in hits[:MAX_EVIDENCE]]))
+            if len(self._score_memo) < 100_000:
+                self._score_memo[key] = out
+        return out
+
+def score_product(keywords: List[str], compiled: CompiledRules):
+    """키워드 리스트의 concern별 점수 (score 내림차순, 동점은 yaml 순서)"""
+    scored = [
+        {
+            "concern_type": compiled.concern_types[ci],
+            "concern_name": compiled.concern_names[ci],
+            "score": score,
+            "evidence_keywords": evidence,
+        }
+        for ci, score, evidence in compiled.score(keywords)
+    ]
+    scored.sort(key=lambda x: x["score"], reverse=True)
+    return scored
+
+def coerce_keywords(x) -> list:
+    if isinstance(x, list):
+        return x
+    if hasattr(x, "tolist"):     # numpy.ndarray 포함
+        try:
+            v = x.tolist()
+            return v if isinstance(v, list) else []
+        except Exception:
+            return []
+    if isinstance(x, tuple):
+        return list(x)
+    return []
+
+# ============================================================
+# worker (프로세스 풀)
+# ============================================================
+_COMPILED: Optional[CompiledRules] = None
+
+def _init_worker(rules: Dict[str, Any]) -> None:
+    global _COMPILED
+    _COMPILED = CompiledRules(rules)
+
+def score_batch(start: int, keyword_lists: list) -> tuple[list[int], list[int], list[float], list[list[str]]]:
+    """배치 안 상품들의 (행 번호, concern 번호, score, evidence) long format"""
+    rows, cis, scores, evidence = [], [], [], []
+    for i, kws in enumerate(keyword_lists, start=start):
+        for ci, score, ev in _COMPILED.score(coerce_keywords(kws)):
+            rows.append(i)
+            cis.append(ci)
+            scores.append(score)
+            evidence.append(ev)
+    return rows, cis, scores, evidence
+
+def rank_top_k(rows: np.ndarray, cis: np.ndarray, scores: np.ndarray, k: int = TOPK_PER_PRODUCT) -> tuple[np.ndarray, np.ndarray]:
     """
-    키워드 리스트와 규칙을 비교해 concern별 점수 산출.
-    - 부분일치 기반 (trigger in keyword)
-    - score = 매칭 트리거 수 * weight
+    행(상품)별 score 내림차순(동점은 concern 순서) 상위 k개.
+    반환: (long format 안에서의 선택 위치, rank) — 상품 순서 → rank 순서로 정렬됨
     """
-    kws = [norm(k) for k in keywords if isinstance(k, str) and k.strip()]
-    out = []
-    for ctype, meta in rules.items():
-        triggers = [norm(t) for t in meta.get("triggers", [])]
-        w = float(meta.get("weight", 1.0))
-        hits = []
-        for t in triggers:
-            if any(t in k for k in kws):
-                hits.append(t)
-        if hits:
-            out.append({
-                "concern_type": ctype,
-                "concern_name": meta.get("name", ctype),
-                "score": len(set(hits)) * w,
-                "evidence_keywords": list(dict.fromkeys(hits))[:5],
-            })
-    out.sort(key=lambda x: x["score"], reverse=True)
-    return out
+    order = np.lexsort((cis, -scores, rows))
+    r = rows[order]
+    starts = np.r_[True, r[1:] != r[:-1]] if len(r) else np.array([], dtype=bool)
+    first = np.maximum.accumulate(np.where(starts, np.arange(len(r)), 0))
+    rank = np.arange(len(r)) - first + 1
+    keep = rank <= k
+    return order[keep], rank[keep]
 
 def main():
     rules = load_yaml(RULES_PATH)
+    compiled = CompiledRules(rules)
 
     # 전체 상품 목록(180개) 기준 (키워드 없는 상품도 포함시키기 위해)
-    detail = load_latest_table("./data/raw/detail_urls", "detail_urls_all")[["prod_sn"]].copy()
+    detail = load_latest_table("./data/raw/detail_urls", "detail_urls_all", columns=["prod_sn"])
     detail["prod_sn"] = detail["prod_sn"].astype(int)
 
     # OCR 키워드 로드
-    kw_df = pd.read_parquet(KEYWORDS_PATH)
+    kw_df = load_file(KEYWORDS_PATH, columns=["prod_sn", "keywords"])
     kw_df["prod_sn"] = kw_df["prod_sn"].astype(int)
 
     # prod_sn 기준으로 병합(키워드 없는 상품 포함)
-    base = detail.merge(kw_df[["prod_sn", "keywords"]], on="prod_sn", how="left")
-    def coerce_keywords(x):
-        if isinstance(x, list):
-            return x
-        if hasattr(x, "tolist"):     # numpy.ndarray 포함
-            try:
-                v = x.tolist()
-                return v if isinstance(v, list) else []
-            except Exception:
-                return []
-        if isinstance(x, tuple):
-            return list(x)
-        return []
-    base["keywords"] = base["keywords"].apply(coerce_keywords)
-
-
-    rows = []
-    created_at = now_dt()
-
-    for _, r in base.iterrows():
-        prod_sn = int(r["prod_sn"])
-        keywords = r["keywords"]
-
-        scored = score_product(keywords, rules)
-        if not scored:
-            continue
-
-        # top-k만 저장
-        for rank, item in enumerate(scored[:TOPK_PER_PRODUCT], start=1):
-            rows.append({
-                "prod_sn": prod_sn,
-                "concern_type": item["concern_type"],
-                "concern_name": item["concern_name"],
-                "rank": rank,
-                "confidence": float(item["score"]),  # 점수 기반 (0~1 확률이 아니라 ranking용)
-                "evidence_keywords": item["evidence_keywords"],
-                "source": "ocr_keywords",
-                "created_at": created_at,
-            })
-
-    out_df = pd.DataFrame(rows)
+    base = detail.merge(kw_df, on="prod_sn", how="left")
+    log.info(f"pred: products={len(base)} concerns={len(compiled.concern_types)} triggers={len(compiled.triggers)}")
+
+    # 상품 배치별 trigger 스캔 (프로세스 풀)
+    kw_col = base["keywords"]
+    starts = range(0, len(base), BATCH_SIZE)
+    batches = [kw_col.iloc[i:i + BATCH_SIZE].tolist() for i in starts]
+    rows, cis, scores, evidence = [], [], [], []
+    with ProcessPoolExecutor(max_workers=_WORKERS, initializer=_init_worker, initargs=(rules,)) as ex:
+        for r, c, s, e in ex.map(score_batch, starts, batches):
+            rows += r
+            cis += c
+            scores += s
+            evidence += e
+
+    # top-k (벡터화)
+    sel, rank = rank_top_k(np.asarray(rows, dtype=np.int64), np.asarray(cis, dtype=np.int64), np.asarray(scores, dtype=float))
+    row_sel = np.asarray(rows, dtype=np.int64)[sel]
+    ci_sel = np.asarray(cis, dtype=np.int64)[sel]
+
+    out_df = pd.DataFrame({
+        "prod_sn": base["prod_sn"].to_numpy()[row_sel],
+        "concern_type": np.asarray(compiled.concern_types, dtype=object)[ci_sel],
+        "concern_name": np.asarray(compiled.concern_names, dtype=object)[ci_sel],
+        "rank": rank,
+        "confidence": np.asarray(scores, dtype=float)[sel],  # 점수 기반 (0~1 확률이 아니라 ranking용)
+        "evidence_keywords": pd.Series([evidence[i] for i in sel], dtype=object),
+        "source": "ocr_keywords",
+        "created_at": now_dt(),
+    })
     if out_df.empty:
         raise RuntimeError("product_concern_pred_map empty. 규칙/키워드 입력을 점검하세요.")
 
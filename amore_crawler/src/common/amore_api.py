@@ -0,0 +1,89 @@
+from urllib.parse import urlencode
+
+# 아모레몰 by-brand 목록 API (products / category_map / detail_urls 공용)
+API_URL = "https://api-gw.amoremall.com/display/v2/M01/sis/online-products/by-brand"
+DETAIL_URL_TMPL = "https://www.amoremall.com/kr/ko/product/detail?onlineProdSn={sn}&onlineProdCode={code}"
+DETAIL_URL_TMPL_SN_ONLY = "https://www.amoremall.com/kr/ko/product/detail?onlineProdSn={sn}"
+
+def build_headers(cfg: dict) -> dict:
+    return {
+        "accept": "application/json, text/plain, */*",
+        "accept-language": "ko",
+        "origin": "https://www.amoremall.com",
+        "referer": cfg["brand_entry"]["listing_url"],
+        "user-agent": cfg.get("user_agent", "Mozilla/5.0"),
+        "x-g1ecp-channel": "PCWeb",
+        "x-g1ecp-cartnonmemberkey": cfg.get("x_headers", {}).get("cartnonmemberkey", ""),
+    }
+
+def build_params(brand_sns, limit, offset, sort_type=None, extra: list | None = None) -> list:
+    params = [
+        ("brandSns", str(brand_sns)),
+        ("limit", str(limit)),
+        ("offset", str(offset)),
+    ]
+    if sort_type:
+        params.append(("sortType", str(sort_type)))
+    # 반복 query param(categorySns=1&categorySns=2 ...)도 그대로 유지되도록 list of tuple
+    params += list(extra or [])
+    return params
+
+def request_page(session, headers, brand_sns, limit, offset, sort_type=None, extra: list | None = None) -> dict:
+    params = build_params(brand_sns, limit, offset, sort_type, extra)
+    url = f"{API_URL}?{urlencode(params)}"
+    r = session.get(url, headers=headers, timeout=30)
+    r.raise_for_status()
+    return r.json()
+
+def _find_first_list_of_dicts(obj):
+    """dict/list 내부에서 'dict들의 list'를 재귀적으로 찾아 첫 번째를 반환."""
+    if isinstance(obj, list):
+        if obj and all(isinstance(x, dict) for x in obj):
+            return obj
+        for x in obj:
+            found = _find_first_list_of_dicts(x)
+            if found is not None:
+                return found
+    elif isinstance(obj, dict):
+        for v in obj.values():
+            found = _find_first_list_of_dicts(v)
+            if found is not None:
+                return found
+    return None
+
+def get_items(payload: dict) -> list[dict]:
+    """
+    응답 구조가 바뀌어도 작동하도록:
+    - 흔한 후보 키를 우선 체크 (현재 구조: payload["products"])
+    - 없으면 재귀 탐색으로 dict-list를 찾아 반환
+    """
+    if not isinstance(payload, dict):
+        return []
+
+    candidates = [
+        ("products",),
+        ("data", "list"),
+        ("data", "items"),
+        ("data", "products"),
+        ("data", "onlineProducts"),
+        ("data", "contents"),
+        ("list",),
+        ("items",),
+        ("onlineProducts",),
+        ("contents",),
+    ]
+
+    for path in candidates:
+        cur = payload
+        ok = True
+        for k in path:
+            if isinstance(cur, dict) and k in cur:
+                cur = cur[k]
+            else:
+                ok = False
+                break
+        if ok and isinstance(cur, list) and (not cur or isinstance(cur[0], dict)):
+            return cur
+
+    found = _find_first_list_of_dicts(payload)
+    return found or []
@@ -0,0 +1,39 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+_BLOB_DIR = os.getenv("BLOB_DIR", "./data/blobs")
+
+class BlobStore:
+    """
+    content-addressed 바이너리 저장소.
+    {root}/{sha[:2]}/{sha[2:4]}/{sha} 에 원본 bytes를 저장 (같은 내용은 한 번만 저장).
+    """
+
+    def __init__(self, root: str | Path = _BLOB_DIR):
+        self.root = Path(root)
+
+    def path(self, sha: str) -> Path:
+        return self.root / sha[:2] / sha[2:4] / sha
+
+    def exists(self, sha: str) -> bool:
+        return self.path(sha).exists()
+
+    def put(self, content: bytes) -> str:
+        sha = hashlib.sha256(content).hexdigest()
+        p = self.path(sha)
+        if p.exists():
+            return sha
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f"{sha}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_bytes(content)
+        tmp.replace(p)
+        return sha
+
+    def get(self, sha: str) -> Optional[bytes]:
+        try:
+            return self.path(sha).read_bytes()
+        except FileNotFoundError:
+            return None
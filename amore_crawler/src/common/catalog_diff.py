@@ -0,0 +1,46 @@
+import hashlib
+
+import pandas as pd
+
+# 상세페이지 재수집 여부를 판단할 카탈로그 필드 (이 값이 바뀌면 상세설명도 바뀌었을 가능성이 큼)
+FINGERPRINT_COLS = ["online_prod_code", "product_name", "price", "sale_price", "image_url"]
+
+def _norm(v) -> str:
+    if v is None or (isinstance(v, float) and pd.isna(v)):
+        return ""
+    # 12000 / 12000.0 / "12000" 이 같은 값으로 취급되도록
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v).strip()
+
+def catalog_fingerprints(detail_df: pd.DataFrame, products_df: pd.DataFrame | None = None) -> pd.DataFrame:
+    """
+    prod_sn별 content fingerprint (prod_sn, fingerprint).
+    detail_urls_all(onlineProdCode) + products(이름/가격/대표 이미지)를 prod_sn으로 합쳐 해시.
+    """
+    cat = detail_df[["prod_sn", "online_prod_code"]].copy()
+    cat["prod_sn"] = cat["prod_sn"].astype("int64")
+    if products_df is not None and not products_df.empty:
+        p = products_df.copy()
+        p["prod_sn"] = p["prod_sn"].astype("int64")
+        keep = [c for c in FINGERPRINT_COLS if c in p.columns and c != "online_prod_code"]
+        cat = cat.merge(p[["prod_sn"] + keep].drop_duplicates("prod_sn"), on="prod_sn", how="left")
+    for c in FINGERPRINT_COLS:
+        if c not in cat.columns:
+            cat[c] = None
+
+    fps = [
+        hashlib.sha1("\x1f".join(_norm(v) for v in vals).encode("utf-8")).hexdigest()[:16]
+        for vals in cat[FINGERPRINT_COLS].itertuples(index=False, name=None)
+    ]
+    return pd.DataFrame({"prod_sn": cat["prod_sn"].to_numpy(), "fingerprint": fps}).drop_duplicates(
+        "prod_sn", keep="last"
+    ).reset_index(drop=True)
+
+def unchanged_prod_sns(cur_fp: pd.DataFrame, prev_fp: pd.DataFrame | None) -> set[int]:
+    """이전 스냅샷과 fingerprint가 같은 prod_sn (신규/변경분은 제외)"""
+    if prev_fp is None or prev_fp.empty:
+        return set()
+    m = cur_fp.merge(prev_fp[["prod_sn", "fingerprint"]], on="prod_sn", how="inner", suffixes=("", "_prev"))
+    same = m["fingerprint"] == m["fingerprint_prev"]
+    return set(int(x) for x in m.loc[same, "prod_sn"])
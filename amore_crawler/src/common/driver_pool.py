@@ -0,0 +1,161 @@
+import os
+import queue
+import threading
+from typing import Any, Callable, Iterable, List, Optional
+
+from selenium.common.exceptions import InvalidSessionIdException, WebDriverException
+
+from .logger import get_logger
+from .selenium_driver import create_driver
+
+try:
+    import psutil
+except ImportError:  # 메모리 기준 재활용만 비활성화
+    psutil = None
+
+log = get_logger("driver_pool")
+
+_WORKERS = int(os.getenv("SELENIUM_WORKERS", "4"))
+_RECYCLE_PAGES = int(os.getenv("SELENIUM_RECYCLE_PAGES", "200"))
+_RECYCLE_RSS_MB = float(os.getenv("SELENIUM_RECYCLE_RSS_MB", "1500"))
+_TASK_RETRIES = int(os.getenv("SELENIUM_TASK_RETRIES", "1"))
+
+def _browser_rss_mb(driver) -> Optional[float]:
+    """chromedriver + 하위 chrome 프로세스 트리의 RSS 합 (psutil 없으면 None)"""
+    if psutil is None:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        procs = [root] + root.children(recursive=True)
+        return sum(p.memory_info().rss for p in procs) / (1024 * 1024)
+    except Exception:
+        return None
+
+def _is_alive(driver) -> bool:
+    try:
+        driver.execute_script("return 1;")
+        return True
+    except Exception:
+        return False
+
+def _quit(driver) -> None:
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+class DriverPool:
+    """
+    headless Chrome N개가 공용 작업 큐에서 task를 가져가 처리.
+    - 드라이버는 worker 스레드 전용 (스레드 간 공유 없음)
+    - page 수 / 메모리 기준으로 드라이버 재활용(quit 후 재생성)
+    - 드라이버가 죽거나 기동에 실패하면 새 드라이버로 교체하고 task 재시도
+    - 결과는 입력 task 순서 그대로 반환 (병렬도와 무관하게 결정적)
+
+    fn(driver, task) -> result
+    fn 내부에서 처리하지 못한 예외가 재시도 후에도 남으면 해당 결과는 None.
+    """
+
+    def __init__(
+        self,
+        workers: int = _WORKERS,
+        factory: Callable[[], Any] = create_driver,
+        recycle_pages: int = _RECYCLE_PAGES,
+        recycle_rss_mb: float = _RECYCLE_RSS_MB,
+        retries: int = _TASK_RETRIES,
+    ):
+        self.workers = max(1, int(workers))
+        self.factory = factory
+        self.recycle_pages = int(recycle_pages)
+        self.recycle_rss_mb = float(recycle_rss_mb)
+        self.retries = max(0, int(retries))
+        self.stats = {"created": 0, "recycled": 0, "crashed": 0, "failed_tasks": 0}
+        self._lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+
+    def _new_driver(self):
+        driver = self.factory()
+        self._count("created")
+        return driver
+
+    def _should_recycle(self, driver, pages: int) -> bool:
+        if self.recycle_pages > 0 and pages >= self.recycle_pages:
+            return True
+        if self.recycle_rss_mb > 0:
+            rss = _browser_rss_mb(driver)
+            if rss is not None and rss >= self.recycle_rss_mb:
+                log.info(f"recycle driver: rss={rss:.0f}MB pages={pages}")
+                return True
+        return False
+
+    def map(self, fn: Callable[[Any, Any], Any], tasks: Iterable[Any]) -> List[Any]:
+        tasks = list(tasks)
+        results: List[Any] = [None] * len(tasks)
+        if not tasks:
+            return results
+
+        q: "queue.Queue[int]" = queue.Queue()
+        for i in range(len(tasks)):
+            q.put(i)
+
+        def _worker(wid: int) -> None:
+            driver = None
+            pages = 0
+            try:
+                while True:
+                    try:
+                        i = q.get_nowait()
+                    except queue.Empty:
+                        return
+
+                    for attempt in range(self.retries + 1):
+                        if driver is None:
+                            # Chrome/driver 기동 실패도 crash로 세고 재시도 (worker 스레드가 조용히 죽지 않도록)
+                            try:
+                                driver = self._new_driver()
+                                pages = 0
+                            except Exception as e:
+                                log.warning(f"worker={wid} driver start failed on task={i} (attempt={attempt + 1}): {e}")
+                                self._count("crashed")
+                                continue
+                        try:
+                            results[i] = fn(driver, tasks[i])
+                            break
+                        except (InvalidSessionIdException, WebDriverException) as e:
+                            # 드라이버 자체가 죽은 경우만 교체 후 재시도
+                            if _is_alive(driver):
+                                log.warning(f"worker={wid} task={i} failed: {e}")
+                                self._count("failed_tasks")
+                                break
+                            log.warning(f"worker={wid} driver crashed on task={i} (attempt={attempt + 1}): {e}")
+                            self._count("crashed")
+                            _quit(driver)
+                            driver = None
+                        except Exception as e:
+                            log.warning(f"worker={wid} task={i} failed: {e}")
+                            self._count("failed_tasks")
+                            break
+                    else:
+                        self._count("failed_tasks")
+
+                    pages += 1
+                    if driver is not None and self._should_recycle(driver, pages):
+                        self._count("recycled")
+                        _quit(driver)
+                        driver = None
+            finally:
+                if driver is not None:
+                    _quit(driver)
+
+        n = min(self.workers, len(tasks))
+        threads = [threading.Thread(target=_worker, args=(w,), daemon=True) for w in range(n)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+        log.info(f"driver pool workers={n} tasks={len(tasks)} {self.stats}")
+        return results
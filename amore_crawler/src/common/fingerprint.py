@@ -0,0 +1,76 @@
+import ast
+import hashlib
+import json
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+import pandas as pd
+
+# 실행할 때마다 바뀌는 시각 컬럼은 내용 fingerprint에서 제외
+VOLATILE_COLS = frozenset({"collected_at", "created_at", "enriched_at", "downloaded_at", "updated_at"})
+
+def _cell_key(x):
+    # list/ndarray 셀은 hash_pandas_object가 못 다루므로 JSON 문자열로
+    if isinstance(x, (list, tuple, np.ndarray)):
+        return json.dumps([_cell_key(v) for v in x], ensure_ascii=False, default=str)
+    return x
+
+def frame_fingerprint(df: pd.DataFrame, ignore: Iterable[str] = VOLATILE_COLS) -> str:
+    """
+    테이블 내용 fingerprint. 시각 컬럼 제외, 행 순서 무관(행 해시 정렬 후 합침).
+    같은 데이터를 다시 수집해 새 파일로 저장해도 값이 같으면 같은 fingerprint.
+    """
+    ignore = set(ignore)
+    cols = sorted(c for c in df.columns if c not in ignore)
+    h = hashlib.sha256("\x1f".join(cols).encode("utf-8"))
+    if cols and len(df):
+        data = {c: (df[c].map(_cell_key) if df[c].dtype == object else df[c]) for c in cols}
+        rows = np.sort(pd.util.hash_pandas_object(pd.DataFrame(data), index=False).to_numpy())
+        h.update(rows.tobytes())
+    return h.hexdigest()[:16]
+
+def _local_imports(path: Path, src_root: Path) -> set[Path]:
+    """path가 import하는 src.* 모듈 파일들"""
+    out = set()
+    tree = ast.parse(path.read_text(encoding="utf-8"))
+    for node in ast.walk(tree):
+        names = []
+        if isinstance(node, ast.ImportFrom) and node.module:
+            if node.level:
+                # from .logger import ... (같은 패키지)
+                base = path.parent
+                for _ in range(node.level - 1):
+                    base = base.parent
+                names.append(base / Path(*node.module.split(".")))
+            elif node.module.startswith("src."):
+                names.append(src_root.parent / Path(*node.module.split(".")))
+        elif isinstance(node, ast.Import):
+            names += [src_root.parent / Path(*a.name.split(".")) for a in node.names if a.name.startswith("src.")]
+        for n in names:
+            f = n.with_suffix(".py")
+            if f.exists():
+                out.add(f)
+    return out
+
+def code_fingerprint(module: str, extra_files: Iterable[str] = (), src_root: str | Path = "./src") -> str:
+    """
+    stage 모듈 + 그 모듈이 (재귀적으로) import하는 src.* 모듈 + 설정 파일 내용의 fingerprint.
+    module: "src.pipelines.build_features"
+    """
+    src_root = Path(src_root)
+    start = src_root.parent / Path(*module.split(".")).with_suffix(".py")
+    seen: set[Path] = set()
+    todo = [start]
+    while todo:
+        p = todo.pop()
+        if p in seen:
+            continue
+        seen.add(p)
+        todo += list(_local_imports(p, src_root) - seen)
+
+    h = hashlib.sha256()
+    for p in sorted(seen) + [Path(f) for f in extra_files]:
+        h.update(str(p).encode("utf-8") + b"\0")
+        h.update(p.read_bytes() if p.exists() else b"<missing>")
+    return h.hexdigest()[:16]
@@ -0,0 +1,21 @@
+import numpy as np
+import pandas as pd
+
+def grouped_lists(df: pd.DataFrame, key: str, cols: list[str]) -> pd.DataFrame:
+    """
+    key로 정렬된(같은 key가 연속된) df → key별 한 행, cols는 입력 순서 그대로의 list.
+    groupby().agg(list)는 그룹마다 Series를 잘라 만들어 그룹 수가 많으면 느리므로
+    경계 offset을 한 번 구하고 Python list slice로 만든다.
+    """
+    keys = df[key].to_numpy()
+    if len(keys) == 0:
+        return pd.DataFrame({key: keys, **{c: pd.Series([], dtype=object) for c in cols}})
+
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    bounds = list(zip(starts.tolist(), np.r_[starts[1:], len(keys)].tolist()))
+
+    out = {key: keys[starts]}
+    for c in cols:
+        vals = df[c].tolist()
+        out[c] = pd.Series([vals[a:b] for a, b in bounds], dtype=object)
+    return pd.DataFrame(out)
@@ -1,5 +1,13 @@
+import hashlib
+import json
 import os
+import threading
+import time
+from pathlib import Path
+
 import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
 
 from .logger import get_logger
@@ -8,13 +16,166 @@ log = get_logger("http")
 
 _TIMEOUT = int(os.getenv("HTTP_TIMEOUT", "15"))
 _RETRIES = int(os.getenv("HTTP_RETRIES", "3"))
+_POOL_SIZE = int(os.getenv("HTTP_POOL_SIZE", "16"))
+
+# 응답 캐시
+# - off    : 캐시 사용 안 함
+# - cache  : TTL 안이면 캐시 사용, 지나면 ETag/Last-Modified 조건부 재검증(304면 캐시 본문 사용)
+#            ETag/Last-Modified가 없는 응답은 TTL이 지나면 그냥 다시 받음
+#            → 기본 TTL 12시간: 같은 날 재실행은 네트워크 없이 캐시로 끝남 (0이면 매번 재검증/재요청)
+# - record : 항상 네트워크 요청 후 저장(녹화)
+# - replay : 네트워크 없이 저장된 응답만 사용(없으면 에러)
+_CACHE_MODE = os.getenv("HTTP_CACHE_MODE", "cache").lower()
+_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", "./data/http_cache")
+_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", "43200"))
+
+# 캐시에 보관할 응답 헤더
+_KEEP_HEADERS = ("content-type", "etag", "last-modified")
+
+class CacheMiss(requests.RequestException):
+    """replay 모드에서 녹화된 응답이 없음"""
+
+class ResponseCache:
+    """
+    URL(+params) 키 기반 on-disk 응답 캐시.
+    {dir}/{key[:2]}/{key}.json (메타) + {key}.body (본문), 원자적 교체로 기록.
+    """
+
+    def __init__(self, cache_dir: str | Path):
+        self.dir = Path(cache_dir)
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return hashlib.sha256(f"{method.upper()} {url}".encode("utf-8")).hexdigest()
+
+    def _paths(self, key: str) -> tuple[Path, Path]:
+        d = self.dir / key[:2]
+        return d / f"{key}.json", d / f"{key}.body"
+
+    def load(self, key: str) -> tuple[dict, bytes] | None:
+        meta_p, body_p = self._paths(key)
+        try:
+            meta = json.loads(meta_p.read_text(encoding="utf-8"))
+            body = body_p.read_bytes()
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        return meta, body
+
+    def store(self, key: str, resp: requests.Response) -> None:
+        meta_p, body_p = self._paths(key)
+        meta_p.parent.mkdir(parents=True, exist_ok=True)
+        meta = {
+            "url": resp.url,
+            "status": resp.status_code,
+            "headers": {k: v for k, v in resp.headers.items() if k.lower() in _KEEP_HEADERS},
+            "encoding": resp.encoding,
+            "stored_at": time.time(),
+        }
+        # 본문 먼저 -> 메타(커밋 지점) 순서로 교체 (동시 스레드 대비 tmp 이름에 thread id 포함)
+        tag = f"{os.getpid()}.{threading.get_ident()}"
+        tmp_body = body_p.with_suffix(f".body.{tag}.tmp")
+        tmp_body.write_bytes(resp.content)
+        tmp_body.replace(body_p)
+        tmp_meta = meta_p.with_suffix(f".json.{tag}.tmp")
+        tmp_meta.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        tmp_meta.replace(meta_p)
+
+    def touch(self, key: str) -> None:
+        meta_p, _ = self._paths(key)
+        try:
+            meta = json.loads(meta_p.read_text(encoding="utf-8"))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return
+        meta["stored_at"] = time.time()
+        tmp = meta_p.with_suffix(f".json.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(json.dumps(meta, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(meta_p)
+
+def _cached_response(meta: dict, body: bytes, url: str) -> requests.Response:
+    r = requests.Response()
+    r.status_code = int(meta.get("status", 200))
+    r._content = body
+    r.headers = CaseInsensitiveDict(meta.get("headers") or {})
+    r.url = meta.get("url") or url
+    r.encoding = meta.get("encoding")
+    r.reason = "OK"
+    r.from_cache = True
+    return r
 
 class HttpClient:
-    def __init__(self):
+    """
+    모든 collector가 공유하는 HTTP transport.
+    - 연결 풀(HTTP_POOL_SIZE) + tenacity 재시도
+    - GET 응답 캐시 / 조건부 재검증 / record-replay (HTTP_CACHE_MODE)
+    requests.Session.get과 같은 방식(get(url, params=, headers=, timeout=))으로 호출.
+    """
+
+    def __init__(self, cache_mode: str | None = None, cache_dir: str | Path | None = None, cache_ttl: float | None = None):
         self.sess = requests.Session()
         self.sess.headers.update({
             "User-Agent": "Mozilla/5.0 (compatible; amore-crawl/1.0)"
         })
+        adapter = HTTPAdapter(pool_connections=_POOL_SIZE, pool_maxsize=_POOL_SIZE)
+        self.sess.mount("https://", adapter)
+        self.sess.mount("http://", adapter)
+
+        self.cache_mode = (cache_mode or _CACHE_MODE).lower()
+        if self.cache_mode not in ("off", "cache", "record", "replay"):
+            raise ValueError(f"unknown HTTP_CACHE_MODE: {self.cache_mode}")
+        self.cache_ttl = _CACHE_TTL if cache_ttl is None else float(cache_ttl)
+        self.cache = ResponseCache(cache_dir or _CACHE_DIR) if self.cache_mode != "off" else None
+        self.stats = {"network": 0, "cache_hit": 0, "revalidated": 0}
+        self._stats_lock = threading.Lock()
+
+    def _count(self, name: str) -> None:
+        with self._stats_lock:
+            self.stats[name] += 1
+
+    def log_stats(self) -> None:
+        log.info(f"http mode={self.cache_mode} {self.stats}")
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        if self.cache is None:
+            return self._fetch(url, **kwargs)
+
+        # 캐시 키는 params까지 반영된 최종 URL
+        prepared = requests.Request("GET", url, params=kwargs.pop("params", None)).prepare()
+        full_url = prepared.url
+        key = ResponseCache.key("GET", full_url)
+        hit = self.cache.load(key)
+
+        if self.cache_mode == "replay":
+            if hit is None:
+                raise CacheMiss(f"no recorded response for {full_url}")
+            self._count("cache_hit")
+            return _cached_response(*hit, full_url)
+
+        if self.cache_mode == "cache" and hit is not None:
+            meta, body = hit
+            if time.time() - float(meta.get("stored_at", 0)) < self.cache_ttl:
+                self._count("cache_hit")
+                return _cached_response(meta, body, full_url)
+
+            # 조건부 재검증
+            h = CaseInsensitiveDict(meta.get("headers") or {})
+            cond = {}
+            if h.get("etag"):
+                cond["If-None-Match"] = h["etag"]
+            if h.get("last-modified"):
+                cond["If-Modified-Since"] = h["last-modified"]
+            if cond:
+                headers = {**(kwargs.pop("headers", None) or {}), **cond}
+                resp = self._fetch(full_url, headers=headers, allow_304=True, **kwargs)
+                if resp.status_code == 304:
+                    self._count("revalidated")
+                    self.cache.touch(key)
+                    return _cached_response(meta, body, full_url)
+                self.cache.store(key, resp)
+                return resp
+
+        resp = self._fetch(full_url, **kwargs)
+        self.cache.store(key, resp)
+        return resp
 
     @retry(
         reraise=True,
@@ -22,8 +183,11 @@ class HttpClient:
         wait=wait_exponential(multiplier=1, min=1, max=10),
         retry=retry_if_exception_type((requests.RequestException,)),
     )
-    def get(self, url: str, **kwargs) -> requests.Response:
+    def _fetch(self, url: str, allow_304: bool = False, **kwargs) -> requests.Response:
         timeout = kwargs.pop("timeout", _TIMEOUT)
         resp = self.sess.get(url, timeout=timeout, **kwargs)
-        resp.raise_for_status()
+        self._count("network")
+        if not (allow_304 and resp.status_code == 304):
+            resp.raise_for_status()
+        resp.from_cache = False
         return resp
@@ -0,0 +1,80 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from datetime import date
+from pathlib import Path
+from typing import Any, Optional
+
+from .logger import get_logger
+
+log = get_logger("journal")
+
+_JOURNAL_DIR = os.getenv("JOURNAL_DIR", "./data/_journal")
+
+def _run_date() -> str:
+    rd = os.getenv("RUN_DATE")
+    return rd if rd else date.today().isoformat()
+
+class Journal:
+    """
+    stage별 append-only 진행 기록 (SQLite, 단위마다 commit → 프로세스가 죽어도 완료분 보존).
+    unit: prod_sn / "offset:40" / concern_type 등 stage 안에서 유일한 키
+    payload: 그 단위의 결과(JSON 직렬화 가능한 값)
+
+    resume=False면 같은 stage/run_date의 이전 기록을 지우고 새로 시작.
+    """
+
+    def __init__(self, stage: str, resume: bool = False, run_date: Optional[str] = None, root: str | Path = _JOURNAL_DIR):
+        self.stage = stage
+        self.path = Path(root) / f"{stage}_{run_date or _run_date()}.sqlite"
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if not resume and self.path.exists():
+            self.path.unlink()
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS units (unit TEXT PRIMARY KEY, payload TEXT NOT NULL, done_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+
+        n = len(self.done()) if resume else 0
+        if resume:
+            log.info(f"resume stage={stage} completed_units={n} journal={self.path}")
+
+    def done(self) -> dict[str, Any]:
+        with self._lock:
+            cur = self._conn.execute("SELECT unit, payload FROM units")
+            return {u: json.loads(p) for u, p in cur.fetchall()}
+
+    def record(self, unit, payload: Any) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO units (unit, payload, done_at) VALUES (?, ?, ?)",
+                (str(unit), json.dumps(payload, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def finish(self) -> None:
+        """최종 테이블 저장이 끝난 뒤 호출 → 기록 삭제"""
+        self.close()
+        for suffix in ("", "-wal", "-shm"):
+            p = Path(str(self.path) + suffix)
+            if p.exists():
+                p.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        # 실패로 빠져나가면 기록을 남겨 --resume에 사용
+        self.close()
+        return False
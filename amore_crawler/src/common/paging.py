@@ -0,0 +1,148 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from .amore_api import get_items
+from .journal import Journal
+from .logger import get_logger
+
+log = get_logger("paging")
+
+# 응답에서 전체 건수를 찾을 후보 경로
+_TOTAL_KEYS = [
+    ("totalCount",),
+    ("total",),
+    ("totalElements",),
+    ("totalCnt",),
+    ("data", "totalCount"),
+    ("data", "total"),
+    ("pageInfo", "totalCount"),
+    ("page", "totalElements"),
+]
+
+class RateLimiter:
+    """
+    여러 스레드/여러 브랜드가 공유하는 politeness 예산 (token bucket).
+    rate_per_sec <= 0 이면 제한 없음.
+    """
+
+    def __init__(self, rate_per_sec: float, burst: int = 1):
+        self.rate = float(rate_per_sec)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        if self.rate <= 0:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+def read_total(payload: dict) -> Optional[int]:
+    for path in _TOTAL_KEYS:
+        cur = payload
+        for k in path:
+            cur = cur.get(k) if isinstance(cur, dict) else None
+        if isinstance(cur, (int, float)) and cur >= 0:
+            return int(cur)
+        if isinstance(cur, str) and cur.isdigit():
+            return int(cur)
+    return None
+
+def fetch_all_pages(
+    fetch: Callable[[int], dict],
+    limit: int,
+    max_in_flight: int = 4,
+    limiter: Optional[RateLimiter] = None,
+    max_offset: int = 50000,
+    key: str = "onlineProdSn",
+    journal: Optional[Journal] = None,
+    journal_prefix: str = "",
+) -> list[tuple[int, dict]]:
+    """
+    offset 페이징을 동시에 수행하고 (offset, item)을 페이지 순서대로 반환.
+    - 첫 페이지에서 전체 건수를 읽으면 나머지 offset을 한 번에 예약
+    - 못 읽으면 max_in_flight개씩 선행 요청(probe)하다가 빈 페이지를 만나면 중단
+    - key(prod_sn) 기준으로 먼저 나온 항목만 유지
+    - journal이 있으면 페이지마다 기록하고, 이미 기록된 offset은 다시 요청하지 않음
+    """
+    limiter = limiter or RateLimiter(0)
+    journaled = journal.done() if journal is not None else {}
+
+    def _get(offset: int) -> list[dict]:
+        unit = f"{journal_prefix}offset:{offset}"
+        if unit in journaled:
+            return journaled[unit]
+        limiter.acquire()
+        items = get_items(fetch(offset))
+        if journal is not None:
+            journal.record(unit, items)
+        return items
+
+    first_unit = f"{journal_prefix}first"
+    if first_unit in journaled:
+        total = journaled[first_unit]["total"]
+        pages: dict[int, list[dict]] = {0: journaled[first_unit]["items"]}
+    else:
+        limiter.acquire()
+        first = fetch(0)
+        total = read_total(first)
+        pages = {0: get_items(first)}
+        if journal is not None:
+            journal.record(first_unit, {"total": total, "items": pages[0]})
+    if not pages[0]:
+        return []
+
+    with ThreadPoolExecutor(max_workers=max(1, int(max_in_flight))) as ex:
+        if total is not None:
+            offsets = list(range(limit, min(total, max_offset + limit), limit))
+            for off, items in zip(offsets, ex.map(_get, offsets)):
+                pages[off] = items
+            if total > max_offset + limit:
+                log.warning(f"total={total} exceeds safety limit offset={max_offset}, truncating")
+        else:
+            offset = limit
+            exhausted = False
+            while not exhausted and offset <= max_offset:
+                window = [offset + i * limit for i in range(max(1, int(max_in_flight)))]
+                window = [o for o in window if o <= max_offset]
+                for off, items in zip(window, ex.map(_get, window)):
+                    if not items:
+                        exhausted = True
+                        break
+                    pages[off] = items
+                offset = window[-1] + limit
+            if not exhausted:
+                log.warning("offset exceeded safety limit, stopping")
+
+    out: list[tuple[int, dict]] = []
+    seen = set()
+    for off in sorted(pages):
+        for it in pages[off]:
+            k = it.get(key)
+            if k is not None:
+                if k in seen:
+                    continue
+                seen.add(k)
+            out.append((off, it))
+
+    log.info(f"paged total={total} pages={len(pages)} items={len(out)}")
+    return out
+
+def paging_options(cfg: dict) -> dict:
+    """targets.yaml run 섹션의 동시성/politeness 설정"""
+    run = cfg.get("run", {}) or {}
+    return {
+        "max_in_flight": int(run.get("max_in_flight", 4)),
+        "requests_per_sec": float(run.get("requests_per_sec", 6)),
+    }
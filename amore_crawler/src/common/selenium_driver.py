@@ -1,15 +1,80 @@
 import os
+import threading
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
 from webdriver_manager.chrome import ChromeDriverManager
 
-def create_driver():
+from .logger import get_logger
+
+log = get_logger("selenium_driver")
+
+_DRIVER_PATH = None
+_DRIVER_PATH_LOCK = threading.Lock()
+
+# 프로필 (기본 full, SELENIUM_PROFILE로 기본값 변경)
+# - full   : 브라우저 기본 동작 그대로 (모든 리소스 로드)
+# - scrape : DOM 속성(img src/data-src, a[href])만 필요할 때. 이미지/미디어/폰트/트래커 차단 + eager 로드
+#            렌더링된 이미지/레이아웃에 의존하지 않는 수집기만 profile="scrape"를 명시해서 사용
+PROFILES = ("full", "scrape")
+
+# scrape 프로필에서 CDP Network.setBlockedURLs로 막을 패턴
+# (img 태그의 src 속성은 그대로 DOM에 남으므로 URL 수집에는 영향 없음)
+_BLOCKED_EXTS = [
+    # 이미지
+    "jpg", "jpeg", "png", "gif", "webp", "avif", "bmp", "ico", "svg",
+    # 미디어
+    "mp4", "webm", "m3u8", "mp3",
+    # 폰트
+    "woff", "woff2", "ttf", "otf", "eot",
+]
+_BLOCKED_DOMAINS = [
+    # 트래커/광고
+    "google-analytics.com", "googletagmanager.com", "doubleclick.net",
+    "facebook.net", "connect.facebook.com", "criteo.", "kakao.ad",
+    "analytics.naver.com", "wcs.naver.net", "hotjar.com", "clarity.ms",
+    "appsflyer.com", "braze.com",
+]
+BLOCKED_URL_PATTERNS = (
+    [f"*.{ext}" for ext in _BLOCKED_EXTS]
+    + [f"*.{ext}?*" for ext in _BLOCKED_EXTS]   # 쿼리스트링(리사이즈 파라미터 등) 붙은 경우
+    + [f"*{d}*" for d in _BLOCKED_DOMAINS]
+)
+
+# scrape 프로필에서 끄는 Chrome 기능
+_SCRAPE_ARGS = [
+    "--blink-settings=imagesEnabled=false",
+    "--autoplay-policy=user-gesture-required",
+    "--mute-audio",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-background-timer-throttling",
+    "--disable-default-apps",
+    "--disable-sync",
+    "--disable-translate",
+    "--disable-notifications",
+    "--no-first-run",
+    "--disable-features=Translate,MediaRouter,OptimizationHints,AutofillServerCommunication,InterestFeedContentSuggestions",
+]
+
+def _driver_path() -> str:
+    # 드라이버 풀에서 동시에 호출돼도 다운로드/설치는 한 번만
+    global _DRIVER_PATH
+    with _DRIVER_PATH_LOCK:
+        if _DRIVER_PATH is None:
+            _DRIVER_PATH = ChromeDriverManager().install()
+        return _DRIVER_PATH
+
+def create_driver(profile: str | None = None):
     headless = os.getenv("SELENIUM_HEADLESS", "1") == "1"
     browser = os.getenv("SELENIUM_BROWSER", "chrome").lower()
     if browser != "chrome":
         raise ValueError("현재 구현은 chrome만 지원합니다.")
 
+    profile = (profile or os.getenv("SELENIUM_PROFILE", "full")).lower()
+    if profile not in PROFILES:
+        raise ValueError(f"unknown SELENIUM_PROFILE: {profile} (choose {PROFILES})")
+
     options = Options()
     if headless:
         options.add_argument("--headless=new")
@@ -18,9 +83,27 @@ def create_driver():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1920,1080")
 
+    if profile == "scrape":
+        # DOMContentLoaded까지만 기다림 (이미지/서브리소스 load 이벤트 대기 안 함)
+        options.page_load_strategy = "eager"
+        for arg in _SCRAPE_ARGS:
+            options.add_argument(arg)
+        options.add_experimental_option("prefs", {
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+
     # Service로 driver path를 넘김
-    service = Service(ChromeDriverManager().install())
+    service = Service(_driver_path())
 
     driver = webdriver.Chrome(service=service, options=options)
     driver.set_page_load_timeout(30)
+
+    if profile == "scrape":
+        try:
+            driver.execute_cdp_cmd("Network.enable", {})
+            driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": BLOCKED_URL_PATTERNS})
+        except Exception as e:
+            # CDP 미지원 환경이면 차단 없이 진행 (나머지 프로필 설정은 유지)
+            log.warning(f"CDP request blocking unavailable: {e}")
     return driver
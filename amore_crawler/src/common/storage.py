@@ -1,7 +1,32 @@
+import json
 import os
-from datetime import date
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import date, datetime
 from pathlib import Path
+from typing import Optional
+
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+try:
+    import fcntl
+except ImportError:  # Windows: 단일 writer 전제
+    fcntl = None
+
+# partitioned: {out_dir}/{prefix}/run_date=YYYY-MM-DD/part-*.parquet + _manifest.json
+# flat: {out_dir}/{prefix}_{run_date}.parquet (이전 방식). csv 출력은 항상 flat
+_LAYOUT = os.getenv("STORAGE_LAYOUT", "partitioned").lower()
+
+MANIFEST_NAME = "_manifest.json"
+# compaction 시 manifest에 없는 파일을 지우기 전 대기 (쓰는 중인 part 보호)
+_ORPHAN_GRACE_S = 3600
 
 def _run_date() -> str:
     rd = os.getenv("RUN_DATE")
@@ -12,7 +37,116 @@ def ensure_dir(path: str | Path) -> Path:
     p.mkdir(parents=True, exist_ok=True)
     return p
 
-def save_table(df: pd.DataFrame, out_dir: str | Path, name_prefix: str):
+# ============================================================
+# partitioned layout + manifest
+# ============================================================
+def table_root(out_dir: str | Path, prefix: str) -> Path:
+    return Path(out_dir) / prefix
+
+def _partition_dir(root: Path, run_date: str) -> Path:
+    return root / f"run_date={run_date}"
+
+@contextmanager
+def _manifest_lock(root: Path):
+    """manifest read-modify-write 구간 (프로세스 간 배타)"""
+    ensure_dir(root)
+    with open(root / "_manifest.lock", "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def read_manifest(root: Path) -> dict:
+    """
+    {"latest": run_date | None,
+     "partitions": {run_date: {"files": [...], "rows": n, "complete": bool, "updated_at": ...}}}
+    """
+    try:
+        with open(root / MANIFEST_NAME, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {"latest": None, "partitions": {}}
+
+def _write_manifest(root: Path, manifest: dict) -> None:
+    done = [rd for rd, p in manifest["partitions"].items() if p.get("complete") and p.get("files")]
+    manifest["latest"] = max(done) if done else None
+    tmp = root / f".{MANIFEST_NAME}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=1)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, root / MANIFEST_NAME)
+
+def _part_name() -> str:
+    return f"part-{time.time_ns()}-{uuid.uuid4().hex[:8]}.parquet"
+
+def _to_parquet(data: pd.DataFrame | pa.Table, path: Path) -> None:
+    if isinstance(data, pa.Table):
+        pq.write_table(data, path)
+    else:
+        data.to_parquet(path, index=False)
+
+def _write_part(data: pd.DataFrame | pa.Table, part_dir: Path, name: Optional[str] = None) -> str:
+    """고유 이름으로 tmp에 쓴 뒤 rename (manifest에 올라가기 전까지 reader에게 보이지 않음)"""
+    ensure_dir(part_dir)
+    name = name or _part_name()
+    tmp = part_dir / f".{name}.tmp"
+    _to_parquet(data, tmp)
+    os.replace(tmp, part_dir / name)
+    return name
+
+def _commit_part(root: Path, run_date: str, name: str, rows: int, append: bool, complete: bool) -> list[str]:
+    """manifest에 part 등록. 반환: 교체되어 더 이상 참조되지 않는 파일들"""
+    with _manifest_lock(root):
+        manifest = read_manifest(root)
+        prev = manifest["partitions"].get(run_date) or {"files": [], "rows": 0}
+        if append:
+            files, total, stale = prev["files"] + [name], prev["rows"] + rows, []
+        else:
+            files, total, stale = [name], rows, prev["files"]
+        manifest["partitions"][run_date] = {
+            "files": files,
+            "rows": total,
+            "complete": complete,
+            "updated_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        }
+        _write_manifest(root, manifest)
+    return stale
+
+def _unlink_parts(part_dir: Path, names: list[str]) -> None:
+    for name in names:
+        try:
+            (part_dir / name).unlink()
+        except FileNotFoundError:
+            pass
+
+def _parquet_path(out_dir: Path, name_prefix: str, run_date: str, name: str) -> Path:
+    if _LAYOUT == "flat":
+        return out_dir / f"{name_prefix}_{run_date}.parquet"
+    return _partition_dir(table_root(out_dir, name_prefix), run_date) / name
+
+def _write_table(
+    data: pd.DataFrame | pa.Table, out_dir: Path, name_prefix: str, run_date: str, name: str, append: bool, complete: bool
+) -> None:
+    if _LAYOUT == "flat":
+        _to_parquet(data, _parquet_path(out_dir, name_prefix, run_date, name))
+        return
+    root = table_root(out_dir, name_prefix)
+    part_dir = _partition_dir(root, run_date)
+    _write_part(data, part_dir, name)
+    stale = _commit_part(root, run_date, name, data.num_rows if isinstance(data, pa.Table) else len(data), append, complete)
+    _unlink_parts(part_dir, stale)
+
+def save_table(df: pd.DataFrame, out_dir: str | Path, name_prefix: str, append: bool = False, complete: bool = True):
+    """
+    append=False: 같은 run_date partition을 이 df로 교체 (기존 part는 manifest 교체 후 삭제)
+    append=True: 같은 run_date partition에 part 추가 (증분 적재)
+    complete=False: partition을 기록만 하고 latest로는 노출하지 않음 (여러 번 append 후 마지막에 complete=True)
+    memory_handoff 안에서는 Arrow table로 메모리에 올리고 파일 쓰기는 writer 스레드로 넘김 (반환 경로는 같음)
+    """
     fmt = os.getenv("OUTPUT_FORMAT", "parquet").lower()
     run_date = _run_date()
     out_dir = ensure_dir(out_dir)
@@ -22,20 +156,319 @@ def save_table(df: pd.DataFrame, out_dir: str | Path, name_prefix: str):
         df.to_csv(out, index=False, encoding="utf-8-sig")
         return out
 
-    out = out_dir / f"{name_prefix}_{run_date}.parquet"
-    df.to_parquet(out, index=False)
-    return out
+    name = _part_name()
+    if _HANDOFF is not None:
+        _HANDOFF.save(df, out_dir, name_prefix, run_date, name, append, complete)
+    else:
+        _write_table(df, out_dir, name_prefix, run_date, name, append, complete)
+    return _parquet_path(out_dir, name_prefix, run_date, name)
+
+def compact_table(out_dir: str | Path, prefix: str, keep: Optional[int] = None) -> dict:
+    """
+    - part가 여러 개인 partition을 하나로 합침 (쓰는 동안 다른 writer가 partition을 바꾸면 그 partition은 건너뜀)
+    - keep: 최근 complete partition N개만 남기고 나머지 삭제
+    - manifest에 없는 오래된 part/tmp 파일 정리 (죽은 writer 잔여물)
+    """
+    if keep is not None and keep < 1:
+        raise ValueError("keep must be >= 1")
+    root = table_root(out_dir, prefix)
+    stats = {"compacted": 0, "dropped": 0, "orphans": 0}
+
+    for run_date, part in read_manifest(root)["partitions"].items():
+        files = list(part["files"])
+        if len(files) < 2:
+            continue
+        part_dir = _partition_dir(root, run_date)
+        merged = _read_parquet_files([part_dir / f for f in files])
+        name = _write_part(merged, part_dir)
+
+        with _manifest_lock(root):
+            manifest = read_manifest(root)
+            cur = manifest["partitions"].get(run_date)
+            if cur is None or cur["files"] != files:
+                ok = False
+            else:
+                cur["files"] = [name]
+                cur["rows"] = len(merged)
+                _write_manifest(root, manifest)
+                ok = True
+        _unlink_parts(part_dir, files if ok else [name])
+        stats["compacted"] += int(ok)
 
-def load_latest_table(in_dir: str | Path, prefix: str) -> pd.DataFrame:
+    if keep is not None:
+        with _manifest_lock(root):
+            manifest = read_manifest(root)
+            done = sorted(rd for rd, p in manifest["partitions"].items() if p.get("complete"))
+            drop = done[:-keep]
+            for rd in drop:
+                manifest["partitions"].pop(rd)
+            _write_manifest(root, manifest)
+        for rd in drop:
+            part_dir = _partition_dir(root, rd)
+            if part_dir.exists():
+                for p in part_dir.glob("*"):
+                    p.unlink()
+                part_dir.rmdir()
+        stats["dropped"] = len(drop)
+
+    referenced = {(rd, f) for rd, p in read_manifest(root)["partitions"].items() for f in p["files"]}
+    now = time.time()
+    for p in root.glob("run_date=*/*"):
+        rd = p.parent.name.split("=", 1)[1]
+        if (rd, p.name) not in referenced and now - p.stat().st_mtime > _ORPHAN_GRACE_S:
+            p.unlink()
+            stats["orphans"] += 1
+
+    return stats
+
+# ============================================================
+# load
+# ============================================================
+def _parse_run_date(name: str, prefix: str) -> Optional[str]:
+    """{prefix}_{YYYY-MM-DD}.parquet|csv → run_date. prefix가 다른 테이블(detail_urls vs detail_urls_all)은 None"""
+    m = re.fullmatch(re.escape(prefix) + r"_(\d{4}-\d{2}-\d{2})\.(parquet|csv)", name)
+    if not m:
+        return None
+    try:
+        return date.fromisoformat(m.group(1)).isoformat()
+    except ValueError:
+        return None
+
+def _latest_flat(in_dir: Path, prefix: str) -> Optional[tuple[str, Path]]:
+    """
+    flat 파일 중 run_date가 가장 늦은 것. 같은 run_date에 parquet/csv가 모두 있으면 나중에 쓴 파일
+    (glob 결과를 이어 붙여 사전순으로 고르면 오래된 csv가 새 parquet보다 뒤로 올 수 있음)
+    RUN_DATE를 날짜가 아닌 값(밑줄 없는 한 단어, 예: {prefix}_dev.parquet)으로 저장한 파일만 있으면 수정 시각 기준.
+    다른 테이블 파일(prefix=detail_urls일 때 detail_urls_all_*)은 어느 쪽에도 들어가지 않음.
+    """
+    other_re = re.compile(re.escape(prefix) + r"_[^_]+\.(parquet|csv)")
+    dated, other = [], []
+    for p in in_dir.glob(f"{prefix}_*"):
+        if p.suffix not in (".parquet", ".csv") or not p.is_file():
+            continue
+        rd = _parse_run_date(p.name, prefix)
+        if rd is not None:
+            dated.append((rd, p.stat().st_mtime, p))
+        elif other_re.fullmatch(p.name):
+            other.append(("", p.stat().st_mtime, p))
+    candidates = dated or other
+    if not candidates:
+        return None
+    rd, _, p = max(candidates, key=lambda c: (c[0], c[1]))
+    return rd, p
+
+def latest_table_files(in_dir: str | Path, prefix: str) -> list[Path]:
+    """
+    최근 run_date 테이블을 이루는 파일들.
+    partitioned는 manifest의 latest complete partition (디렉터리 glob 없음), flat 파일과는 run_date로 비교.
+    """
     in_dir = Path(in_dir)
-    files = sorted(in_dir.glob(f"{prefix}_*.parquet")) + sorted(in_dir.glob(f"{prefix}_*.csv"))
-    if not files:
-        raise FileNotFoundError(f"No files found in {in_dir} for prefix={prefix}")
-
-    latest = files[-1]
-    if latest.suffix == ".csv":
-        return pd.read_csv(latest)
-    return pd.read_parquet(latest)
+    if _HANDOFF is not None:
+        # writer 스레드에 남은 이 테이블 쓰기가 끝난 뒤의 manifest
+        _HANDOFF.wait(in_dir, prefix)
+    root = table_root(in_dir, prefix)
+    manifest = read_manifest(root)
+    flat = _latest_flat(in_dir, prefix)
+
+    latest = manifest.get("latest")
+    if latest and (flat is None or latest >= flat[0]):
+        part_dir = _partition_dir(root, latest)
+        return [part_dir / f for f in manifest["partitions"][latest]["files"]]
+    if flat is not None:
+        return [flat[1]]
+    raise FileNotFoundError(f"No files found in {in_dir} for prefix={prefix}")
+
+def _to_expression(filters) -> Optional[ds.Expression]:
+    if filters is None or isinstance(filters, ds.Expression):
+        return filters
+    # [("prod_sn", "in", [...]), ...] / [[...], [...]] (pyarrow DNF 형식)
+    return pq.filters_to_expression(filters)
+
+def _read_parquet_files(files: list[Path], columns: Optional[list[str]] = None, expr=None) -> pd.DataFrame:
+    if len(files) == 1:
+        if columns is None and expr is None:
+            return pd.read_parquet(files[0])
+        return pd.read_parquet(files[0], columns=columns, filters=expr)
+    # append part마다 스키마가 조금 다를 수 있음 (전부 null인 컬럼 등)
+    schema = pa.unify_schemas([pq.read_schema(f) for f in files], promote_options="permissive")
+    dataset = ds.dataset([str(f) for f in files], format="parquet", schema=schema)
+    return dataset.to_table(columns=columns, filter=expr).to_pandas()
+
+def load_latest_table(
+    in_dir: str | Path,
+    prefix: str,
+    columns: Optional[list[str]] = None,
+    filters=None,
+) -> pd.DataFrame:
+    """
+    가장 최근 run_date의 테이블.
+    columns: 필요한 컬럼만 읽음 (parquet은 해당 column chunk만 I/O)
+    filters: pyarrow Expression 또는 [("col", "op", value), ...] — parquet은 row group 통계로 건너뛰며 스캔
+    """
+    expr = _to_expression(filters)
+
+    if _HANDOFF is not None:
+        table = _HANDOFF.get(in_dir, prefix)
+        if table is not None:
+            return _table_to_frame(table, columns, expr)
+
+    for attempt in range(2):
+        files = latest_table_files(in_dir, prefix)
+        if files[0].suffix == ".csv":
+            df = pd.read_csv(files[0], usecols=columns)
+            if expr is not None:
+                df = pa.Table.from_pandas(df, preserve_index=False).filter(expr).to_pandas()
+            return df[columns] if columns else df
+        try:
+            return _read_parquet_files(files, columns, expr)
+        except FileNotFoundError:
+            # 읽는 사이 같은 partition이 교체/compaction됨 → manifest 다시 읽기
+            if attempt:
+                raise
+
+def load_file(path: str | Path, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    """고정 경로 parquet (product_keywords 등). memory_handoff 중 publish_file된 것이 있으면 메모리에서"""
+    if _HANDOFF is not None:
+        table = _HANDOFF.get(path)
+        if table is not None:
+            return _table_to_frame(table, columns, None)
+    return pd.read_parquet(path, columns=columns)
+
+def publish_file(path: str | Path, table: pa.Table) -> None:
+    """직접 쓴 고정 경로 parquet의 내용을 같은 프로세스의 다음 stage에 넘김 (memory_handoff 밖에서는 no-op)"""
+    if _HANDOFF is not None:
+        _HANDOFF.put(table, path)
+
+# ============================================================
+# in-process handoff (run_pipeline --in-process)
+# ============================================================
+def _handoff_key(path: str | Path, prefix: Optional[str] = None) -> str:
+    p = Path(path).resolve()
+    return str(p / prefix) if prefix is not None else str(p)
+
+def _table_to_frame(table: pa.Table, columns: Optional[list[str]], expr) -> pd.DataFrame:
+    if columns is not None or expr is not None:
+        # projection은 buffer 공유, filter는 남는 행만 새로 만듦
+        table = ds.dataset(table).to_table(columns=columns, filter=expr)
+    # 기본 변환(블록 통합)은 numpy 배열을 새로 만듦 → pd.read_parquet 결과처럼 쓰기 가능.
+    # split_blocks 등 zero-copy 변환은 숫자 컬럼이 읽기 전용이 되어 stage 코드의 df.loc[...] = ...가
+    # in-process에서만 실패하므로 쓰지 않음 (parquet 인코딩/디코딩과 디스크 I/O는 여전히 생략)
+    return table.to_pandas()
+
+class _Handoff:
+    """
+    같은 프로세스에서 도는 stage끼리 테이블을 Arrow table로 주고받음.
+    - save_table: DataFrame → Arrow 변환 한 번, 파일 쓰기는 writer 스레드 하나가 순서대로 처리
+    - load_latest_table: 메모리에 있으면 parquet을 다시 읽지 않음. 없으면 그 테이블의 남은 쓰기를 기다린 뒤 디스크
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables: dict[str, tuple[int, pa.Table]] = {}   # key -> (version, table)
+        self._pending: dict[str, list[Future]] = {}
+        self._seq = 0
+        self._errors: list[str] = []
+        self._writer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="table-writer")
+
+    def put(self, table: pa.Table, path: str | Path, prefix: Optional[str] = None) -> None:
+        with self._lock:
+            self._seq += 1
+            self._tables[_handoff_key(path, prefix)] = (self._seq, table)
+
+    def get(self, path: str | Path, prefix: Optional[str] = None) -> Optional[pa.Table]:
+        with self._lock:
+            hit = self._tables.get(_handoff_key(path, prefix))
+        return hit[1] if hit else None
+
+    def version(self, path: str | Path, prefix: Optional[str] = None) -> Optional[int]:
+        with self._lock:
+            hit = self._tables.get(_handoff_key(path, prefix))
+        return hit[0] if hit else None
+
+    def release(self, path: str | Path, prefix: Optional[str] = None) -> None:
+        with self._lock:
+            self._tables.pop(_handoff_key(path, prefix), None)
+
+    def wait(self, path: str | Path, prefix: Optional[str] = None) -> None:
+        with self._lock:
+            futs = list(self._pending.get(_handoff_key(path, prefix), []))
+        wait(futs)
+
+    def _write(self, key: str, fn, *args) -> None:
+        try:
+            fn(*args)
+        except Exception as e:
+            self._errors.append(f"{key}: {e!r}")
+            raise
+
+    def save(
+        self, df: pd.DataFrame, out_dir: Path, name_prefix: str, run_date: str, name: str, append: bool, complete: bool
+    ) -> None:
+        key = _handoff_key(out_dir, name_prefix)
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        with self._lock:
+            if append or not complete:
+                # 메모리에는 latest 전체 테이블만 둠 → 이후 읽기는 쓰기가 끝난 뒤 디스크에서
+                self._tables.pop(key, None)
+            else:
+                self._seq += 1
+                self._tables[key] = (self._seq, table)
+            fut = self._writer.submit(
+                self._write, key, _write_table, table, out_dir, name_prefix, run_date, name, append, complete
+            )
+            futs = [f for f in self._pending.get(key, []) if not f.done()]
+            self._pending[key] = futs + [fut]
+
+    def after_writes(self, fn, *args) -> None:
+        """지금까지 넘긴 쓰기가 모두 성공한 뒤 writer 스레드에서 fn 실행 (실패가 있었으면 실행하지 않음)"""
+        def run():
+            if not self._errors:
+                fn(*args)
+        self._writer.submit(run)
+
+    def close(self) -> None:
+        self._writer.shutdown(wait=True)
+        with self._lock:
+            self._tables.clear()
+            self._pending.clear()
+        if self._errors:
+            raise RuntimeError(f"table write failed: {self._errors}")
+
+_HANDOFF: Optional[_Handoff] = None
+
+@contextmanager
+def memory_handoff():
+    """
+    이 블록 안의 save_table/load_latest_table은 메모리로 테이블을 넘기고 파일은 백그라운드에서 씀.
+    블록을 나갈 때 남은 쓰기를 모두 기다림 (디스크 결과는 handoff 없이 실행한 것과 같음).
+    """
+    global _HANDOFF
+    if _HANDOFF is not None:
+        raise RuntimeError("memory_handoff already active")
+    _HANDOFF = _Handoff()
+    try:
+        yield _HANDOFF
+    finally:
+        try:
+            _HANDOFF.close()
+        finally:
+            _HANDOFF = None
+
+def memory_version(path: str | Path, prefix: Optional[str] = None) -> Optional[int]:
+    """메모리에 올라간 테이블의 버전 (바뀌면 증가). handoff 밖이거나 메모리에 없으면 None"""
+    return _HANDOFF.version(path, prefix) if _HANDOFF is not None else None
+
+def release_memory(path: str | Path, prefix: Optional[str] = None) -> None:
+    """더 읽을 stage가 없는 테이블을 메모리에서 내림 (이후 읽기는 디스크)"""
+    if _HANDOFF is not None:
+        _HANDOFF.release(path, prefix)
+
+def run_after_writes(fn, *args) -> None:
+    """handoff 중이면 남은 쓰기가 끝난 뒤 실행, 아니면 바로 실행"""
+    if _HANDOFF is not None:
+        _HANDOFF.after_writes(fn, *args)
+    else:
+        fn(*args)
 
 def dedupe(df: pd.DataFrame, subset: list[str]) -> pd.DataFrame:
     return df.drop_duplicates(subset=subset, keep="last").reset_index(drop=True)
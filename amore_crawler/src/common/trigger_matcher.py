@@ -0,0 +1,57 @@
+from collections import deque
+from typing import Iterable
+
+class TriggerMatcher:
+    """
+    여러 trigger 문자열을 한 번에 찾는 Aho-Corasick 오토마톤.
+    match(text)는 text에 부분 문자열로 들어 있는 pattern id 집합 (겹치는 매칭 포함, "선크림" → 선크림/크림).
+    텍스트 길이에 선형이고 pattern 수와 무관하다.
+    """
+
+    def __init__(self, patterns: Iterable[str]):
+        self.patterns = list(patterns)
+        goto: list[dict[str, int]] = [{}]
+        out: list[frozenset] = [frozenset()]
+        terminal: list[list[int]] = [[]]
+
+        for pid, p in enumerate(self.patterns):
+            s = 0
+            for ch in p:
+                nxt = goto[s].get(ch)
+                if nxt is None:
+                    nxt = len(goto)
+                    goto[s][ch] = nxt
+                    goto.append({})
+                    terminal.append([])
+                s = nxt
+            terminal[s].append(pid)
+
+        # BFS로 failure link 계산 + output 집합을 failure 체인까지 합쳐 둠
+        fail = [0] * len(goto)
+        out = [frozenset(t) for t in terminal]
+        q = deque(goto[0].values())
+        while q:
+            s = q.popleft()
+            for ch, nxt in goto[s].items():
+                q.append(nxt)
+                f = fail[s]
+                while f and ch not in goto[f]:
+                    f = fail[f]
+                fail[nxt] = goto[f].get(ch, 0) if s else 0
+                out[nxt] = out[nxt] | out[fail[nxt]]
+
+        self._goto = goto
+        self._fail = fail
+        self._out = out
+
+    def match(self, text: str) -> frozenset:
+        goto, fail, out = self._goto, self._fail, self._out
+        found = set(out[0])  # 빈 pattern은 항상 매칭
+        s = 0
+        for ch in text:
+            while s and ch not in goto[s]:
+                s = fail[s]
+            s = goto[s].get(ch, 0)
+            if out[s]:
+                found.update(out[s])
+        return frozenset(found)
@@ -0,0 +1,122 @@
+import threading
+import time
+from typing import Optional
+
+from selenium.common.exceptions import JavascriptException, TimeoutException
+
+from .logger import get_logger
+
+log = get_logger("waits")
+
+# 페이지에 MutationObserver와 fetch/XHR 카운터를 한 번 심어두고,
+# "마지막 DOM 변경(또는 요청 종료) 이후 quiet ms 경과 + 화면 안 이미지 로딩 완료
+#  (+ netIdle이면 진행 중인 fetch/XHR 없음)"이 되면 바로 반환.
+# timeout은 상한일 뿐(기존 고정 sleep 대신).
+_SETTLE_JS = """
+var quiet = arguments[0], timeout = arguments[1], scope = arguments[2], netIdle = arguments[3];
+var done = arguments[arguments.length - 1];
+var w = window.__amoreWait;
+if (!w) {
+  w = window.__amoreWait = {last: performance.now(), inflight: 0};
+  new MutationObserver(function () { w.last = performance.now(); }).observe(
+    document.documentElement,
+    {childList: true, subtree: true, attributes: true, attributeFilter: ['src', 'srcset']}
+  );
+  var begin = function () { w.inflight++; w.last = performance.now(); };
+  var end = function () { w.inflight = Math.max(0, w.inflight - 1); w.last = performance.now(); };
+  var send = XMLHttpRequest.prototype.send;
+  XMLHttpRequest.prototype.send = function () {
+    begin();
+    this.addEventListener('loadend', end);
+    try { return send.apply(this, arguments); } catch (e) { end(); throw e; }
+  };
+  if (window.fetch) {
+    var fetch0 = window.fetch;
+    window.fetch = function () {
+      begin();
+      try { return fetch0.apply(this, arguments).finally(end); } catch (e) { end(); throw e; }
+    };
+  }
+}
+var start = performance.now();
+function pendingImgs() {
+  var root = scope ? document.querySelector(scope) : document;
+  if (!root) return 0;
+  var imgs = root.querySelectorAll('img'), n = 0;
+  for (var i = 0; i < imgs.length; i++) {
+    var im = imgs[i];
+    if (im.complete) continue;
+    var r = im.getBoundingClientRect();
+    if (r.bottom > 0 && r.top < window.innerHeight) n++;
+  }
+  return n;
+}
+(function tick() {
+  var now = performance.now();
+  if (now - start >= timeout) { done(false); return; }
+  if (now - w.last >= quiet && pendingImgs() === 0 && !(netIdle && w.inflight > 0)) { done(true); return; }
+  setTimeout(tick, 50);
+})();
+"""
+
+class WaitStats:
+    """stage별 대기 시간 집계 (DriverPool worker 스레드들이 공유)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stages: dict[str, dict] = {}
+
+    def record(self, stage: str, seconds: float, settled: bool) -> None:
+        with self._lock:
+            st = self._stages.setdefault(stage, {"n": 0, "total_s": 0.0, "max_s": 0.0, "timeouts": 0})
+            st["n"] += 1
+            st["total_s"] += seconds
+            st["max_s"] = max(st["max_s"], seconds)
+            if not settled:
+                st["timeouts"] += 1
+
+    def summary(self) -> dict[str, dict]:
+        with self._lock:
+            return {
+                k: {
+                    "n": v["n"],
+                    "total_s": round(v["total_s"], 2),
+                    "avg_s": round(v["total_s"] / v["n"], 3) if v["n"] else 0.0,
+                    "max_s": round(v["max_s"], 3),
+                    "timeouts": v["timeouts"],
+                }
+                for k, v in self._stages.items()
+            }
+
+    def log_summary(self) -> None:
+        for stage, st in self.summary().items():
+            log.info(f"wait stage={stage} {st}")
+
+WAIT_STATS = WaitStats()
+
+def wait_for_settle(
+    driver,
+    stage: str,
+    quiet_ms: int = 300,
+    timeout_s: float = 3.0,
+    scope_css: Optional[str] = None,
+    stats: WaitStats = WAIT_STATS,
+    network_idle: bool = False,
+) -> bool:
+    """
+    DOM 변경이 quiet_ms 동안 없고 (scope_css 안의) 화면 내 이미지가 다 로드되면 True.
+    network_idle: 진행 중인 fetch/XHR이 없을 것도 요구 (무한 스크롤 추가 로딩 등)
+    timeout_s까지 안정되지 않으면 False (예외 없이 진행).
+    """
+    t0 = time.perf_counter()
+    settled = False
+    try:
+        driver.set_script_timeout(timeout_s + 5)
+        settled = bool(driver.execute_async_script(
+            _SETTLE_JS, int(quiet_ms), float(timeout_s) * 1000, scope_css, bool(network_idle)
+        ))
+    except (JavascriptException, TimeoutException) as e:
+        # 페이지 전환 중 등 스크립트 실패는 대기 실패로만 취급 (드라이버 crash는 그대로 전파)
+        log.debug(f"settle script failed stage={stage}: {e}")
+    stats.record(stage, time.perf_counter() - t0, settled)
+    return settled
@@ -1,8 +1,10 @@
 import json
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
+from src.common.frames import grouped_lists
 from src.common.logger import get_logger
 from src.common.storage import load_latest_table, save_table
 
@@ -20,17 +22,22 @@ def _to_json_list(xs) -> str:
     return json.dumps(list(xs), ensure_ascii=False)
 
 
-def _unique_preserve_order(seq):
-    out = []
-    for x in seq:
-        if x is None:
-            continue
-        x = str(x).strip()
-        if not x:
-            continue
-        if x not in out:
-            out.append(x)
-    return out
+def _clean_str(s: pd.Series) -> pd.Series:
+    """str(x).strip(), 결측/빈 문자열은 NA"""
+    s = s.astype("string").str.strip()
+    return s.mask(s == "")
+
+
+def _json_lists_by_prod(long: pd.DataFrame, prod_sns: pd.Series) -> list[str]:
+    """
+    long(prod_sn 정렬, 값 v) → prod_sns 순서의 JSON list 문자열 (값이 없는 상품은 "[]").
+    서로 다른 값만 json 인코딩하고 상품별로는 join → _to_json_list와 같은 문자열.
+    """
+    codes, uniques = pd.factorize(long["v"])
+    enc = np.asarray([json.dumps(v, ensure_ascii=False) for v in uniques], dtype=object)
+    lists = grouped_lists(pd.DataFrame({"prod_sn": long["prod_sn"].to_numpy(), "v": enc[codes]}), "prod_sn", ["v"])
+    s = prod_sns.to_frame().merge(lists, on="prod_sn", how="left")["v"]
+    return ["[" + ", ".join(xs) + "]" if isinstance(xs, list) else "[]" for xs in s]
 
 
 def build_category_aggregates(category_map: pd.DataFrame) -> pd.DataFrame:
@@ -40,19 +47,23 @@ def build_category_aggregates(category_map: pd.DataFrame) -> pd.DataFrame:
       - category_paths_all_json: ["스킨케어>클렌징>클렌징 폼", ...]
       - category_names_all_json: ["스킨케어","클렌징","클렌징 폼", ...] (depth1~3 flatten unique)
       - category_depth1_primary / category_depth2_primary / category_depth3_primary: 대표(첫 번째 path 기준)
+
+    groupby.apply 없이 한 번 정렬한 뒤 drop_duplicates / melt / offset 기반 list로 집계.
     """
     required = {"prod_sn", "category_path", "category_depth1", "category_depth2", "category_depth3"}
     missing = required - set(category_map.columns)
     if missing:
         raise RuntimeError(f"category_map missing columns: {sorted(missing)}")
 
+    depth_cols = ["category_depth1", "category_depth2", "category_depth3"]
+
     # prod_sn 정리
     cm = category_map.copy()
     cm = cm.dropna(subset=["prod_sn"])
     cm["prod_sn"] = cm["prod_sn"].astype(int)
 
     # path/depth 문자열 정리
-    for c in ["category_path", "category_depth1", "category_depth2", "category_depth3"]:
+    for c in ["category_path", *depth_cols]:
         cm[c] = cm[c].astype("string")
 
     # prod_sn별로 정렬 기준(있으면 collected_at 우선)
@@ -61,51 +72,35 @@ def build_category_aggregates(category_map: pd.DataFrame) -> pd.DataFrame:
         cm = cm.sort_values(["prod_sn", "collected_at", "category_path"], na_position="last")
     else:
         cm = cm.sort_values(["prod_sn", "category_path"])
-
-    def agg_paths(g: pd.DataFrame) -> list[str]:
-        return _unique_preserve_order(g["category_path"].tolist())
-
-    def agg_names(g: pd.DataFrame) -> list[str]:
-        # depth1~3를 flatten한 후 unique
-        vals = []
-        vals += g["category_depth1"].tolist()
-        vals += g["category_depth2"].tolist()
-        vals += g["category_depth3"].tolist()
-        return _unique_preserve_order(vals)
-
-    def primary_depths(g: pd.DataFrame):
-        # 첫 row 기준 대표 depth (ERD에서 products에 대표 카테고리 넣기로 한 경우 대비)
-        first = g.iloc[0]
-        d1 = str(first["category_depth1"]).strip() if pd.notna(first["category_depth1"]) else None
-        d2 = str(first["category_depth2"]).strip() if pd.notna(first["category_depth2"]) else None
-        d3 = str(first["category_depth3"]).strip() if pd.notna(first["category_depth3"]) else None
-        return d1 or None, d2 or None, d3 or None
-
-    grouped = cm.groupby("prod_sn", as_index=False)
-
-    # 집계 생성
-    paths_series = grouped.apply(lambda g: agg_paths(g), include_groups=False)
-    names_series = grouped.apply(lambda g: agg_names(g), include_groups=False)
-    prim_series = grouped.apply(lambda g: primary_depths(g), include_groups=False)
-
-    # grouped.apply 결과가 Series(인덱스=prod_sn)로 나오므로 정리
-    agg_df = pd.DataFrame({
-        "prod_sn": paths_series.index.astype(int),
-        "category_paths_all": paths_series.values,
-        "category_names_all": names_series.values,
-        "primary_depths": prim_series.values,
-    })
-
-    agg_df["category_paths_all_json"] = agg_df["category_paths_all"].apply(_to_json_list)
-    agg_df["category_names_all_json"] = agg_df["category_names_all"].apply(_to_json_list)
-
-    agg_df["category_depth1_primary"] = agg_df["primary_depths"].apply(lambda t: t[0] if t else None)
-    agg_df["category_depth2_primary"] = agg_df["primary_depths"].apply(lambda t: t[1] if t else None)
-    agg_df["category_depth3_primary"] = agg_df["primary_depths"].apply(lambda t: t[2] if t else None)
-
-    agg_df = agg_df.drop(columns=["category_paths_all", "category_names_all", "primary_depths"])
-
-    return agg_df
+    cm = cm.reset_index(drop=True)
+
+    # 첫 row 기준 대표 depth (ERD에서 products에 대표 카테고리 넣기로 한 경우 대비)
+    first = cm.drop_duplicates("prod_sn", keep="first")
+    agg_df = pd.DataFrame({"prod_sn": first["prod_sn"].to_numpy()})
+    for c in depth_cols:
+        v = _clean_str(first[c])
+        agg_df[f"{c}_primary"] = v.astype(object).where(v.notna(), None).to_numpy()
+
+    # path: prod_sn 안에서 정렬 순서대로 unique
+    paths = pd.DataFrame({"prod_sn": cm["prod_sn"], "v": _clean_str(cm["category_path"])})
+    paths = paths.dropna(subset=["v"]).drop_duplicates(["prod_sn", "v"], keep="first")
+
+    # name: depth1 전체 → depth2 전체 → depth3 전체 순서로 flatten 후 unique
+    names = cm.melt(id_vars="prod_sn", value_vars=depth_cols, value_name="v")[["prod_sn", "v"]]
+    names["v"] = _clean_str(names["v"])
+    names = names.sort_values("prod_sn", kind="stable").dropna(subset=["v"]).drop_duplicates(["prod_sn", "v"], keep="first")
+
+    agg_df["category_paths_all_json"] = _json_lists_by_prod(paths, agg_df["prod_sn"])
+    agg_df["category_names_all_json"] = _json_lists_by_prod(names, agg_df["prod_sn"])
+
+    return agg_df[[
+        "prod_sn",
+        "category_paths_all_json",
+        "category_names_all_json",
+        "category_depth1_primary",
+        "category_depth2_primary",
+        "category_depth3_primary",
+    ]]
 
 
 def main():
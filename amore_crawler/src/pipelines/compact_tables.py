@@ -0,0 +1,38 @@
+"""
+partitioned 테이블(save_table, STORAGE_LAYOUT=partitioned) 정리.
+
+- append로 part가 여러 개 쌓인 run_date partition을 하나로 합침
+- --keep N: 테이블마다 최근 complete partition N개만 유지
+- manifest에 없는 오래된 part/tmp 파일 삭제
+
+python -m src.pipelines.compact_tables
+python -m src.pipelines.compact_tables --keep 7
+python -m src.pipelines.compact_tables --root ./data/raw/products
+"""
+import argparse
+import os
+from pathlib import Path
+
+from src.common.logger import get_logger
+from src.common.storage import MANIFEST_NAME, compact_table
+
+log = get_logger("compact_tables")
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--root", default=os.getenv("DATA_DIR", "./data"), help="이 아래의 모든 manifest 테이블 대상")
+    parser.add_argument("--keep", type=int, default=None, help="테이블마다 최근 complete partition N개만 유지")
+    args = parser.parse_args()
+
+    manifests = sorted(Path(args.root).rglob(MANIFEST_NAME))
+    if not manifests:
+        log.info(f"no partitioned tables under {args.root}")
+        return
+
+    for m in manifests:
+        root = m.parent
+        stats = compact_table(root.parent, root.name, keep=args.keep)
+        log.info(f"compact {root} {stats}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+product_ocr_text.image_url 이미지를 동시에 내려받아 content-addressed blob store에 저장하고
+URL → blob 인덱스(image_index)를 만든다.
+
+- 같은 bytes(sha256)는 한 번만 저장 → 저장 공간 절약은 정확히 같은 bytes에서만 생김
+- perceptual hash(dHash)가 거의 같은 이미지(재인코딩/리사이즈된 같은 배너)는 canonical_sha256으로 묶기만 함
+  (near-duplicate도 자기 blob을 따로 저장하므로 저장 공간은 줄지 않음)
+- 이미 인덱스에 있고 blob이 남아 있는 URL은 다시 받지 않음
+
+OCR 등 후속 단계는 image_index의 sha256(정확한 bytes)으로 로컬 blob을 읽는다.
+canonical_sha256은 near-duplicate 묶음 메타데이터일 뿐 내용 대체에 쓰지 않는다.
+(대체하면 해상도/크롭이 다른 이미지의 텍스트가 섞이므로 near-dup blob도 지우지 않음)
+
+python -m src.pipelines.download_images
+"""
+import io
+import os
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from src.common.blob_store import BlobStore
+from src.common.http import HttpClient
+from src.common.logger import get_logger
+from src.common.storage import load_latest_table, save_table
+
+log = get_logger("download_images")
+
+INDEX_DIR = "./data/raw/image_index"
+INDEX_PREFIX = "image_index"
+
+_DOWNLOAD_WORKERS = int(os.getenv("IMAGE_DOWNLOAD_WORKERS", "8"))
+# dHash 해밍 거리 이하면 같은 이미지로 취급 (64bit 중)
+_PHASH_MAX_DIST = int(os.getenv("IMAGE_PHASH_MAX_DIST", "3"))
+_PHASH_BANDS = 4
+_CHUNK = 256
+
+def now_dt() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def dhash(content: bytes) -> Optional[str]:
+    """64bit difference hash (hex). Pillow가 없거나 이미지가 아니면 None"""
+    try:
+        from PIL import Image
+    except ImportError:
+        return None
+    try:
+        img = Image.open(io.BytesIO(content)).convert("L").resize((9, 8), Image.Resampling.LANCZOS)
+    except Exception:
+        return None
+    px = list(img.getdata())
+    bits = 0
+    for row in range(8):
+        for col in range(8):
+            bits = (bits << 1) | int(px[row * 9 + col] > px[row * 9 + col + 1])
+    return f"{bits:016x}"
+
+class PhashIndex:
+    """
+    dHash near-duplicate 탐색.
+    64bit를 16bit 4개 band로 나누면 거리 <= 3인 두 해시는 최소 한 band가 완전히 일치(pigeonhole)
+    → band별 버킷만 비교.
+    """
+
+    def __init__(self, max_dist: int = _PHASH_MAX_DIST):
+        # band 수 - 1을 넘으면 모든 band가 조금씩 달라 버킷에서 못 찾는 쌍이 생김 (pigeonhole 보장 깨짐)
+        if not 0 <= max_dist < _PHASH_BANDS:
+            raise ValueError(f"IMAGE_PHASH_MAX_DIST must be between 0 and {_PHASH_BANDS - 1} (got {max_dist})")
+        self.max_dist = max_dist
+        self._buckets: list[dict[int, list[tuple[int, str]]]] = [{} for _ in range(_PHASH_BANDS)]
+
+    @staticmethod
+    def _bands(h: int) -> list[int]:
+        return [(h >> (16 * i)) & 0xFFFF for i in range(_PHASH_BANDS)]
+
+    def find(self, phash: str) -> Optional[str]:
+        h = int(phash, 16)
+        for i, b in enumerate(self._bands(h)):
+            for other, sha in self._buckets[i].get(b, []):
+                if bin(h ^ other).count("1") <= self.max_dist:
+                    return sha
+        return None
+
+    def add(self, phash: str, sha: str) -> None:
+        h = int(phash, 16)
+        for i, b in enumerate(self._bands(h)):
+            self._buckets[i].setdefault(b, []).append((h, sha))
+
+def _download(client: HttpClient, url: str) -> Optional[bytes]:
+    try:
+        return client.get(url).content
+    except Exception as e:
+        log.warning(f"image download fail url={url} err={e}")
+        return None
+
+def download_to_blobs(urls: list[str], prev_index: pd.DataFrame, store: BlobStore) -> pd.DataFrame:
+    """
+    새 URL만 받아 blob 저장 + 인덱스 행 생성 (near-dup은 canonical_sha256으로 묶기만 하고 blob은 각각 저장).
+    반환: image_url, sha256, phash, canonical_sha256, size_bytes, downloaded_at
+    """
+    # 기존 canonical blob들로 near-dup 인덱스 초기화
+    phashes = PhashIndex()
+    canonical_of: dict[str, str] = {}
+    phash_of: dict[str, Optional[str]] = {}
+    if not prev_index.empty:
+        for sha, ph, canon in prev_index[["sha256", "phash", "canonical_sha256"]].drop_duplicates("sha256").itertuples(
+            index=False, name=None
+        ):
+            canonical_of[sha] = canon
+            phash_of[sha] = ph if isinstance(ph, str) else None
+            if phash_of[sha] and sha == canon:
+                phashes.add(ph, sha)
+
+    client = HttpClient(cache_mode="off")   # 이미지 본문은 HTTP 응답 캐시에 쌓지 않음
+    downloaded_at = now_dt()
+    rows = []
+    stats = {"downloaded": 0, "exact_dup": 0, "near_dup": 0, "failed": 0}
+
+    with ThreadPoolExecutor(max_workers=_DOWNLOAD_WORKERS) as ex:
+        # 메모리에 이미지가 한꺼번에 쌓이지 않도록 chunk 단위로,
+        # chunk 안에서는 입력 순서대로 처리해 canonical 선택이 실행마다 같도록
+        for i in range(0, len(urls), _CHUNK):
+            chunk = urls[i:i + _CHUNK]
+            for url, content in zip(chunk, ex.map(lambda u: _download(client, u), chunk)):
+                if content is None:
+                    stats["failed"] += 1
+                    continue
+                stats["downloaded"] += 1
+                # near-dup 여부와 관계없이 정확한 bytes를 저장 (OCR이 sha256 blob을 읽음)
+                sha = store.put(content)
+
+                if sha in canonical_of:
+                    stats["exact_dup"] += 1
+                else:
+                    ph = dhash(content)
+                    near = phashes.find(ph) if ph else None
+                    if near:
+                        stats["near_dup"] += 1
+                        canonical_of[sha] = near
+                    else:
+                        canonical_of[sha] = sha
+                        if ph:
+                            phashes.add(ph, sha)
+                    phash_of[sha] = ph
+
+                rows.append({
+                    "image_url": url,
+                    "sha256": sha,
+                    "phash": phash_of[sha],
+                    "canonical_sha256": canonical_of[sha],
+                    "size_bytes": len(content),
+                    "downloaded_at": downloaded_at,
+                })
+
+    log.info(f"download urls={len(urls)} {stats}")
+    return pd.DataFrame(rows, columns=["image_url", "sha256", "phash", "canonical_sha256", "size_bytes", "downloaded_at"])
+
+def load_image_index() -> pd.DataFrame:
+    try:
+        return load_latest_table(INDEX_DIR, INDEX_PREFIX)
+    except FileNotFoundError:
+        return pd.DataFrame(columns=["image_url", "sha256", "phash", "canonical_sha256", "size_bytes", "downloaded_at"])
+
+def main():
+    ocr_df = load_latest_table("./data/raw/product_ocr_text", "product_ocr_text", columns=["image_url"])
+    urls = ocr_df["image_url"].dropna().unique().tolist()
+
+    store = BlobStore()
+    prev = load_image_index()
+
+    # 인덱스에 있고 blob도 남아 있는 URL은 건너뜀
+    have = set()
+    if not prev.empty:
+        ok = prev["canonical_sha256"].map(store.exists) & prev["sha256"].map(store.exists)
+        prev = prev[ok]
+        have = set(prev["image_url"])
+    todo = [u for u in urls if u not in have]
+    log.info(f"images: total_urls={len(urls)} indexed={len(urls) - len(todo)} todo={len(todo)}")
+
+    new = download_to_blobs(todo, prev, store)
+    index = pd.concat([prev, new], ignore_index=True).drop_duplicates("image_url", keep="last")
+
+    blobs = index["sha256"].nunique()
+    canon = index["canonical_sha256"].nunique()
+    log.info(f"index urls={len(index)} blobs={blobs} canonical={canon}")
+
+    out = save_table(index.reset_index(drop=True), INDEX_DIR, INDEX_PREFIX)
+    log.info(f"saved: {out} rows={len(index)}")
+
+if __name__ == "__main__":
+    main()
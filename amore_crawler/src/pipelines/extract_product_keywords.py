@@ -0,0 +1,250 @@
+"""
+OCR 텍스트 + 상품명 + 설명에서 상품별 키워드를 뽑아
+./data/raw/product_keywords/product_keywords.parquet (derive_product_concern_pred_map 입력)을 만든다.
+
+- 정규화: pandas str 연산(NFKC/소문자/기호 제거)으로 배치 단위 일괄 처리
+- 후보: 토큰 unigram + 붙여 쓴 bigram/trigram (OCR 띄어쓰기 깨짐 대응: "선 크림" -> "선크림")
+- 어휘 필터: concern_pred_rules.yaml 트리거를 seed로
+  * trigger를 포함하는 후보는 우선 유지
+  * bigram/trigram은 구성 unigram에 없던 trigger가 붙여 써서 드러날 때만 유지
+  * 나머지 unigram은 길이/숫자 필터 후 빈도순
+- 상품 배치를 프로세스 풀에서 처리하고, 끝나는 배치부터 parquet에 기록
+- 증분: 입력 텍스트+트리거 해시가 이전과 같은 상품은 이전 키워드를 그대로 사용
+
+python -m src.pipelines.extract_product_keywords
+python -m src.pipelines.extract_product_keywords --full
+"""
+import argparse
+import hashlib
+import os
+import re
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yaml
+
+from src.common.logger import get_logger
+from src.common.storage import load_file, load_latest_table, publish_file
+
+log = get_logger("extract_product_keywords")
+
+KEYWORDS_PATH = "./data/raw/product_keywords/product_keywords.parquet"
+RULES_PATH = "./config/concern_pred_rules.yaml"
+
+# 상품당 키워드 상한
+MAX_KEYWORDS = 40
+BATCH_SIZE = int(os.getenv("KEYWORD_BATCH_SIZE", "2000"))
+_WORKERS = int(os.getenv("KEYWORD_WORKERS", "0")) or (os.cpu_count() or 1)
+
+_NON_WORD_RE = r"[^0-9a-z가-힣]+"
+
+SCHEMA = pa.schema([
+    ("prod_sn", pa.int64()),
+    ("keywords", pa.list_(pa.string())),
+    ("text_hash", pa.string()),
+    ("created_at", pa.string()),
+])
+
+def now_dt() -> str:
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+def load_yaml(path: str) -> dict:
+    with open(path, "r", encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+def load_triggers(rules: dict) -> list[str]:
+    ts = {str(t).strip().lower() for meta in rules.values() for t in (meta.get("triggers") or [])}
+    return sorted(t for t in ts if t)
+
+def normalize_texts(s: pd.Series) -> pd.Series:
+    """배치 전체를 한 번에 정규화 (NFKC → 소문자 → 한글/영문/숫자 외 공백)"""
+    return (
+        s.fillna("")
+        .astype(str)
+        .str.normalize("NFKC")
+        .str.lower()
+        .str.replace(_NON_WORD_RE, " ", regex=True)
+        .str.strip()
+    )
+
+# ============================================================
+# worker (프로세스 풀)
+# ============================================================
+_TRIGGER_RE: Optional[re.Pattern] = None
+
+def _init_worker(triggers: list[str]) -> None:
+    global _TRIGGER_RE
+    # 긴 trigger 우선 (겹치는 경우 더 구체적인 것)
+    alts = sorted(triggers, key=len, reverse=True)
+    _TRIGGER_RE = re.compile("|".join(re.escape(t) for t in alts)) if alts else None
+
+_TRIGGER_MEMO: dict[str, frozenset] = {}
+
+def _triggers_in(s: str) -> frozenset:
+    # 토큰/붙여 쓴 n-gram은 배치 안에서 많이 반복되므로 memo
+    hit = _TRIGGER_MEMO.get(s)
+    if hit is None:
+        hit = frozenset(_TRIGGER_RE.findall(s)) if _TRIGGER_RE is not None else frozenset()
+        if len(_TRIGGER_MEMO) < 1_000_000:
+            _TRIGGER_MEMO[s] = hit
+    return hit
+
+_NGRAM_MEMO: dict[tuple, Optional[str]] = {}
+
+def _ngram_keyword(parts: tuple) -> Optional[str]:
+    """붙여 쓴 n-gram이 구성 토큰에 없던 trigger를 드러내면 그 n-gram, 아니면 None"""
+    if parts in _NGRAM_MEMO:
+        return _NGRAM_MEMO[parts]
+    joined = "".join(parts)
+    found = _triggers_in(joined)
+    # 더 짧은 구성(토큰 / trigram이면 안쪽 bigram)으로 이미 드러나는 trigger는 제외 → 최소 n-gram만 유지
+    covered = [_triggers_in(p) for p in parts]
+    if len(parts) == 3:
+        covered += [_triggers_in(parts[0] + parts[1]), _triggers_in(parts[1] + parts[2])]
+    kw = joined if found and found - frozenset().union(*covered) else None
+    if len(_NGRAM_MEMO) < 2_000_000:
+        _NGRAM_MEMO[parts] = kw
+    return kw
+
+def _keep_unigram(tok: str) -> bool:
+    return len(tok) >= 2 and not tok.isdigit()
+
+def keywords_for_tokens(tokens: list[str]) -> list[str]:
+    counts = Counter(tokens)
+    seeded: Counter = Counter()
+    other: Counter = Counter()
+
+    for tok, c in counts.items():
+        if _triggers_in(tok):
+            seeded[tok] += c
+        elif _keep_unigram(tok):
+            other[tok] += c
+
+    # 붙여 쓴 bigram/trigram: 구성 토큰에 없던 trigger가 새로 드러나는 경우만 (고유 n-gram만 검사)
+    ngrams = Counter(zip(tokens, tokens[1:]))
+    ngrams.update(zip(tokens, tokens[1:], tokens[2:]))
+    for parts, c in ngrams.items():
+        kw = _ngram_keyword(parts)
+        if kw is not None:
+            seeded[kw] += c
+
+    ordered = [k for k, _ in seeded.most_common()] + [k for k, _ in other.most_common()]
+    return ordered[:MAX_KEYWORDS]
+
+def extract_batch(prod_sns: list[int], texts: list[str]) -> list[tuple[int, list[str]]]:
+    norm = normalize_texts(pd.Series(texts, dtype="object"))
+    token_lists = norm.str.split()
+    return [(int(sn), keywords_for_tokens(toks or [])) for sn, toks in zip(prod_sns, token_lists)]
+
+# ============================================================
+# 입력 조립
+# ============================================================
+def _load_optional(in_dir: str, prefix: str) -> Optional[pd.DataFrame]:
+    try:
+        return load_latest_table(in_dir, prefix)
+    except FileNotFoundError:
+        return None
+
+def build_product_texts() -> pd.DataFrame:
+    """prod_sn, text (상품명 + 설명 + 이미지 순서대로 OCR 텍스트)"""
+    parts = []
+
+    products = _load_optional("./data/raw/products", "products")
+    if products is not None and not products.empty:
+        p = products[["prod_sn"]].copy()
+        p["text"] = products.get("product_name", pd.Series(index=products.index, dtype=object)).fillna("").astype(str)
+        if "description" in products.columns:
+            p["text"] = p["text"] + " " + products["description"].fillna("").astype(str)
+        p["order"] = -1
+        parts.append(p)
+
+    ocr = _load_optional("./data/raw/product_ocr_text", "product_ocr_text")
+    if ocr is not None and "ocr_text" in ocr.columns:
+        o = ocr[["prod_sn", "image_seq", "ocr_text"]].rename(columns={"ocr_text": "text", "image_seq": "order"})
+        o["text"] = o["text"].fillna("").astype(str)
+        parts.append(o)
+    elif ocr is not None:
+        log.warning("product_ocr_text에 ocr_text 컬럼이 없습니다. ocr_product_text 단계를 먼저 실행하세요.")
+
+    if not parts:
+        raise RuntimeError("키워드 입력이 없습니다. products / product_ocr_text를 확인하세요.")
+
+    allp = pd.concat(parts, ignore_index=True).dropna(subset=["prod_sn"])
+    allp["prod_sn"] = allp["prod_sn"].astype("int64")
+    allp = allp.sort_values(["prod_sn", "order"], kind="stable")
+    return allp.groupby("prod_sn", sort=True)["text"].agg(" ".join).reset_index()
+
+def text_hashes(texts: pd.Series, triggers: list[str]) -> list[str]:
+    salt = "\x1f".join(triggers) + f"\x1e{MAX_KEYWORDS}\x1e"
+    return [hashlib.sha1((salt + t).encode("utf-8")).hexdigest()[:16] for t in texts]
+
+# ============================================================
+# main
+# ============================================================
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--full", action="store_true", help="이전 키워드 재사용 없이 전체 재추출")
+    args = parser.parse_args(argv)
+
+    triggers = load_triggers(load_yaml(RULES_PATH))
+    texts = build_product_texts()
+    texts["text_hash"] = text_hashes(texts["text"], triggers)
+
+    # 증분: 해시가 같은 상품은 이전 결과 재사용
+    out_path = Path(KEYWORDS_PATH)
+    reuse = pd.DataFrame(columns=["prod_sn", "keywords", "text_hash", "created_at"])
+    if out_path.exists() and not args.full:
+        prev = load_file(out_path)
+        if "text_hash" in prev.columns:
+            m = texts[["prod_sn", "text_hash"]].merge(prev, on=["prod_sn", "text_hash"], how="inner")
+            reuse = m[["prod_sn", "keywords", "text_hash", "created_at"]]
+    todo = texts[~texts["prod_sn"].isin(reuse["prod_sn"])].reset_index(drop=True)
+    log.info(f"keywords: products={len(texts)} reused={len(reuse)} todo={len(todo)} triggers={len(triggers)}")
+
+    hash_of = dict(zip(todo["prod_sn"], todo["text_hash"]))
+    created_at = now_dt()
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_suffix(".parquet.tmp")
+
+    written = 0
+    tables = []   # 같은 프로세스의 다음 stage에 넘길 결과 (run_pipeline --in-process)
+    with pq.ParquetWriter(str(tmp), SCHEMA) as writer:
+        if len(reuse):
+            reuse = reuse.assign(
+                prod_sn=reuse["prod_sn"].astype("int64"),
+                keywords=reuse["keywords"].map(lambda x: list(x) if x is not None else []),
+            )
+            tables.append(pa.Table.from_pandas(reuse, schema=SCHEMA, preserve_index=False))
+            writer.write_table(tables[-1])
+            written += len(reuse)
+
+        sn_batches = [todo["prod_sn"].iloc[i:i + BATCH_SIZE].tolist() for i in range(0, len(todo), BATCH_SIZE)]
+        text_batches = [todo["text"].iloc[i:i + BATCH_SIZE].tolist() for i in range(0, len(todo), BATCH_SIZE)]
+        with ProcessPoolExecutor(max_workers=_WORKERS, initializer=_init_worker, initargs=(triggers,)) as ex:
+            # 배치가 끝나는 대로(입력 순서) row group으로 기록
+            for res in ex.map(extract_batch, sn_batches, text_batches):
+                tbl = pa.Table.from_pydict(
+                    {
+                        "prod_sn": [sn for sn, _ in res],
+                        "keywords": [kws for _, kws in res],
+                        "text_hash": [hash_of[sn] for sn, _ in res],
+                        "created_at": [created_at] * len(res),
+                    },
+                    schema=SCHEMA,
+                )
+                writer.write_table(tbl)
+                tables.append(tbl)
+                written += len(res)
+
+    os.replace(tmp, out_path)
+    publish_file(out_path, pa.concat_tables(tables) if tables else SCHEMA.empty_table())
+    log.info(f"saved: {out_path} rows={written}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,248 @@
+"""
+product_ocr_text.image_url 이미지를 OCR해서 ocr_text 컬럼을 채움.
+
+- OCR(Tesseract)은 CPU-bound → 코어 수만큼 프로세스 풀
+- 이미지는 download_images가 만든 로컬 blob(image_index.sha256, 그 이미지의 정확한 bytes)에서 읽고,
+  인덱스에 없는 URL만 스레드 풀로 다운로드
+- 이미지 sha256 기준 결과 캐시(SQLite): 여러 상품이 공유하는 배너/반복 이미지는 한 번만 OCR
+- 증분: 이미 ocr_text가 있는 이미지 URL / 캐시에 있는 URL은 다시 받지도 OCR하지도 않음
+
+python -m src.pipelines.ocr_product_text
+python -m src.pipelines.ocr_product_text --full   # 캐시 무시하고 전체 재OCR
+"""
+import argparse
+import hashlib
+import io
+import os
+import sqlite3
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from src.common.amore_api import DETAIL_URL_TMPL_SN_ONLY
+from src.common.blob_store import BlobStore
+from src.common.http import HttpClient
+from src.common.logger import get_logger
+from src.common.storage import load_latest_table, save_table
+from src.pipelines.download_images import load_image_index
+
+log = get_logger("ocr_product_text")
+
+IN_DIR = "./data/raw/product_ocr_text"
+IN_PREFIX = "product_ocr_text"
+OCR_CACHE_PATH = os.getenv("OCR_CACHE_PATH", "./data/cache/ocr_cache.sqlite")
+
+_OCR_LANG = os.getenv("OCR_LANG", "kor+eng")
+_OCR_WORKERS = int(os.getenv("OCR_WORKERS", "0")) or (os.cpu_count() or 1)
+_DOWNLOAD_WORKERS = int(os.getenv("OCR_DOWNLOAD_WORKERS", "8"))
+
+# ============================================================
+# OCR 결과 캐시
+# ============================================================
+class OcrCache:
+    """image sha256 -> ocr_text, image_url -> sha256 (메인 프로세스에서만 사용)"""
+
+    def __init__(self, path: str | Path = OCR_CACHE_PATH):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(path))
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS by_hash (sha256 TEXT PRIMARY KEY, ocr_text TEXT NOT NULL)")
+        self._conn.execute("CREATE TABLE IF NOT EXISTS by_url (image_url TEXT PRIMARY KEY, sha256 TEXT NOT NULL)")
+        self._conn.commit()
+
+    def text_for_hash(self, sha: str) -> Optional[str]:
+        row = self._conn.execute("SELECT ocr_text FROM by_hash WHERE sha256 = ?", (sha,)).fetchone()
+        return row[0] if row else None
+
+    def lookup_urls(self, urls: list[str]) -> dict[str, tuple[str, str]]:
+        """{image_url: (sha256, ocr_text)} (캐시에 있는 것만)"""
+        out = {}
+        for i in range(0, len(urls), 500):
+            chunk = urls[i:i + 500]
+            q = ",".join("?" * len(chunk))
+            cur = self._conn.execute(
+                f"SELECT u.image_url, u.sha256, h.ocr_text FROM by_url u JOIN by_hash h ON u.sha256 = h.sha256 "
+                f"WHERE u.image_url IN ({q})",
+                chunk,
+            )
+            out.update({u: (s, t) for u, s, t in cur.fetchall()})
+        return out
+
+    def put(self, sha: str, text: str, urls: list[str]) -> None:
+        self._conn.execute("INSERT OR REPLACE INTO by_hash (sha256, ocr_text) VALUES (?, ?)", (sha, text))
+        self._conn.executemany(
+            "INSERT OR REPLACE INTO by_url (image_url, sha256) VALUES (?, ?)", [(u, sha) for u in urls]
+        )
+        self._conn.commit()
+
+    def close(self) -> None:
+        self._conn.close()
+
+# ============================================================
+# worker (프로세스 풀)
+# ============================================================
+def _init_worker() -> None:
+    # tesseract 내부 OpenMP 스레드가 프로세스 풀과 겹쳐 과할당되지 않도록
+    os.environ["OMP_THREAD_LIMIT"] = "1"
+
+def ocr_image_bytes(content: bytes, lang: str = _OCR_LANG) -> str:
+    try:
+        import pytesseract
+        from PIL import Image
+    except ImportError as e:
+        raise RuntimeError("OCR에는 pytesseract/Pillow와 tesseract 바이너리(kor 언어팩 포함)가 필요합니다.") from e
+
+    img = Image.open(io.BytesIO(content))
+    img = img.convert("L")
+    text = pytesseract.image_to_string(img, lang=lang)
+    return " ".join(text.split())
+
+# ============================================================
+# stage
+# ============================================================
+def _load_image(client: HttpClient, store: BlobStore, blob_of: dict[str, str], url: str) -> Optional[bytes]:
+    # 로컬 blob 우선. near-duplicate(canonical)가 아니라 그 URL의 정확한 blob을 읽음:
+    # 작은 dHash가 비슷한 텍스트 위주 이미지끼리 다른 상품의 OCR 텍스트가 섞이지 않도록
+    sha = blob_of.get(url)
+    if sha:
+        content = store.get(sha)
+        if content is not None:
+            return content
+    try:
+        return client.get(url).content
+    except Exception as e:
+        log.warning(f"image download fail url={url} err={e}")
+        return None
+
+def ocr_urls(
+    urls: list[str],
+    cache: OcrCache,
+    workers: int = _OCR_WORKERS,
+    use_cache: bool = True,
+    blob_of: Optional[dict[str, str]] = None,
+) -> dict[str, tuple[str, str]]:
+    """
+    {image_url: (sha256, ocr_text)}. 다운로드(스레드)와 OCR(프로세스)을 겹쳐서 수행하고,
+    같은 내용(sha256)의 이미지는 한 번만 OCR.
+    메모리에 올라가는 이미지가 카탈로그 크기와 무관하도록 다운로드+OCR 진행 중 작업 수를 window로 제한
+    (OCR이 밀리면 다운로드도 멈춤).
+    """
+    out: dict[str, tuple[str, str]] = {}
+    if not urls:
+        return out
+
+    client = HttpClient(cache_mode="off")   # 이미지 본문은 HTTP 응답 캐시에 쌓지 않음
+    store = BlobStore()
+    blob_of = blob_of or {}
+    inflight: dict[str, list[str]] = {}     # sha256 -> 같은 내용의 url들
+    stats = {"loaded": 0, "hash_hit": 0, "ocr": 0, "failed": 0}
+    window = max(2 * max(1, workers), _DOWNLOAD_WORKERS)
+    todo = iter(urls)
+
+    with ThreadPoolExecutor(max_workers=_DOWNLOAD_WORKERS) as dl, \
+            ProcessPoolExecutor(max_workers=max(1, workers), initializer=_init_worker) as pool:
+        dl_futs: dict = {}
+        ocr_futs: dict = {}
+
+        def _fill() -> None:
+            while len(dl_futs) + len(ocr_futs) < window:
+                u = next(todo, None)
+                if u is None:
+                    return
+                dl_futs[dl.submit(_load_image, client, store, blob_of, u)] = u
+
+        _fill()
+        while dl_futs or ocr_futs:
+            done, _ = wait(set(dl_futs) | set(ocr_futs), return_when=FIRST_COMPLETED)
+            for f in done:
+                if f in dl_futs:
+                    url = dl_futs.pop(f)
+                    content = f.result()
+                    if content is None:
+                        stats["failed"] += 1
+                        continue
+                    stats["loaded"] += 1
+                    sha = hashlib.sha256(content).hexdigest()
+                    if sha in inflight:
+                        inflight[sha].append(url)
+                        stats["hash_hit"] += 1
+                        continue
+                    cached = cache.text_for_hash(sha) if use_cache else None
+                    if cached is not None:
+                        cache.put(sha, cached, [url])
+                        out[url] = (sha, cached)
+                        stats["hash_hit"] += 1
+                        continue
+                    inflight[sha] = [url]
+                    ocr_futs[pool.submit(ocr_image_bytes, content)] = sha
+                else:
+                    sha = ocr_futs.pop(f)
+                    same = inflight.pop(sha)
+                    try:
+                        text = f.result()
+                    except Exception as e:
+                        log.warning(f"ocr fail sha256={sha[:12]} urls={len(same)} err={e}")
+                        stats["failed"] += len(same)
+                        continue
+                    stats["ocr"] += 1
+                    cache.put(sha, text, same)
+                    for u in same:
+                        out[u] = (sha, text)
+            _fill()
+
+    log.info(f"ocr workers={workers} {stats}")
+    return out
+
+def main(argv: Optional[list[str]] = None):
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--full", action="store_true", help="캐시/기존 ocr_text 무시하고 전체 재OCR")
+    args = parser.parse_args(argv)
+
+    df = load_latest_table(IN_DIR, IN_PREFIX)
+    if df.empty:
+        raise RuntimeError("product_ocr_text empty. collect_product_desc_images_html 결과를 확인하세요.")
+
+    if "ocr_text" not in df.columns or args.full:
+        df["ocr_text"] = None
+    if "image_sha256" not in df.columns or args.full:
+        df["image_sha256"] = None
+
+    # 1) 이미 OCR된 행(증분 carry-forward 포함)은 그대로
+    need = df["ocr_text"].isna()
+    urls = df.loc[need, "image_url"].dropna().unique().tolist()
+
+    cache = OcrCache()
+    try:
+        # 2) URL 캐시 hit → 다운로드/OCR 없음
+        hits = {} if args.full else cache.lookup_urls(urls)
+        todo = [u for u in urls if u not in hits]
+        log.info(f"ocr: rows={len(df)} already={int((~need).sum())} url_cache_hit={len(hits)} todo_images={len(todo)}")
+
+        # 3) 나머지만 다운로드 + sha256 캐시 + OCR
+        index = load_image_index()
+        blob_of = dict(zip(index["image_url"], index["sha256"]))
+        results = {**hits, **ocr_urls(todo, cache, use_cache=not args.full, blob_of=blob_of)}
+    finally:
+        cache.close()
+
+    texts = {u: t for u, (_, t) in results.items()}
+    shas = {u: s for u, (s, _) in results.items()}
+
+    df.loc[need, "ocr_text"] = df.loc[need, "image_url"].map(texts)
+    df.loc[need & df["image_sha256"].isna(), "image_sha256"] = df.loc[need, "image_url"].map(shas)
+
+    # validate.py 계약: product_url 컬럼
+    if "product_url" not in df.columns:
+        df["product_url"] = df["prod_sn"].astype(int).map(lambda sn: DETAIL_URL_TMPL_SN_ONLY.format(sn=sn))
+
+    missing = int(df["ocr_text"].isna().sum())
+    if missing:
+        log.warning(f"ocr_text missing rows={missing} (다운로드/OCR 실패, 다음 실행에서 재시도)")
+
+    out = save_table(df, IN_DIR, IN_PREFIX)
+    log.info(f"saved: {out} rows={len(df)}")
+
+if __name__ == "__main__":
+    main()
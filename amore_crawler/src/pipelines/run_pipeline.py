@@ -0,0 +1,413 @@
+"""
+전체 파이프라인 실행기 (stage DAG).
+
+brand_snapshot(detail_urls/products/category_map) → concern_map / desc_images
+→ download_images → ocr → keywords → derive_* → build_features → validate
+
+- 의존 stage가 끝난 stage부터 병렬 실행 (stage마다 별도 프로세스: python -m <module>)
+- 입력 테이블 내용 fingerprint + 코드(모듈과 import하는 src.* 모듈, 설정 파일) fingerprint가
+  마지막 성공 때와 같고 출력이 남아 있으면 건너뜀
+- 네트워크에서 새로 받아야 하는 수집 stage(always)는 매번 실행 → 내용이 같으면 하위 stage는 건너뜀
+- 모든 stage가 같은 RUN_DATE로 저장 (자정을 넘겨도 한 run_date)
+- --in-process: stage를 이 프로세스 안에서 실행하고 테이블을 Arrow로 메모리에서 넘김
+  (parquet 쓰기는 writer 스레드가 뒤에서 처리, 디스크 결과는 같음)
+
+python -m src.pipelines.run_pipeline
+python -m src.pipelines.run_pipeline --dry-run
+python -m src.pipelines.run_pipeline --force                       # fingerprint 무시하고 전부 실행
+python -m src.pipelines.run_pipeline --no-collect                  # 네트워크 수집 stage 없이 기존 raw로 하위만
+python -m src.pipelines.run_pipeline --only keywords,derive_pred_map
+python -m src.pipelines.run_pipeline --in-process
+"""
+import argparse
+import importlib
+import inspect
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from datetime import date
+from pathlib import Path
+from typing import Optional
+
+import pandas as pd
+
+from src.common.fingerprint import code_fingerprint, frame_fingerprint
+from src.common.logger import get_logger
+from src.common.storage import (
+    latest_table_files,
+    load_file,
+    load_latest_table,
+    memory_handoff,
+    memory_version,
+    release_memory,
+    run_after_writes,
+)
+
+log = get_logger("run_pipeline")
+
+STATE_PATH = os.getenv("PIPELINE_STATE_PATH", "./data/_pipeline/state.json")
+_WORKERS = int(os.getenv("PIPELINE_WORKERS", "2"))
+_IN_PROCESS = os.getenv("PIPELINE_IN_PROCESS", "0") == "1"
+
+# 테이블 이름 → (dir, prefix) 또는 고정 parquet 경로
+TABLES = {
+    "brand_snapshot": ("./data/raw/brand_snapshot", "brand_snapshot"),
+    "detail_urls_all": ("./data/raw/detail_urls", "detail_urls_all"),
+    "products": ("./data/raw/products", "products"),
+    "category_map": ("./data/raw/category_map", "category_map"),
+    "product_concern_map": ("./data/raw/product_concern_map", "product_concern_map"),
+    "product_ocr_text": ("./data/raw/product_ocr_text", "product_ocr_text"),
+    "desc_image_fingerprints": ("./data/raw/product_ocr_text", "desc_image_fingerprints"),
+    "image_index": ("./data/raw/image_index", "image_index"),
+    "product_keywords": "./data/raw/product_keywords/product_keywords.parquet",
+    "product_concerns": ("./data/derived/product_concerns", "product_concerns"),
+    "product_concern_pred_map": ("./data/derived/product_concern_pred_map", "product_concern_pred_map"),
+    "product_concern_final": ("./data/derived/product_concern_final", "product_concern_final"),
+    "products_enriched": ("./data/processed/products_enriched", "products_enriched"),
+}
+
+# always: 외부(API/상세페이지)가 입력이라 fingerprint로 건너뛸 수 없는 stage
+STAGES = {
+    "brand_snapshot": {
+        "module": "src.collectors.collect_brand_snapshot_api",
+        "deps": [],
+        "inputs": [],
+        "outputs": ["brand_snapshot", "detail_urls_all", "products", "category_map"],
+        "configs": ["./config/targets.yaml"],
+        "always": True,
+    },
+    "concern_map": {
+        "module": "src.collectors.collect_product_concern_map_api",
+        "deps": ["brand_snapshot"],
+        "inputs": ["detail_urls_all"],
+        "outputs": ["product_concern_map"],
+        "configs": ["./config/concerns_filter_urls.yaml", "./config/targets.yaml"],
+        "always": True,
+    },
+    "desc_images": {
+        # 카탈로그가 그대로여도 이전에 이미지를 못 찾은 상품은 재수집 대상(plan_incremental)이라 매번 실행.
+        # 바뀐/실패 상품만 다시 긁으므로 변화가 없으면 저렴하고, 결과가 같으면 하위 stage는 건너뜀
+        "module": "src.collectors.collect_product_desc_images_html",
+        "deps": ["brand_snapshot"],
+        "inputs": ["detail_urls_all", "products"],
+        "outputs": ["product_ocr_text", "desc_image_fingerprints"],
+        "configs": ["./config/targets.yaml", "./config/selectors_innisfree.yaml"],
+        "always": True,
+    },
+    "download_images": {
+        "module": "src.pipelines.download_images",
+        "deps": ["desc_images"],
+        "inputs": ["product_ocr_text"],
+        "outputs": ["image_index"],
+    },
+    "ocr": {
+        "module": "src.pipelines.ocr_product_text",
+        "deps": ["download_images"],
+        "inputs": ["product_ocr_text", "image_index"],
+        "outputs": ["product_ocr_text"],
+    },
+    "keywords": {
+        "module": "src.pipelines.extract_product_keywords",
+        "deps": ["ocr", "brand_snapshot"],
+        "inputs": ["products", "product_ocr_text"],
+        "outputs": ["product_keywords"],
+        "configs": ["./config/concern_pred_rules.yaml"],
+    },
+    "derive_concerns": {
+        "module": "src.collectors.derive_product_concerns",
+        "deps": ["concern_map"],
+        "inputs": ["product_concern_map", "detail_urls_all"],
+        "outputs": ["product_concerns"],
+    },
+    "derive_pred_map": {
+        "module": "src.collectors.derive_product_concern_pred_map",
+        "deps": ["keywords"],
+        "inputs": ["product_keywords", "detail_urls_all"],
+        "outputs": ["product_concern_pred_map"],
+        "configs": ["./config/concern_pred_rules.yaml"],
+    },
+    "derive_final": {
+        "module": "src.collectors.derive_product_concern_final",
+        "deps": ["derive_concerns", "derive_pred_map"],
+        "inputs": ["detail_urls_all", "product_concerns", "product_concern_pred_map"],
+        "outputs": ["product_concern_final"],
+    },
+    "build_features": {
+        "module": "src.pipelines.build_features",
+        "deps": ["brand_snapshot"],
+        "inputs": ["products", "category_map"],
+        "outputs": ["products_enriched"],
+    },
+    "validate": {
+        # 최종 테이블 계약(필수 컬럼, prod_sn 유일성) 확인. 입력이 그대로면 건너뜀
+        "module": "src.pipelines.validate",
+        "deps": ["derive_final", "build_features"],
+        "inputs": [
+            "products", "category_map", "product_concern_map", "product_ocr_text",
+            "product_keywords", "product_concern_final", "products_enriched",
+        ],
+        "outputs": [],
+    },
+}
+
+# ============================================================
+# fingerprint
+# ============================================================
+def _spec_args(name: str) -> tuple:
+    spec = TABLES[name]
+    return (spec,) if isinstance(spec, str) else spec
+
+def load_table(name: str, columns: Optional[list[str]] = None) -> pd.DataFrame:
+    spec = TABLES[name]
+    if isinstance(spec, str):
+        return load_file(spec, columns=columns)
+    return load_latest_table(*spec, columns=columns)
+
+def table_exists(name: str) -> bool:
+    spec = TABLES[name]
+    if memory_version(*_spec_args(name)) is not None:
+        return True
+    if isinstance(spec, str):
+        return Path(spec).exists()
+    try:
+        latest_table_files(*spec)
+        return True
+    except FileNotFoundError:
+        return False
+
+def _table_version(name: str) -> Optional[tuple]:
+    """파일 목록 + mtime, 메모리에 있으면 그 버전 (같은 run 안에서 fingerprint 재계산 방지용 key)"""
+    spec = TABLES[name]
+    mem = memory_version(*_spec_args(name))
+    if mem is not None:
+        return ("memory", mem)
+    try:
+        files = [Path(spec)] if isinstance(spec, str) else latest_table_files(*spec)
+        return tuple((str(f), f.stat().st_mtime_ns) for f in files)
+    except FileNotFoundError:
+        return None
+
+class Fingerprints:
+    """테이블 내용 fingerprint (파일 버전별 memo, 스레드 안전)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memo: dict[tuple, str] = {}
+
+    def table(self, name: str) -> Optional[str]:
+        version = _table_version(name)
+        if version is None:
+            return None
+        key = (name, version)
+        with self._lock:
+            if key in self._memo:
+                return self._memo[key]
+        fp = frame_fingerprint(load_table(name))
+        with self._lock:
+            self._memo[key] = fp
+        return fp
+
+    def inputs(self, stage: dict) -> dict[str, Optional[str]]:
+        return {t: self.table(t) for t in stage["inputs"]}
+
+    @staticmethod
+    def code(stage: dict) -> str:
+        return code_fingerprint(stage["module"], stage.get("configs", []))
+
+# ============================================================
+# 실행 기록
+# ============================================================
+class State:
+    """stage별 마지막 성공 기록 {stage: {"code", "inputs", "finished_at", "elapsed_s"}}"""
+
+    def __init__(self, path: str | Path = STATE_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        try:
+            self._data = json.loads(self.path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            self._data = {}
+
+    def get(self, stage: str) -> Optional[dict]:
+        with self._lock:
+            return self._data.get(stage)
+
+    def put(self, stage: str, record: dict) -> None:
+        with self._lock:
+            self._data[stage] = record
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(".tmp")
+            tmp.write_text(json.dumps(self._data, ensure_ascii=False, indent=1), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+# ============================================================
+# 스케줄링
+# ============================================================
+def skip_reason(name: str, stage: dict, state: State, fps: Fingerprints, force: bool) -> tuple[Optional[str], dict]:
+    """(건너뛸 이유 또는 None, 이번 실행의 fingerprint 기록)"""
+    record = {"code": fps.code(stage), "inputs": fps.inputs(stage)}
+    if force or stage.get("always"):
+        return None, record
+    prev = state.get(name)
+    if prev is None:
+        return None, record
+    if prev.get("code") != record["code"]:
+        return None, record
+    if prev.get("inputs") != record["inputs"]:
+        return None, record
+    if not all(table_exists(t) for t in stage["outputs"]):
+        return None, record
+    return "inputs/code unchanged", record
+
+def run_stage(name: str, stage: dict, extra_args: list[str]) -> float:
+    cmd = [sys.executable, "-m", stage["module"], *extra_args]
+    log.info(f"[{name}] start: {' '.join(cmd[1:])}")
+    t0 = time.perf_counter()
+    subprocess.run(cmd, check=True)
+    return time.perf_counter() - t0
+
+def run_stage_in_process(name: str, stage: dict, extra_args: list[str]) -> float:
+    """stage main()을 이 프로세스에서 호출 (memory_handoff 안에서 부르면 테이블을 메모리로 주고받음)"""
+    module = importlib.import_module(stage["module"])
+    log.info(f"[{name}] start (in-process): {stage['module']} {' '.join(extra_args)}".rstrip())
+    t0 = time.perf_counter()
+    try:
+        # argparse를 쓰는 stage는 main(argv): sys.argv는 병렬로 도는 stage끼리 공유라 쓸 수 없음
+        if inspect.signature(module.main).parameters:
+            module.main(extra_args)
+        elif extra_args:
+            raise ValueError(f"{stage['module']}.main() does not take arguments: {extra_args}")
+        else:
+            module.main()
+    except SystemExit as e:
+        if e.code not in (None, 0):
+            raise RuntimeError(f"{stage['module']} exited: {e.code}") from e
+    return time.perf_counter() - t0
+
+def execute(
+    name: str, state: State, fps: Fingerprints, force: bool, dry_run: bool, stage_args: dict, runner=run_stage
+) -> str:
+    """반환: ran / skipped / would-run"""
+    stage = STAGES[name]
+    reason, record = skip_reason(name, stage, state, fps, force)
+    if reason:
+        log.info(f"[{name}] skip ({reason})")
+        return "skipped"
+    if dry_run:
+        changed = [t for t, fp in record["inputs"].items() if (state.get(name) or {}).get("inputs", {}).get(t) != fp]
+        log.info(f"[{name}] would run (always={bool(stage.get('always'))} changed_inputs={changed})")
+        return "would-run"
+
+    elapsed = runner(name, stage, stage_args.get(name, []))
+
+    # 입력이자 출력인 테이블(product_ocr_text 등)은 이번 실행 결과를 기준으로 기록해야 다음에 건너뛸 수 있음
+    for t in set(stage["inputs"]) & set(stage["outputs"]):
+        record["inputs"][t] = fps.table(t)
+    record.update({"finished_at": time.strftime("%Y-%m-%d %H:%M:%S"), "elapsed_s": round(elapsed, 1)})
+    # in-process면 출력 파일이 실제로 써진 뒤에 성공으로 기록
+    run_after_writes(state.put, name, record)
+    log.info(f"[{name}] done in {elapsed:.1f}s")
+    return "ran"
+
+def select_stages(only: Optional[list[str]], no_collect: bool) -> list[str]:
+    names = list(STAGES)
+    if only:
+        unknown = sorted(set(only) - set(STAGES))
+        if unknown:
+            raise SystemExit(f"unknown stages: {unknown} (choices: {list(STAGES)})")
+        names = [n for n in names if n in only]
+    if no_collect:
+        names = [n for n in names if not STAGES[n].get("always")]
+    return names
+
+def run_dag(
+    names: list[str], workers: int, force: bool, dry_run: bool, stage_args: dict, runner=run_stage
+) -> dict[str, str]:
+    """선택된 stage를 의존 순서대로 병렬 실행. 선택되지 않은 dep은 이미 끝난 것으로 봄"""
+    state = State()
+    fps = Fingerprints()
+    selected = set(names)
+    status: dict[str, str] = {}
+
+    def ready(n: str) -> bool:
+        return all(d not in selected or status.get(d) in ("ran", "skipped", "would-run") for d in STAGES[n]["deps"])
+
+    def blocked(n: str) -> bool:
+        return any(d in selected and status.get(d) in ("failed", "blocked") for d in STAGES[n]["deps"])
+
+    pending = list(names)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as ex:
+        while pending or running:
+            for n in list(pending):
+                if blocked(n):
+                    status[n] = "blocked"
+                    pending.remove(n)
+                    log.warning(f"[{n}] blocked (dependency failed)")
+                elif ready(n):
+                    running[ex.submit(execute, n, state, fps, force, dry_run, stage_args, runner)] = n
+                    pending.remove(n)
+            if not running:
+                if pending:
+                    raise RuntimeError(f"stage dependency cycle: {pending}")
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for f in done:
+                n = running.pop(f)
+                try:
+                    status[n] = f.result()
+                except Exception as e:
+                    status[n] = "failed"
+                    log.error(f"[{n}] failed: {e}")
+            # 남은 stage가 더 읽지 않는 테이블은 메모리에서 내림 (in-process)
+            needed = {t for n in [*pending, *running.values()] for t in STAGES[n]["inputs"]}
+            for t in TABLES:
+                if t not in needed:
+                    release_memory(*_spec_args(t))
+    return status
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--only", default="", help="쉼표로 구분한 stage만 실행 (선택하지 않은 dep은 기존 출력 사용)")
+    parser.add_argument("--no-collect", action="store_true", help="네트워크 수집 stage(always) 제외")
+    parser.add_argument("--force", action="store_true", help="fingerprint 무시하고 실행")
+    parser.add_argument("--dry-run", action="store_true", help="실행/건너뜀 계획만 출력")
+    parser.add_argument("--workers", type=int, default=_WORKERS, help="동시에 실행할 stage 수")
+    parser.add_argument("--resume", action="store_true", help="journal을 지원하는 수집 stage에 --resume 전달")
+    parser.add_argument(
+        "--in-process", action="store_true", default=_IN_PROCESS,
+        help="stage를 한 프로세스에서 실행하고 테이블을 메모리로 넘김 (parquet은 백그라운드 저장)",
+    )
+    args = parser.parse_args()
+
+    # 모든 stage가 같은 run_date로 저장되도록 고정
+    if not os.getenv("RUN_DATE"):
+        os.environ["RUN_DATE"] = date.today().isoformat()
+
+    stage_args = {}
+    if args.resume:
+        stage_args = {n: ["--resume"] for n in ("brand_snapshot", "desc_images")}
+
+    names = select_stages([s.strip() for s in args.only.split(",") if s.strip()] or None, args.no_collect)
+    log.info(
+        f"pipeline run_date={os.environ['RUN_DATE']} stages={names} workers={args.workers} in_process={args.in_process}"
+    )
+
+    t0 = time.perf_counter()
+    if args.in_process and not args.dry_run:
+        with memory_handoff():
+            status = run_dag(names, args.workers, args.force, False, stage_args, run_stage_in_process)
+    else:
+        status = run_dag(names, args.workers, args.force, args.dry_run, stage_args)
+    summary = {s: sorted(n for n, v in status.items() if v == s) for s in sorted(set(status.values()))}
+    log.info(f"pipeline done in {time.perf_counter() - t0:.1f}s {summary}")
+
+    if any(v in ("failed", "blocked") for v in status.values()):
+        raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
@@ -1,32 +1,53 @@
 import pandas as pd
 from src.common.logger import get_logger
-from src.common.storage import load_latest_table
+from src.common.storage import load_file, load_latest_table
 
 log = get_logger("validate")
 
+# 최종 테이블 → (저장 위치, 필수 컬럼)
+REQUIRED = {
+    "products": (("./data/raw/products", "products"), ["prod_sn", "product_url", "product_name"]),
+    "category_map": (("./data/raw/category_map", "category_map"), ["prod_sn", "category_path"]),
+    "product_concern_map": (
+        ("./data/raw/product_concern_map", "product_concern_map"), ["prod_sn", "concern_type", "concern_name"]
+    ),
+    "product_ocr_text": (
+        ("./data/raw/product_ocr_text", "product_ocr_text"), ["prod_sn", "product_url", "image_seq", "image_url", "ocr_text"]
+    ),
+    "product_keywords": ("./data/raw/product_keywords/product_keywords.parquet", ["prod_sn", "keywords"]),
+    "product_concern_final": (
+        ("./data/derived/product_concern_final", "product_concern_final"), ["prod_sn", "source", "concerns", "concern_types"]
+    ),
+    "products_enriched": (("./data/processed/products_enriched", "products_enriched"), ["prod_sn", "product_name"]),
+}
+
 def check_required(df: pd.DataFrame, required: list[str], name: str):
     missing = [c for c in required if c not in df.columns]
     if missing:
         raise ValueError(f"[{name}] missing columns: {missing}")
 
-def main():
-    products = load_latest_table("./data/raw/products", "products")
-    check_required(products, ["product_url", "product_name"], "products")
+def load(name: str) -> pd.DataFrame:
+    spec, required = REQUIRED[name]
+    df = load_file(spec) if isinstance(spec, str) else load_latest_table(*spec)
+    check_required(df, required, name)
+    return df[required]
 
-    category_map = load_latest_table("./data/raw/category_map", "category_map")
-    check_required(category_map, ["product_url", "category_name"], "category_map")
+def main():
+    tables = {name: load(name) for name in REQUIRED}
 
-    # concern_map은 placeholder로 비어있을 수 있어 컬럼 존재만 확인
-    concern_map = load_latest_table("./data/raw/concern_map", "concern_map")
-    check_required(concern_map, ["product_url", "concern_name"], "concern_map")
+    products = tables["products"]
+    log.info(f"products rows={len(products)} null(product_name)={products['product_name'].isna().mean():.2%}")
 
-    ocr = load_latest_table("./data/raw/product_ocr_text", "product_ocr_text")
-    check_required(ocr, ["product_url", "image_seq", "image_url", "ocr_text"], "product_ocr_text")
+    # 상품 단위 테이블은 prod_sn이 유일해야 함
+    for name in ("products", "product_keywords", "product_concern_final", "products_enriched"):
+        dup = int(tables[name]["prod_sn"].duplicated().sum())
+        if dup:
+            raise ValueError(f"[{name}] duplicated prod_sn rows={dup}")
 
-    log.info(f"products rows={len(products)} null(product_name)={products['product_name'].isna().mean():.2%}")
-    log.info(f"category_map rows={len(category_map)}")
-    log.info(f"concern_map rows={len(concern_map)}")
-    log.info(f"product_ocr_text rows={len(ocr)}")
+    ocr = tables["product_ocr_text"]
+    log.info(f"product_ocr_text rows={len(ocr)} null(ocr_text)={ocr['ocr_text'].isna().mean():.2%}")
+    for name in ("category_map", "product_concern_map", "product_keywords", "product_concern_final", "products_enriched"):
+        log.info(f"{name} rows={len(tables[name])}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,92 @@
+import threading
+
+import pytest
+
+from src.common.journal import Journal
+from src.common.paging import fetch_all_pages, read_total
+
+N_ITEMS = 25
+LIMIT = 10
+
+def _source(total: bool):
+    """offset -> 응답 stub. 요청된 offset을 기록한다."""
+    calls = []
+    lock = threading.Lock()
+
+    def fetch(offset: int) -> dict:
+        with lock:
+            calls.append(offset)
+        payload = {"products": [{"onlineProdSn": sn} for sn in range(offset, min(offset + LIMIT, N_ITEMS))]}
+        if total:
+            payload["totalCount"] = N_ITEMS
+        return payload
+
+    return fetch, calls
+
+def _sns(rows):
+    return [it["onlineProdSn"] for _, it in rows]
+
+def test_read_total():
+    assert read_total({"totalCount": 5}) == 5
+    assert read_total({"data": {"total": "7"}}) == 7
+    assert read_total({"products": []}) is None
+
+@pytest.mark.parametrize("max_in_flight", [1, 3])
+def test_probe_without_total(max_in_flight):
+    fetch, calls = _source(total=False)
+    rows = fetch_all_pages(fetch, LIMIT, max_in_flight=max_in_flight)
+    assert _sns(rows) == list(range(N_ITEMS))
+    assert [off for off, _ in rows] == [sn // LIMIT * LIMIT for sn in range(N_ITEMS)]
+    assert 30 in calls  # 빈 페이지를 만나야 중단
+
+def test_total_schedules_exact_offsets():
+    fetch, calls = _source(total=True)
+    rows = fetch_all_pages(fetch, LIMIT, max_in_flight=3)
+    assert _sns(rows) == list(range(N_ITEMS))
+    assert sorted(calls) == [0, 10, 20]
+
+def test_dedup_by_key():
+    def fetch(offset):
+        # 페이지 경계에서 항목이 밀려 중복으로 다시 나오는 경우
+        return {"products": [{"onlineProdSn": 1}, {"onlineProdSn": 2}] if offset < 20 else []}
+
+    rows = fetch_all_pages(fetch, LIMIT)
+    assert rows == [(0, {"onlineProdSn": 1}), (0, {"onlineProdSn": 2})]
+
+@pytest.mark.parametrize("total", [False, True])
+def test_journal_resume(tmp_path, total):
+    fetch, calls = _source(total=total)
+    j = Journal("paging_test", root=tmp_path, run_date="2024-01-01")
+    first = fetch_all_pages(fetch, LIMIT, max_in_flight=2, journal=j, journal_prefix="b1:")
+    j.close()
+    assert _sns(first) == list(range(N_ITEMS))
+
+    def broken(offset):
+        raise AssertionError(f"journaled offset refetched: {offset}")
+
+    j = Journal("paging_test", resume=True, root=tmp_path, run_date="2024-01-01")
+    again = fetch_all_pages(broken, LIMIT, max_in_flight=2, journal=j, journal_prefix="b1:")
+    j.close()
+    assert again == first
+
+def test_journal_partial_resume(tmp_path):
+    """중간에 죽은 뒤 재개하면 기록 안 된 offset만 다시 요청"""
+    fetch, calls = _source(total=False)
+
+    def dies_at_20(offset):
+        if offset == 20:
+            raise RuntimeError("boom")
+        return fetch(offset)
+
+    j = Journal("paging_test", root=tmp_path, run_date="2024-01-01")
+    with pytest.raises(RuntimeError):
+        fetch_all_pages(dies_at_20, LIMIT, max_in_flight=1, journal=j)
+    j.close()
+
+    calls.clear()
+    j = Journal("paging_test", resume=True, root=tmp_path, run_date="2024-01-01")
+    rows = fetch_all_pages(fetch, LIMIT, max_in_flight=1, journal=j)
+    j.close()
+    assert _sns(rows) == list(range(N_ITEMS))
+    assert 0 not in calls and 10 not in calls
+    assert 20 in calls
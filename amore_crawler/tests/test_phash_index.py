@@ -0,0 +1,68 @@
+import itertools
+import random
+
+import pytest
+
+from src.pipelines.download_images import PhashIndex
+
+BASE = 0x0123_4567_89AB_CDEF
+
+
+def _hex(h: int) -> str:
+    return f"{h:016x}"
+
+
+def _flip(h: int, bits) -> int:
+    for b in bits:
+        h ^= 1 << b
+    return h
+
+
+@pytest.mark.parametrize("max_dist", [0, 1, 2, 3])
+def test_finds_every_hash_within_max_dist(max_dist):
+    # 모든 비트 조합(서로 다른 band에 흩어진 경우 포함)에서 최소 한 band가 같아야 찾을 수 있음
+    index = PhashIndex(max_dist=max_dist)
+    index.add(_hex(BASE), "canon")
+    for d in range(max_dist + 1):
+        for bits in itertools.combinations(range(64), d):
+            assert index.find(_hex(_flip(BASE, bits))) == "canon", bits
+
+
+def test_one_flip_per_band_still_found():
+    index = PhashIndex(max_dist=3)
+    index.add(_hex(BASE), "canon")
+    # band 0/1/2가 모두 다르고 band 3만 같음
+    assert index.find(_hex(_flip(BASE, [5, 16 + 5, 32 + 5]))) == "canon"
+
+
+def test_beyond_max_dist_not_found():
+    index = PhashIndex(max_dist=3)
+    index.add(_hex(BASE), "canon")
+    # 같은 band 안에서 4비트 → 나머지 band가 같아 후보로는 오지만 거리로 걸러짐
+    assert index.find(_hex(_flip(BASE, [0, 1, 2, 3]))) is None
+    assert index.find(_hex(~BASE & (2**64 - 1))) is None
+
+
+def test_random_hashes_match_brute_force():
+    rng = random.Random(0)
+    index = PhashIndex(max_dist=3)
+    stored = {}
+    for i in range(200):
+        h = rng.getrandbits(64)
+        if i % 2:
+            # 일부는 기존 해시 근처로 만들어 near-dup 후보가 생기게 함
+            h = _flip(rng.choice(list(stored)), rng.sample(range(64), rng.randint(0, 6))) if stored else h
+        match = index.find(_hex(h))
+        near = [s for s, sha in stored.items() if bin(s ^ h).count("1") <= 3]
+        assert (match is not None) == bool(near)
+        if match is None:
+            stored[h] = f"sha{i}"
+            index.add(_hex(h), stored[h])
+        else:
+            assert match in {stored[s] for s in near}
+
+
+@pytest.mark.parametrize("max_dist", [-1, 4, 64])
+def test_max_dist_validation(max_dist):
+    with pytest.raises(ValueError):
+        PhashIndex(max_dist=max_dist)
@@ -0,0 +1,169 @@
+import os
+
+import pandas as pd
+import pytest
+
+from src.common import storage
+from src.common.storage import (
+    compact_table,
+    latest_table_files,
+    load_latest_table,
+    read_manifest,
+    save_table,
+    table_root,
+)
+
+PREFIX = "products"
+
+
+@pytest.fixture(autouse=True)
+def _env(monkeypatch):
+    monkeypatch.setattr(storage, "_LAYOUT", "partitioned")
+    monkeypatch.delenv("OUTPUT_FORMAT", raising=False)
+    monkeypatch.setenv("RUN_DATE", "2024-01-02")
+
+
+def _frame(sns, name="x"):
+    return pd.DataFrame({"prod_sn": list(sns), "product_name": [f"{name}{sn}" for sn in sns]})
+
+
+def _sorted(df):
+    return df.sort_values("prod_sn").reset_index(drop=True)
+
+
+def test_save_replaces_partition(tmp_path):
+    save_table(_frame([1, 2]), tmp_path, PREFIX)
+    save_table(_frame([3]), tmp_path, PREFIX)
+
+    manifest = read_manifest(table_root(tmp_path, PREFIX))
+    assert manifest["latest"] == "2024-01-02"
+    part = manifest["partitions"]["2024-01-02"]
+    assert part["rows"] == 1 and len(part["files"]) == 1
+    # 교체된 part는 지워짐
+    assert len(list((table_root(tmp_path, PREFIX) / "run_date=2024-01-02").glob("*.parquet"))) == 1
+    assert load_latest_table(tmp_path, PREFIX)["prod_sn"].tolist() == [3]
+
+
+def test_latest_partition_wins(tmp_path, monkeypatch):
+    save_table(_frame([1]), tmp_path, PREFIX)
+    monkeypatch.setenv("RUN_DATE", "2024-01-05")
+    save_table(_frame([5]), tmp_path, PREFIX)
+    monkeypatch.setenv("RUN_DATE", "2024-01-03")
+    save_table(_frame([3]), tmp_path, PREFIX)
+
+    assert load_latest_table(tmp_path, PREFIX)["prod_sn"].tolist() == [5]
+
+
+def test_append_and_incomplete_partition(tmp_path, monkeypatch):
+    save_table(_frame([1]), tmp_path, PREFIX)
+    monkeypatch.setenv("RUN_DATE", "2024-01-03")
+    save_table(_frame([10]), tmp_path, PREFIX, append=True, complete=False)
+    save_table(_frame([11]), tmp_path, PREFIX, append=True, complete=False)
+
+    # 아직 complete가 아니므로 이전 partition이 latest
+    assert read_manifest(table_root(tmp_path, PREFIX))["latest"] == "2024-01-02"
+    assert load_latest_table(tmp_path, PREFIX)["prod_sn"].tolist() == [1]
+
+    save_table(_frame([12]), tmp_path, PREFIX, append=True)
+    part = read_manifest(table_root(tmp_path, PREFIX))["partitions"]["2024-01-03"]
+    assert part["rows"] == 3 and len(part["files"]) == 3
+    assert _sorted(load_latest_table(tmp_path, PREFIX))["prod_sn"].tolist() == [10, 11, 12]
+
+
+def test_append_parts_with_different_schemas(tmp_path):
+    save_table(_frame([1]), tmp_path, PREFIX, append=True)
+    df = _frame([2])
+    df["product_name"] = None  # 전부 null인 컬럼
+    save_table(df, tmp_path, PREFIX, append=True)
+
+    out = _sorted(load_latest_table(tmp_path, PREFIX))
+    assert out["prod_sn"].tolist() == [1, 2]
+    assert out["product_name"].tolist()[0] == "x1" and pd.isna(out["product_name"].tolist()[1])
+
+
+def test_columns_and_filters(tmp_path):
+    save_table(_frame([1, 2, 3]), tmp_path, PREFIX, append=True)
+    save_table(_frame([4, 5]), tmp_path, PREFIX, append=True)
+
+    multi = load_latest_table(tmp_path, PREFIX, columns=["prod_sn"], filters=[("prod_sn", "in", [2, 4, 9])])
+    assert list(multi.columns) == ["prod_sn"]
+    assert sorted(multi["prod_sn"].tolist()) == [2, 4]
+
+    save_table(_frame([1, 2, 3]), tmp_path, "one")
+    got = load_latest_table(tmp_path, "one", columns=["product_name"], filters=[("prod_sn", ">=", 2)])
+    assert list(got.columns) == ["product_name"]
+    assert sorted(got["product_name"].tolist()) == ["x2", "x3"]
+
+
+def test_flat_fallback(tmp_path, monkeypatch):
+    monkeypatch.setattr(storage, "_LAYOUT", "flat")
+    save_table(_frame([1]), tmp_path, PREFIX)
+    assert (tmp_path / f"{PREFIX}_2024-01-02.parquet").exists()
+    assert load_latest_table(tmp_path, PREFIX)["prod_sn"].tolist() == [1]
+
+    # partitioned가 더 최근이면 partitioned
+    monkeypatch.setattr(storage, "_LAYOUT", "partitioned")
+    monkeypatch.setenv("RUN_DATE", "2024-01-03")
+    save_table(_frame([3]), tmp_path, PREFIX)
+    assert load_latest_table(tmp_path, PREFIX)["prod_sn"].tolist() == [3]
+
+    # flat이 더 최근이면 flat
+    monkeypatch.setattr(storage, "_LAYOUT", "flat")
+    monkeypatch.setenv("RUN_DATE", "2024-01-04")
+    save_table(_frame([4]), tmp_path, PREFIX)
+    assert load_latest_table(tmp_path, PREFIX)["prod_sn"].tolist() == [4]
+
+
+def test_flat_ignores_other_prefix_and_prefers_newer_file(tmp_path):
+    _frame([1]).to_parquet(tmp_path / "detail_urls_2024-01-02.parquet", index=False)
+    _frame([9]).to_parquet(tmp_path / "detail_urls_all_2024-01-09.parquet", index=False)
+    assert load_latest_table(tmp_path, "detail_urls")["prod_sn"].tolist() == [1]
+
+    # 같은 run_date의 csv/parquet는 나중에 쓴 파일
+    csv = tmp_path / "detail_urls_2024-01-02.csv"
+    _frame([2]).to_csv(csv, index=False)
+    parquet = tmp_path / "detail_urls_2024-01-02.parquet"
+    os.utime(csv, (parquet.stat().st_mtime + 10,) * 2)
+    assert latest_table_files(tmp_path, "detail_urls") == [csv]
+    assert load_latest_table(tmp_path, "detail_urls", columns=["prod_sn"])["prod_sn"].tolist() == [2]
+
+
+def test_missing_table_raises(tmp_path):
+    with pytest.raises(FileNotFoundError):
+        load_latest_table(tmp_path, PREFIX)
+
+
+def test_compact_merges_parts_and_keeps_latest(tmp_path, monkeypatch):
+    for rd in ("2024-01-01", "2024-01-02", "2024-01-03"):
+        monkeypatch.setenv("RUN_DATE", rd)
+        save_table(_frame([1, 2], rd[-1]), tmp_path, PREFIX, append=True)
+        save_table(_frame([3], rd[-1]), tmp_path, PREFIX, append=True)
+    root = table_root(tmp_path, PREFIX)
+    before = _sorted(load_latest_table(tmp_path, PREFIX))
+
+    stats = compact_table(tmp_path, PREFIX, keep=2)
+
+    assert stats == {"compacted": 3, "dropped": 1, "orphans": 0}
+    manifest = read_manifest(root)
+    assert sorted(manifest["partitions"]) == ["2024-01-02", "2024-01-03"]
+    for rd, part in manifest["partitions"].items():
+        assert len(part["files"]) == 1 and part["rows"] == 3
+        assert [p.name for p in (root / f"run_date={rd}").glob("*.parquet")] == part["files"]
+    assert not (root / "run_date=2024-01-01").exists()
+    pd.testing.assert_frame_equal(_sorted(load_latest_table(tmp_path, PREFIX)), before)
+
+
+def test_compact_removes_orphans(tmp_path, monkeypatch):
+    save_table(_frame([1]), tmp_path, PREFIX)
+    part_dir = table_root(tmp_path, PREFIX) / "run_date=2024-01-02"
+    (part_dir / ".part-dead.parquet.tmp").write_bytes(b"")
+
+    assert compact_table(tmp_path, PREFIX)["orphans"] == 0  # grace 기간 안이면 남김
+    monkeypatch.setattr(storage, "_ORPHAN_GRACE_S", -1)
+    assert compact_table(tmp_path, PREFIX)["orphans"] == 1
+    assert load_latest_table(tmp_path, PREFIX)["prod_sn"].tolist() == [1]
+
+
+def test_compact_rejects_bad_keep(tmp_path):
+    with pytest.raises(ValueError):
+        compact_table(tmp_path, PREFIX, keep=0)
@@ -0,0 +1,42 @@
+import random
+
+import pytest
+
+from src.common.trigger_matcher import TriggerMatcher
+
+
+def naive_match(patterns, text):
+    return frozenset(pid for pid, p in enumerate(patterns) if p in text)
+
+
+def test_overlapping_korean_triggers():
+    patterns = ["선크림", "크림", "수분", "수분크림", "진정"]
+    m = TriggerMatcher(patterns)
+    assert m.match("수분크림과 선크림") == frozenset({0, 1, 2, 3})
+    assert m.match("진정 토너") == frozenset({4})
+    assert m.match("") == frozenset()
+
+
+def test_empty_and_duplicate_patterns():
+    m = TriggerMatcher(["", "ab", "ab", "b"])
+    assert m.match("xyz") == frozenset({0})
+    assert m.match("xab") == frozenset({0, 1, 2, 3})
+
+
+def test_no_patterns():
+    assert TriggerMatcher([]).match("anything") == frozenset()
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_matches_naive_matcher(seed):
+    # 작은 alphabet으로 prefix/suffix가 겹치는 pattern을 많이 만들어 failure link를 두루 거치게 함
+    rng = random.Random(seed)
+    alphabet = "abc"
+    patterns = [
+        "".join(rng.choice(alphabet) for _ in range(rng.randint(1, 5)))
+        for _ in range(rng.randint(1, 30))
+    ]
+    m = TriggerMatcher(patterns)
+    for _ in range(50):
+        text = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 40)))
+        assert m.match(text) == naive_match(patterns, text), (patterns, text)
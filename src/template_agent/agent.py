@@ -1,13 +1,34 @@
 from __future__ import annotations
 
+import copy
+import hashlib
 import json
 from pathlib import Path
-from typing import List, Tuple, Optional, Any, Dict
+from typing import List, Tuple, Optional, Any, Dict, Sequence, Union
 
 from openai import OpenAI
+from pydantic import TypeAdapter, ValidationError
 
 from .schemas import TemplateInput, TemplateOutput, Candidate
 from .utils.io import read_text, read_yaml
+from .utils.text_checks import count_emoji
+
+
+def _length_bounds(field: Any) -> Tuple[int, Optional[int]]:
+    lo, hi = 0, None
+    for m in field.metadata:
+        lo = getattr(m, "min_length", None) or lo
+        hi = getattr(m, "max_length", None) or hi
+    return lo, hi
+
+
+# fast path용 어댑터: 후보 리스트를 pydantic-core에서 한 번에 검증
+_CANDIDATES_ADAPTER = TypeAdapter(List[Candidate])
+_WARNINGS_ADAPTER = TypeAdapter(List[str])
+_CAND_MIN, _CAND_MAX = _length_bounds(TemplateOutput.model_fields["candidates"])
+
+# 스키마가 urgency_level <= 2 라서 0~2로 매핑
+_URG_MAP = {"low": 0, "mid": 1, "high": 2}
 
 
 class TemplateAgent:
@@ -19,8 +40,16 @@ class TemplateAgent:
     - Pydantic 검증 + 룰 기반 필터링
     """
 
-    def __init__(self, model: str, temperature: float, max_output_tokens: int, candidate_count: int):
-        self.client = OpenAI()
+    def __init__(
+        self,
+        model: str,
+        temperature: float,
+        max_output_tokens: int,
+        candidate_count: int,
+        client: Optional[Any] = None,
+    ):
+        # LLM 호출 시점에 생성(dry-run/재검증 등 LLM 없는 경로는 API 키 불필요)
+        self._client = client
         self.model = model
         self.temperature = temperature
         self.max_output_tokens = max_output_tokens
@@ -48,9 +77,50 @@ class TemplateAgent:
             for line in read_text(str(banned_path)).splitlines()
             if line.strip() and not line.strip().startswith("#")
         ]
+        self._banned_lower = [(b, b.lower()) for b in self.banned_phrases]
+
+    def rules_fingerprint(self) -> str:
+        """필터링/슬롯 결과에 영향을 주는 룰 세트(banned/copy_rules/slot_schema)의 해시"""
+        payload = json.dumps(
+            {
+                "banned_phrases": self.banned_phrases,
+                "copy_rules": self.copy_rules,
+                "slot_schema": self.slot_schema,
+            },
+            ensure_ascii=False,
+            sort_keys=True,
+            default=str,
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @property
+    def client(self) -> Any:
+        if self._client is None:
+            self._client = OpenAI()
+        return self._client
 
     def run(self, inp: TemplateInput) -> TemplateOutput:
+        return self.generate(inp)[0]
+
+    def generate(self, inp: TemplateInput) -> Tuple[TemplateOutput, Dict[str, Any]]:
+        """
+        run()과 같은 출력 + 필터 전 LLM raw JSON.
+        raw를 저장해 두면 룰이 완화됐을 때 이전에 걸러진 후보도 재검증으로 되살릴 수 있음.
+        """
         allowed_slots = self._get_allowed_slots(inp.campaign_goal, inp.channel)
+        messages = self.build_messages(inp, allowed_slots)
+
+        # JSON object 강제 호출
+        data = self._call_llm_json(messages)
+        raw = copy.deepcopy(data)  # 정규화가 data를 일부 수정하므로 원본 보존
+
+        # LLM 응답 정규화 + 계약 검증 + 룰 필터링을 한 번에 (fast path)
+        return self._build_output(data, inp, allowed_slots), raw
+
+    def build_messages(self, inp: TemplateInput, allowed_slots: Optional[List[str]] = None) -> List[dict]:
+        """LLM에 보낼 messages 구성 (run()과 dry-run 추정이 같은 경로를 사용)"""
+        if allowed_slots is None:
+            allowed_slots = self._get_allowed_slots(inp.campaign_goal, inp.channel)
         strategy = self._get_strategy(inp.campaign_goal, inp.step_id)
         channel_rules = self._get_channel_rules(inp.channel, inp.constraints)
 
@@ -65,28 +135,28 @@ class TemplateAgent:
             {"role": "system", "content": self.system_prompt},
             {"role": "user", "content": self.fewshot + "\n\n" + user_prompt},
         ]
+        return messages
 
-        # JSON object 강제 호출
-        data = self._call_llm_json(messages)
-
-        # LLM 응답을 계약 스키마에 맞게 정규화
-        normalized = self._normalize_to_contract(
-            raw=data,
-            inp=inp,
-            allowed_slots=allowed_slots,
-        )
-
-        # 계약 검증
-        out = TemplateOutput.model_validate(normalized)
-
-        # 룰 기반 필터링
-        filtered, warnings = self._validate_and_filter(out, allowed_slots, inp)
-        out.candidates = filtered
-
-        # warnings는 기존 + 필터링 경고 합치기
-        out.warnings = (out.warnings or []) + (warnings or [])
-
-        return out
+    def build_outputs(
+        self,
+        items: Sequence[Tuple[Any, TemplateInput]],
+        return_exceptions: bool = False,
+    ) -> List[Union[TemplateOutput, ValidationError]]:
+        """
+        (LLM raw JSON, 입력) 묶음을 TemplateOutput으로 변환(대량 재생성/재구축용).
+        출력마다 run()과 같은 fast path로 검증하므로 잘못된 출력 하나가 나머지를 막지 않음.
+        return_exceptions=True면 검증 실패한 자리에 ValidationError를 두고 계속 진행.
+        """
+        outs: List[Union[TemplateOutput, ValidationError]] = []
+        for raw, inp in items:
+            allowed_slots = self._get_allowed_slots(inp.campaign_goal, inp.channel)
+            try:
+                outs.append(self._build_output(raw, inp, allowed_slots))
+            except ValidationError as e:
+                if not return_exceptions:
+                    raise
+                outs.append(e)
+        return outs
 
     # LLM 호출: JSON object 강제
     def _call_llm_json(self, messages: List[dict]) -> dict:
@@ -113,6 +183,61 @@ class TemplateAgent:
         )
         return json.loads(resp.choices[0].message.content)
 
+    # Fast path: normalize + contract + filter
+    def _build_output(self, raw: Any, inp: TemplateInput, allowed_slots: List[str]) -> TemplateOutput:
+        """
+        _normalize_to_contract -> TemplateOutput.model_validate -> _validate_and_filter 와 같은 결과를
+        중간 dict/재검증/slot 재필터링 없이 만든다.
+        """
+        fixed, warnings = self._prepare_candidates(raw, inp, allowed_slots)
+        cands = _CANDIDATES_ADAPTER.validate_python(fixed)
+        return self._finish_output(inp, allowed_slots, cands, warnings)
+
+    def _prepare_candidates(
+        self,
+        raw: Any,
+        inp: TemplateInput,
+        allowed_slots: List[str],
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        data: Dict[str, Any] = raw if isinstance(raw, dict) else {}
+        candidates = data.get("candidates")
+        warnings = data.get("warnings")
+
+        if not isinstance(candidates, list):
+            candidates = []
+        if not isinstance(warnings, list):
+            warnings = []
+
+        if not (_CAND_MIN <= len(candidates) <= (_CAND_MAX or len(candidates))):
+            # 계약 위반은 기존 경로로 보내 동일한 ValidationError를 발생시킨다
+            TemplateOutput.model_validate(self._normalize_to_contract(raw, inp, allowed_slots))
+
+        allowed = set(allowed_slots)
+        fixed = [self._normalize_candidate(i, c, allowed) for i, c in enumerate(candidates)]
+        return fixed, _WARNINGS_ADAPTER.validate_python(warnings)
+
+    def _finish_output(
+        self,
+        inp: TemplateInput,
+        allowed_slots: List[str],
+        cands: List[Candidate],
+        warnings: List[str],
+    ) -> TemplateOutput:
+        # slot_map은 정규화 단계에서 이미 allowed_slots로 제한됨 -> 재필터링 생략
+        kept, filter_warnings = self._filter_candidates(cands, inp, allowed_slots=None)
+
+        # 필드가 모두 검증된 상태이므로 재검증 없이 구성
+        return TemplateOutput.model_construct(
+            campaign_goal=inp.campaign_goal,
+            channel=inp.channel,
+            step_id=inp.step_id,
+            persona_id=inp.persona.persona_id,
+            tone_id=inp.tone.tone_id,
+            allowed_slots=list(allowed_slots),
+            candidates=kept,
+            warnings=warnings + filter_warnings,
+        )
+
     # Normalize: raw JSON -> TemplateOutput contract
     def _normalize_to_contract(self, raw: Any, inp: TemplateInput, allowed_slots: List[str]) -> Dict[str, Any]:
         """
@@ -137,60 +262,58 @@ class TemplateAgent:
         data["allowed_slots"] = allowed_slots
         data["warnings"] = warnings
 
-        # 스키마가 urgency_level <= 2 라서 0~2로 매핑
-        urg_map = {"low": 0, "mid": 1, "high": 2}
-
-        fixed_candidates: List[Dict[str, Any]] = []
-        for i, c in enumerate(candidates):
-            if not isinstance(c, dict):
-                c = {}
-
-            # slot_map 보정
-            slot_map = c.get("slot_map")
-            if not isinstance(slot_map, dict):
-                slot_map = {}
-
-            # allowed_slots 밖 키 제거
-            slot_map = {k: v for k, v in slot_map.items() if k in allowed_slots}
-
-            # tags 보정
-            tags = c.get("tags")
-            if not isinstance(tags, dict):
-                tags = {}
-
-            # urgency_level 보정 (str -> int, 그리고 0~2 clamp)
-            ul = tags.get("urgency_level")
-            if isinstance(ul, str):
-                tags["urgency_level"] = urg_map.get(ul.lower(), 1)
-            elif isinstance(ul, int):
-                tags["urgency_level"] = ul
-            else:
-                tags["urgency_level"] = 1  # default mid
-
-            # clamp to 0~2
-            try:
-                tags["urgency_level"] = int(tags["urgency_level"])
-            except Exception:
-                tags["urgency_level"] = 1
-            tags["urgency_level"] = max(0, min(2, tags["urgency_level"]))
-
-            # 스키마에서 필요할 수 있는 태그 기본값들
-            tags.setdefault("length_hint", "medium")
-            tags.setdefault("benefit_claim", True)
-
-            fixed_candidates.append(
-                {
-                    "candidate_id": c.get("candidate_id") or f"C{i+1}",
-                    "slot_map": slot_map,
-                    "tags": tags,
-                    "rationale": c.get("rationale") or "",
-                    "variant_tag": c.get("variant_tag") or "direct",
-                }
-            )
+        allowed = set(allowed_slots)
+        fixed_candidates = [self._normalize_candidate(i, c, allowed) for i, c in enumerate(candidates)]
 
         data["candidates"] = fixed_candidates
         return data
 
+    @staticmethod
+    def _normalize_candidate(i: int, c: Any, allowed: set) -> Dict[str, Any]:
+        if not isinstance(c, dict):
+            c = {}
+
+        # slot_map 보정
+        slot_map = c.get("slot_map")
+        if not isinstance(slot_map, dict):
+            slot_map = {}
+
+        # allowed_slots 밖 키 제거
+        slot_map = {k: v for k, v in slot_map.items() if k in allowed}
+
+        # tags 보정
+        tags = c.get("tags")
+        if not isinstance(tags, dict):
+            tags = {}
+
+        # urgency_level 보정 (str -> int, 그리고 0~2 clamp)
+        ul = tags.get("urgency_level")
+        if isinstance(ul, str):
+            tags["urgency_level"] = _URG_MAP.get(ul.lower(), 1)
+        elif isinstance(ul, int):
+            tags["urgency_level"] = ul
+        else:
+            tags["urgency_level"] = 1  # default mid
+
+        # clamp to 0~2
+        try:
+            tags["urgency_level"] = int(tags["urgency_level"])
+        except Exception:
+            tags["urgency_level"] = 1
+        tags["urgency_level"] = max(0, min(2, tags["urgency_level"]))
+
+        # 스키마에서 필요할 수 있는 태그 기본값들
+        tags.setdefault("length_hint", "medium")
+        tags.setdefault("benefit_claim", True)
+
+        return {
+            "candidate_id": c.get("candidate_id") or f"C{i+1}",
+            "slot_map": slot_map,
+            "tags": tags,
+            "rationale": c.get("rationale") or "",
+            "variant_tag": c.get("variant_tag") or "direct",
+        }
+
     # Prompt Builder
     def _build_user_prompt(
         self,
@@ -293,43 +416,36 @@ class TemplateAgent:
         allowed_slots: List[str],
         inp: TemplateInput,
     ) -> Tuple[List[Candidate], List[str]]:
+        return self._filter_candidates(out.candidates or [], inp, allowed_slots)
+
+    def _filter_candidates(
+        self,
+        candidates: List[Candidate],
+        inp: TemplateInput,
+        allowed_slots: Optional[List[str]],
+    ) -> Tuple[List[Candidate], List[str]]:
+        """
+        룰 기반 필터링(금지 문구/max_chars/emoji_max).
+        allowed_slots=None이면 slot_map이 이미 제한된 것으로 보고 재필터링하지 않는다.
+        """
         warnings: List[str] = []
         kept: List[Candidate] = []
 
-        def _contains_banned(text: str) -> Optional[str]:
-            t = (text or "").lower()
-            for b in self.banned_phrases:
-                if b.lower() in t:
-                    return b
-            return None
-
-        def _count_emoji(text: str) -> int:
-            text = text or ""
-            cnt = 0
-            for ch in text:
-                cp = ord(ch)
-                if (
-                    0x1F300 <= cp <= 0x1FAFF
-                    or 0x2600 <= cp <= 0x26FF
-                    or 0x2700 <= cp <= 0x27BF
-                    or 0x1F1E6 <= cp <= 0x1F1FF
-                ):
-                    cnt += 1
-            return cnt
-
         max_chars = inp.constraints.max_chars
         emoji_max = inp.constraints.emoji_max
+        allowed = set(allowed_slots) if allowed_slots is not None else None
 
-        for c in out.candidates or []:
-            slot_map = dict(c.slot_map or {})
-            slot_map = {k: v for k, v in slot_map.items() if k in allowed_slots}
+        for c in candidates:
+            slot_map = c.slot_map or {}
+            if allowed is not None:
+                slot_map = {k: v for k, v in slot_map.items() if k in allowed}
 
             if not slot_map:
                 continue
 
             combined = " ".join(str(v) for v in slot_map.values())
 
-            banned = _contains_banned(combined)
+            banned = self._contains_banned(combined)
             if banned:
                 warnings.append(f"Removed candidate due to banned phrase: {banned}")
                 continue
@@ -338,14 +454,22 @@ class TemplateAgent:
                 warnings.append("Removed candidate due to max_chars limit")
                 continue
 
-            if emoji_max is not None and _count_emoji(combined) > emoji_max:
+            if emoji_max is not None and count_emoji(combined) > emoji_max:
                 warnings.append("Removed candidate due to emoji_max limit")
                 continue
 
-            c.slot_map = slot_map
+            if allowed is not None:
+                c.slot_map = slot_map
             kept.append(c)
 
         if len(kept) < 3:
             warnings.append("Candidate count after filtering is less than 3. Consider relaxing rules or regenerating.")
 
         return kept, warnings
+
+    def _contains_banned(self, text: str) -> Optional[str]:
+        t = (text or "").lower()
+        for b, bl in self._banned_lower:
+            if bl in t:
+                return b
+        return None
@@ -0,0 +1,94 @@
+"""
+정규화/검증 경로 마이크로벤치마크 (LLM 호출 없음)
+
+python -m src.template_agent.bench_validate --n 2000
+- legacy : _normalize_to_contract -> TemplateOutput.model_validate -> _validate_and_filter
+- fused  : _build_output (run()이 쓰는 fast path)
+- bulk   : build_outputs (대량 재구축용, 출력별 fused 경로 + 실패 격리)
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import gc
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from .agent import TemplateAgent
+from .schemas import TemplateInput, TemplateOutput
+from .utils.io import read_json
+
+FIXTURE = Path(__file__).resolve().parents[2] / "tests" / "fixtures" / "sample_inputs.json"
+
+
+def _fake_raw(allowed_slots: List[str], n_cands: int = 5) -> Dict[str, Any]:
+    variants = ["direct", "question", "empathy"]
+    urg = ["low", "mid", "high", 2, None]
+    return {
+        "candidates": [
+            {
+                "slot_map": {**{s: f"{s} 문구 {i}" for s in allowed_slots}, "extra_slot": "제거 대상"},
+                "tags": {"length_hint": "short", "urgency_level": urg[i % len(urg)], "benefit_claim": i % 2 == 0},
+                "variant_tag": variants[i % len(variants)],
+                "rationale": "bench",
+            }
+            for i in range(n_cands)
+        ],
+        "warnings": [],
+    }
+
+
+def _legacy(agent: TemplateAgent, raw: Any, inp: TemplateInput, allowed_slots: List[str]) -> TemplateOutput:
+    normalized = agent._normalize_to_contract(raw=raw, inp=inp, allowed_slots=allowed_slots)
+    out = TemplateOutput.model_validate(normalized)
+    filtered, warnings = agent._validate_and_filter(out, allowed_slots, inp)
+    out.candidates = filtered
+    out.warnings = (out.warnings or []) + (warnings or [])
+    return out
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--n", type=int, default=2000, help="출력 개수")
+    parser.add_argument("--repeat", type=int, default=3, help="경로별 반복 횟수(최솟값 사용)")
+    parser.add_argument("--input", default=str(FIXTURE))
+    args = parser.parse_args()
+
+    agent = TemplateAgent(model="bench", temperature=0.0, max_output_tokens=0, candidate_count=5, client=object())
+
+    inputs = [TemplateInput.model_validate(x) for x in read_json(args.input)]
+    items = []
+    for i in range(args.n):
+        inp = inputs[i % len(inputs)]
+        allowed = agent._get_allowed_slots(inp.campaign_goal, inp.channel)
+        items.append((_fake_raw(allowed), inp, allowed))
+
+    paths = {
+        "legacy": lambda its: [_legacy(agent, raw, inp, allowed) for raw, inp, allowed in its],
+        "fused": lambda its: [agent._build_output(raw, inp, allowed) for raw, inp, allowed in its],
+        "bulk": lambda its: agent.build_outputs([(raw, inp) for raw, inp, _ in its], return_exceptions=True),
+    }
+
+    timings: Dict[str, float] = {}
+    dumps: Dict[str, list] = {}
+    for _ in range(max(1, args.repeat)):
+        for name, fn in paths.items():
+            # 정규화가 raw dict를 일부 수정하므로 매번 사본 사용, 이전 결과는 버리고 GC 상태를 맞춤
+            its = copy.deepcopy(items)
+            gc.collect()
+            t0 = time.process_time()
+            res = fn(its)
+            t = time.process_time() - t0
+            timings[name] = min(timings.get(name, t), t)
+            dumps[name] = [o.model_dump() for o in res]
+            del res, its
+
+    same = dumps["legacy"] == dumps["fused"] == dumps["bulk"]
+
+    print(f"outputs={args.n} parity={same}")
+    for name, t in timings.items():
+        print(f"{name:>6}: total={t * 1000:8.1f} ms  per_output={t / args.n * 1e6:8.1f} us  speedup={timings['legacy'] / t:5.2f}x")
+
+if __name__ == "__main__":
+    main()
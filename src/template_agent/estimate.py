@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import argparse
+import math
+from collections import defaultdict
+from dataclasses import dataclass, asdict
+from typing import Any, Callable, Dict, List, Optional
+
+from rich.console import Console
+from rich.table import Table
+
+from .agent import TemplateAgent
+from .schemas import TemplateInput
+from .settings import Settings, get_settings
+from .utils.io import read_json, write_json
+
+console = Console()
+
+# 후보 1개당 출력 토큰(슬롯 5개 + tags/rationale 기준 대략치) + JSON 외곽
+OUTPUT_TOKENS_PER_CANDIDATE = 90
+OUTPUT_TOKENS_ENVELOPE = 20
+
+# chat 포맷 오버헤드(메시지당/응답 프라이밍)
+TOKENS_PER_MESSAGE = 3
+TOKENS_REPLY_PRIMING = 3
+
+
+def make_token_counter(model: str) -> Callable[[str], int]:
+    """
+    tiktoken이 있으면 모델 인코딩으로, 없으면 근사치(ASCII 4자당 1토큰 + 비ASCII 1자당 1토큰)로 센다.
+    """
+    try:
+        import tiktoken
+    except ImportError:
+        def _approx(text: str) -> int:
+            n_ascii = sum(1 for ch in text if ord(ch) < 128)
+            return math.ceil(n_ascii / 4) + (len(text) - n_ascii)
+        return _approx
+
+    try:
+        enc = tiktoken.encoding_for_model(model)
+    except KeyError:
+        enc = tiktoken.get_encoding("o200k_base")
+    return lambda text: len(enc.encode(text))
+
+
+def count_message_tokens(messages: List[dict], count: Callable[[str], int]) -> int:
+    return sum(TOKENS_PER_MESSAGE + count(m["content"]) for m in messages) + TOKENS_REPLY_PRIMING
+
+
+@dataclass
+class GroupEstimate:
+    campaign_goal: str
+    channel: str
+    calls: int
+    input_tokens: int
+    output_tokens_expected: int
+    output_tokens_max: int
+    prompt_tokens_max: int
+    cost_expected_usd: float
+    cost_max_usd: float
+    wall_time_s: float
+
+
+def _cost(s: Settings, in_tok: int, out_tok: int) -> float:
+    return in_tok / 1e6 * s.price_input_per_1m + out_tok / 1e6 * s.price_output_per_1m
+
+
+def _wall_time(s: Settings, calls: int, in_tok: int, out_tok_expected: int) -> float:
+    """
+    처리율 = min(동시성 / 호출지연, RPM, TPM / 호출당 토큰)
+    TPM 한도는 요청 시점에 max_output_tokens까지 예약되므로 max 기준으로 계산.
+    """
+    if calls == 0:
+        return 0.0
+    avg_in = in_tok / calls
+    avg_out = out_tok_expected / calls
+    latency = s.llm_base_latency_s + avg_out / s.llm_output_tps
+
+    rate = min(
+        s.llm_concurrency / latency,
+        s.llm_rpm / 60.0,
+        s.llm_tpm / 60.0 / max(avg_in + s.max_output_tokens, 1.0),
+    )
+    # 호출 수가 적으면 처리율이 아니라 단일 호출 지연이 하한
+    return max(calls / rate, latency)
+
+
+def estimate(
+    agent: TemplateAgent,
+    inputs: List[TemplateInput],
+    s: Settings,
+    count: Optional[Callable[[str], int]] = None,
+) -> Dict[str, Any]:
+    """
+    LLM 호출 없이 run()과 같은 프롬프트를 만들어 goal/channel별 토큰/비용/소요시간을 추정.
+    """
+    count = count or make_token_counter(s.model)
+    out_expected = min(
+        s.max_output_tokens,
+        s.candidate_count * OUTPUT_TOKENS_PER_CANDIDATE + OUTPUT_TOKENS_ENVELOPE,
+    )
+
+    # 동일 입력 조합은 프롬프트가 같으므로 토큰 수를 캐시
+    cache: Dict[str, int] = {}
+    agg: Dict[tuple, Dict[str, int]] = defaultdict(lambda: {"calls": 0, "in": 0, "prompt_max": 0})
+    for inp in inputs:
+        key = inp.model_dump_json()
+        n = cache.get(key)
+        if n is None:
+            n = cache[key] = count_message_tokens(agent.build_messages(inp), count)
+        g = agg[(inp.campaign_goal, inp.channel)]
+        g["calls"] += 1
+        g["in"] += n
+        g["prompt_max"] = max(g["prompt_max"], n)
+
+    groups: List[GroupEstimate] = []
+    for (goal, channel), g in sorted(agg.items()):
+        out_exp = g["calls"] * out_expected
+        out_max = g["calls"] * s.max_output_tokens
+        groups.append(GroupEstimate(
+            campaign_goal=goal,
+            channel=channel,
+            calls=g["calls"],
+            input_tokens=g["in"],
+            output_tokens_expected=out_exp,
+            output_tokens_max=out_max,
+            prompt_tokens_max=g["prompt_max"],
+            cost_expected_usd=round(_cost(s, g["in"], out_exp), 6),
+            cost_max_usd=round(_cost(s, g["in"], out_max), 6),
+            wall_time_s=round(_wall_time(s, g["calls"], g["in"], out_exp), 2),
+        ))
+
+    calls = sum(g.calls for g in groups)
+    in_tok = sum(g.input_tokens for g in groups)
+    out_exp = sum(g.output_tokens_expected for g in groups)
+    out_max = sum(g.output_tokens_max for g in groups)
+    return {
+        "model": s.model,
+        "limits": {
+            "concurrency": s.llm_concurrency,
+            "rpm": s.llm_rpm,
+            "tpm": s.llm_tpm,
+            "max_output_tokens": s.max_output_tokens,
+            "candidate_count": s.candidate_count,
+        },
+        "groups": [asdict(g) for g in groups],
+        "total": {
+            "calls": calls,
+            "input_tokens": in_tok,
+            "output_tokens_expected": out_exp,
+            "output_tokens_max": out_max,
+            "cost_expected_usd": round(_cost(s, in_tok, out_exp), 6),
+            "cost_max_usd": round(_cost(s, in_tok, out_max), 6),
+            "wall_time_s": round(_wall_time(s, calls, in_tok, out_exp), 2),
+        },
+    }
+
+
+def print_estimate(report: Dict[str, Any], warn_prompt_tokens: Optional[int] = None) -> None:
+    table = Table(title=f"Dry-run Estimate ({report['model']})")
+    for col in ("goal", "channel", "calls", "in_tok", "out_tok(exp/max)", "prompt_max", "cost_usd(exp/max)", "wall_s"):
+        table.add_column(col)
+
+    for g in report["groups"]:
+        prompt_max = str(g["prompt_tokens_max"])
+        if warn_prompt_tokens and g["prompt_tokens_max"] > warn_prompt_tokens:
+            prompt_max = f"[red]{prompt_max}[/red]"
+        table.add_row(
+            g["campaign_goal"],
+            g["channel"],
+            str(g["calls"]),
+            str(g["input_tokens"]),
+            f"{g['output_tokens_expected']}/{g['output_tokens_max']}",
+            prompt_max,
+            f"{g['cost_expected_usd']:.4f}/{g['cost_max_usd']:.4f}",
+            f"{g['wall_time_s']:.1f}",
+        )
+
+    t = report["total"]
+    table.add_row(
+        "[bold]TOTAL[/bold]", "",
+        str(t["calls"]),
+        str(t["input_tokens"]),
+        f"{t['output_tokens_expected']}/{t['output_tokens_max']}",
+        "",
+        f"{t['cost_expected_usd']:.4f}/{t['cost_max_usd']:.4f}",
+        f"{t['wall_time_s']:.1f}",
+    )
+    console.print(table)
+
+
+def run_estimate(input_path: str, output: Optional[str] = None, warn_prompt_tokens: Optional[int] = None) -> Dict[str, Any]:
+    """입력 JSON 파일 전체를 추정해 출력(및 저장). estimate CLI와 main.py --dry-run이 같이 사용"""
+    s = get_settings(require_api_key=False)
+    agent = TemplateAgent(
+        model=s.model,
+        temperature=s.temperature,
+        max_output_tokens=s.max_output_tokens,
+        candidate_count=s.candidate_count,
+    )
+
+    data = read_json(input_path)
+    items = data if isinstance(data, list) else [data]
+    inputs = [TemplateInput.model_validate(x) for x in items]
+
+    report = estimate(agent, inputs, s)
+    print_estimate(report, warn_prompt_tokens=warn_prompt_tokens)
+
+    if output:
+        write_json(output, report)
+        console.print(f"[green]Saved:[/green] {output}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--input", required=True, help="입력 JSON 파일 경로 (TemplateInput 리스트)")
+    parser.add_argument("--output", default=None, help="추정 결과 JSON 저장 경로(선택)")
+    parser.add_argument("--warn-prompt-tokens", type=int, default=None, help="프롬프트 토큰이 이 값을 넘는 그룹 강조")
+    args = parser.parse_args()
+
+    run_estimate(args.input, output=args.output, warn_prompt_tokens=args.warn_prompt_tokens)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,9 +6,12 @@ from rich.console import Console
 from rich.table import Table
 
 from .agent import TemplateAgent
+from .estimate import run_estimate
+from .scheduler import DEFAULT_WEIGHTS, TemplateScheduler
 from .schemas import TemplateInput
 from .settings import get_settings
-from .utils.io import read_json, write_json
+from .revalidate import make_record
+from .utils.io import append_jsonl, read_json, write_json
 
 console = Console()
 
@@ -28,13 +31,33 @@ def _print_summary(output: dict):
     table.add_row("warnings", "\n".join(output.get("warnings", []))[:600])
     console.print(table)
 
+def _print_scheduler_stats(stats: dict):
+    table = Table(title="Scheduler")
+    for col in ("class", "dispatched", "dropped_deadline", "wait_count", "wait_avg_s", "wait_max_s"):
+        table.add_column(col)
+    for name, st in stats.items():
+        h = st["queue_wait_hist"]
+        avg = h["sum"] / h["count"] if h["count"] else 0.0
+        table.add_row(name, str(st["dispatched"]), str(st["dropped_deadline"]), str(h["count"]), f"{avg:.3f}", f"{h['max']:.3f}")
+    console.print(table)
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--input", required=True, help="입력 JSON 파일 경로 (test/fixture/sample_inputs.json 등)")
     parser.add_argument("--index", type=int, default=0, help="입력 JSON이 리스트일 때 사용할 인덱스")
     parser.add_argument("--output", default="output.json", help="출력 JSON 저장 경로")
+    parser.add_argument("--store", default=None, help="재검증용 레코드(input/output/rules_fingerprint)를 누적할 JSONL 경로(선택)")
+    parser.add_argument("--dry-run", action="store_true", help="LLM 호출 없이 입력 전체의 토큰/비용/소요시간만 추정")
+    parser.add_argument("--all", action="store_true", help="입력 리스트 전체 생성 (출력은 리스트로 저장)")
+    parser.add_argument("--priority", choices=list(DEFAULT_WEIGHTS), default=None,
+                        help="스케줄러 우선순위 클래스 (기본: 단건 realtime, --all은 bulk)")
+    parser.add_argument("--deadline-s", type=float, default=None, help="요청별 deadline(초). 지나면 LLM 호출 전에 버림")
     args = parser.parse_args()
 
+    if args.dry_run:
+        run_estimate(args.input)
+        return
+
     s = get_settings()
 
     agent = TemplateAgent(
@@ -45,19 +68,40 @@ def main():
     )
 
     data = read_json(args.input)
-    if isinstance(data, list):
-        item = data[args.index]
+    if args.all:
+        items = data if isinstance(data, list) else [data]
     else:
-        item = data
+        items = [data[args.index] if isinstance(data, list) else data]
+    inputs = [TemplateInput.model_validate(x) for x in items]
+    priority = args.priority or ("bulk" if args.all else "realtime")
 
-    inp = TemplateInput.model_validate(item)
-    out = agent.run(inp)
+    # 실시간/대량 생성이 같은 LLM 쿼터를 쓰므로 모든 생성은 스케줄러를 거침
+    outs = []
+    # raw(필터 전 LLM 출력)도 받아 --store 레코드에 남김 → 룰 완화 시 revalidate가 raw에서 다시 필터링
+    with TemplateScheduler(agent, workers=s.llm_concurrency, run_fn=agent.generate) as sched:
+        futs = [sched.submit(inp, priority=priority, deadline_s=args.deadline_s) for inp in inputs]
+        for i, (inp, fut) in enumerate(zip(inputs, futs)):
+            try:
+                out, raw = fut.result()
+            except Exception as e:
+                if not args.all:
+                    raise
+                console.print(f"  [red]generation failed[/red] idx={i} err={e}")
+                continue
+            outs.append(out)
+            if args.store:
+                append_jsonl(args.store, make_record(inp, out, agent.rules_fingerprint(), raw))
+        stats = sched.stats()
 
-    out_dict = out.model_dump()
-    write_json(args.output, out_dict)
+    out_dicts = [o.model_dump() for o in outs]
+    write_json(args.output, out_dicts if args.all else out_dicts[0])
 
     console.print(f"[green]Saved:[/green] {Path(args.output).resolve()}")
-    _print_summary(out_dict)
+    if args.all:
+        console.print(f"generated={len(outs)}/{len(inputs)}")
+    else:
+        _print_summary(out_dicts[0])
+    _print_scheduler_stats(stats)
 
 if __name__ == "__main__":
         main()
\ No newline at end of file
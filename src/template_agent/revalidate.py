@@ -0,0 +1,219 @@
+from __future__ import annotations
+
+import argparse
+import copy
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from rich.console import Console
+
+from .agent import TemplateAgent, _CANDIDATES_ADAPTER
+from .scheduler import TemplateScheduler
+from .schemas import TemplateInput, TemplateOutput
+from .settings import get_settings
+from .utils.io import read_jsonl, write_json, write_jsonl
+
+console = Console()
+
+# 룰 필터링 후 이 개수 미만이면 재생성 대상 (_validate_and_filter 경고 기준과 동일)
+MIN_VALID_CANDIDATES = 3
+
+_AGENT: Optional[TemplateAgent] = None
+
+
+def make_record(
+    inp: TemplateInput, out: TemplateOutput, rules_fingerprint: str, raw: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    재검증 가능한 저장 단위: 입력 + 출력 + 생성 당시 룰 fingerprint (+ 필터 전 LLM raw JSON)
+    raw가 있어야 룰이 완화됐을 때 이전 룰로 걸러진 후보를 되살릴 수 있음.
+    """
+    rec = {
+        "input": inp.model_dump(),
+        "output": out.model_dump(),
+        "rules_fingerprint": rules_fingerprint,
+    }
+    if raw is not None:
+        rec["raw"] = raw
+    return rec
+
+
+def combination_key(inp: TemplateInput) -> str:
+    return f"{inp.campaign_goal}:{inp.channel}:{inp.step_id}:{inp.persona.persona_id}:{inp.tone.tone_id}:{inp.product.name}"
+
+
+def _offline_agent() -> TemplateAgent:
+    # 룰만 필요하므로 LLM client는 만들지 않음(lazy)
+    return TemplateAgent(model="", temperature=0.0, max_output_tokens=0, candidate_count=0)
+
+
+def _init_worker() -> None:
+    global _AGENT
+    _AGENT = _offline_agent()
+
+
+def _stored_output(inp: TemplateInput, allowed_slots: List[str], stored: Dict[str, Any]) -> TemplateOutput:
+    # 저장된 출력은 이미 필터링되어 후보가 3개 미만일 수 있으므로 min_length 검증 없이 구성
+    return TemplateOutput.model_construct(
+        campaign_goal=inp.campaign_goal,
+        channel=inp.channel,
+        step_id=inp.step_id,
+        persona_id=inp.persona.persona_id,
+        tone_id=inp.tone.tone_id,
+        allowed_slots=allowed_slots,
+        candidates=_CANDIDATES_ADAPTER.validate_python(stored.get("candidates") or []),
+        warnings=list(stored.get("warnings") or []),
+    )
+
+
+def _revalidate_one(agent: TemplateAgent, rec: Dict[str, Any], fingerprint: str) -> Tuple[Dict[str, Any], bool]:
+    inp = TemplateInput.model_validate(rec["input"])
+    allowed_slots = agent._get_allowed_slots(inp.campaign_goal, inp.channel)
+
+    raw = rec.get("raw")
+    if raw is not None:
+        # 필터 전 LLM 출력에서 현재 룰로 다시 구성 → 강화/완화 양방향 반영
+        try:
+            out = agent._build_output(copy.deepcopy(raw), inp, allowed_slots)
+        except ValidationError as e:
+            # 현재 계약(후보 수 등)으로는 raw 자체가 무효 → 후보 없음으로 두고 재생성 대상
+            out = _stored_output(inp, allowed_slots, {"warnings": [f"raw invalid under current rules: {e.error_count()} errors"]})
+    else:
+        # raw가 없는 이전 레코드: 저장된(이미 필터된) 후보만 재필터링 → 룰 강화만 반영되고,
+        # 완화돼도 예전에 걸러진 후보는 돌아오지 않음
+        out = _stored_output(inp, allowed_slots, rec.get("output") or {})
+        kept, warnings = agent._validate_and_filter(out, allowed_slots, inp)
+        out.candidates = kept
+        out.warnings = list(dict.fromkeys(out.warnings + warnings))
+
+    needs_regen = len(out.candidates) < MIN_VALID_CANDIDATES
+    new = {
+        "input": rec["input"],
+        "output": out.model_dump(),
+        "rules_fingerprint": fingerprint,
+        "needs_regeneration": needs_regen,
+    }
+    if raw is not None:
+        new["raw"] = raw
+    return new, needs_regen
+
+
+def _revalidate_chunk(args: Tuple[List[Dict[str, Any]], str]) -> List[Tuple[Dict[str, Any], bool]]:
+    records, fingerprint = args
+    return [_revalidate_one(_AGENT, r, fingerprint) for r in records]
+
+
+def revalidate_records(
+    records: List[Dict[str, Any]],
+    agent: Optional[TemplateAgent] = None,
+    workers: Optional[int] = None,
+    chunk_size: int = 2000,
+    force: bool = False,
+) -> Tuple[List[Dict[str, Any]], List[int], Dict[str, int]]:
+    """
+    저장된 (input, output) 레코드를 현재 룰로 재필터링.
+    - raw(필터 전 LLM 출력)가 있는 레코드는 raw에서 다시 구성 (완화된 룰로 후보가 되살아날 수 있음)
+    - raw가 없는 이전 레코드는 저장된 후보만 재필터링 (강화 방향만 반영)
+    - fingerprint가 현재 룰과 같은 레코드는 건너뜀(force=True면 전부)
+    - 반환: (갱신된 레코드, 재생성 필요 레코드 인덱스, 통계)
+    """
+    agent = agent or _offline_agent()
+    fingerprint = agent.rules_fingerprint()
+
+    todo = [i for i, r in enumerate(records) if force or r.get("rules_fingerprint") != fingerprint]
+    updated = list(records)
+    chunks = [todo[i:i + chunk_size] for i in range(0, len(todo), chunk_size)]
+
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(chunks) <= 1:
+        results = [[_revalidate_one(agent, records[i], fingerprint) for i in idx] for idx in chunks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as ex:
+            results = list(ex.map(_revalidate_chunk, [([records[i] for i in idx], fingerprint) for idx in chunks]))
+
+    regen: List[int] = []
+    for idx, res in zip(chunks, results):
+        for i, (rec, needs_regen) in zip(idx, res):
+            updated[i] = rec
+            if needs_regen:
+                regen.append(i)
+
+    # 이번에 건너뛴 레코드 중 이전 실행에서 재생성 대상으로 남은 것도 큐에 유지
+    todo_set = set(todo)
+    regen += [i for i, r in enumerate(records) if i not in todo_set and r.get("needs_regeneration")]
+    regen.sort()
+
+    stats = {
+        "records": len(records),
+        "without_raw": sum(1 for i in todo if records[i].get("raw") is None),
+        "revalidated": len(todo),
+        "skipped_same_fingerprint": len(records) - len(todo),
+        "needs_regeneration": len(regen),
+    }
+    return updated, regen, stats
+
+
+def regenerate(records: List[Dict[str, Any]], indices: List[int]) -> List[int]:
+    """
+    재생성 대상만 TemplateScheduler(bulk)로 LLM 호출해 레코드를 교체.
+    반환: 재생성 후에도 후보가 부족하거나 실패한 인덱스
+    """
+    s = get_settings()
+    agent = TemplateAgent(
+        model=s.model,
+        temperature=s.temperature,
+        max_output_tokens=s.max_output_tokens,
+        candidate_count=s.candidate_count,
+    )
+    fingerprint = agent.rules_fingerprint()
+
+    remaining: List[int] = []
+    with TemplateScheduler(agent, workers=s.llm_concurrency, run_fn=agent.generate) as sched:
+        futs = [(i, sched.submit(TemplateInput.model_validate(records[i]["input"]), priority="bulk")) for i in indices]
+        for i, fut in futs:
+            try:
+                out, raw = fut.result()
+            except Exception as e:
+                console.print(f"  [red]regen failed[/red] idx={i} err={e}")
+                remaining.append(i)
+                continue
+            rec = make_record(TemplateInput.model_validate(records[i]["input"]), out, fingerprint, raw)
+            rec["needs_regeneration"] = len(out.candidates) < MIN_VALID_CANDIDATES
+            records[i] = rec
+            if rec["needs_regeneration"]:
+                remaining.append(i)
+    return remaining
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--store", required=True, help="저장된 출력 레코드 JSONL (main --store로 누적)")
+    parser.add_argument("--out", default=None, help="갱신된 레코드 저장 경로 (기본: --store 덮어쓰기)")
+    parser.add_argument("--queue", default="regen_queue.json", help="재생성 대상 입력(TemplateInput 리스트) 저장 경로")
+    parser.add_argument("--workers", type=int, default=None, help="프로세스 수 (기본: CPU 코어 수)")
+    parser.add_argument("--force", action="store_true", help="fingerprint가 같아도 전부 재검증")
+    parser.add_argument("--regenerate", action="store_true", help="재생성 대상만 LLM으로 다시 생성(bulk 우선순위)")
+    args = parser.parse_args()
+
+    agent = _offline_agent()
+    records = read_jsonl(args.store)
+
+    updated, regen, stats = revalidate_records(records, agent=agent, workers=args.workers, force=args.force)
+
+    if args.regenerate and regen:
+        regen = regenerate(updated, regen)
+
+    if stats["revalidated"] or args.regenerate or args.out:
+        write_jsonl(args.out or args.store, updated)
+    write_json(args.queue, [updated[i]["input"] for i in regen])
+
+    console.print(f"rules_fingerprint={agent.rules_fingerprint()} {stats}")
+    for i in regen[:20]:
+        console.print(f"  [yellow]regen[/yellow] {combination_key(TemplateInput.model_validate(updated[i]['input']))}")
+    console.print(f"[green]Saved:[/green] queue={args.queue} ({len(regen)} inputs)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+from .schemas import TemplateInput, TemplateOutput
+
+# 우선순위 클래스 -> 가중치 (값이 클수록 높은 우선순위 / 더 큰 몫)
+DEFAULT_WEIGHTS: Dict[str, int] = {"realtime": 8, "bulk": 1}
+
+# 큐 대기시간 히스토그램 버킷 상한(초). 마지막 버킷은 +inf
+WAIT_BUCKETS: Tuple[float, ...] = (0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+class DeadlineExceeded(RuntimeError):
+    """deadline이 지나 LLM 호출 전에 버려진 요청"""
+
+
+class WaitHistogram:
+    """
+    누적 없는(bucket별) 대기시간 히스토그램.
+    snapshot()은 {"le_0.01": n, ..., "le_inf": n, "count", "sum", "max"} 형태.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = WAIT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, sec: float) -> None:
+        i = 0
+        while i < len(self.buckets) and sec > self.buckets[i]:
+            i += 1
+        self.counts[i] += 1
+        self.count += 1
+        self.total += sec
+        self.max = max(self.max, sec)
+
+    def snapshot(self) -> Dict[str, float]:
+        out: Dict[str, float] = {f"le_{b:g}": c for b, c in zip(self.buckets, self.counts)}
+        out["le_inf"] = self.counts[-1]
+        out["count"] = self.count
+        out["sum"] = round(self.total, 6)
+        out["max"] = round(self.max, 6)
+        return out
+
+
+@dataclass
+class _Job:
+    inp: TemplateInput
+    future: Future
+    enqueued_at: float
+    deadline_at: Optional[float]
+
+
+@dataclass
+class _ClassQueue:
+    name: str
+    weight: int
+    jobs: Deque[_Job] = field(default_factory=deque)
+    pass_value: float = 0.0  # stride scheduling용 가상 시간
+    hist: WaitHistogram = field(default_factory=WaitHistogram)
+    dispatched: int = 0
+    dropped: int = 0
+
+
+class TemplateScheduler:
+    """
+    TemplateAgent.run 앞단의 in-process 스케줄러.
+    - 우선순위 클래스(realtime/bulk 등) 별 큐 + 가중치 기반 공정 분배(stride scheduling)
+    - 상위 클래스 큐 깊이가 preempt_depth 이상이면 하위 클래스는 dispatch 보류(양보)
+    - deadline이 지난 요청은 LLM 호출 전에 DeadlineExceeded로 종료
+    - 클래스별 큐 대기시간 히스토그램 노출(stats())
+    """
+
+    def __init__(
+        self,
+        agent: Any,
+        workers: int = 4,
+        weights: Optional[Dict[str, int]] = None,
+        preempt_depth: int = 4,
+        run_fn: Optional[Callable[[TemplateInput], Any]] = None,
+    ):
+        weights = weights or DEFAULT_WEIGHTS
+        if any(int(w) <= 0 for w in weights.values()):
+            raise ValueError("weights는 양의 정수여야 합니다.")
+
+        self._run = run_fn or agent.run
+        self.preempt_depth = max(1, int(preempt_depth))
+        self._classes: Dict[str, _ClassQueue] = {
+            name: _ClassQueue(name=name, weight=int(w)) for name, w in weights.items()
+        }
+        # 가중치 내림차순 = 우선순위 순서
+        self._ranked: List[_ClassQueue] = sorted(self._classes.values(), key=lambda q: -q.weight)
+        self._vtime = 0.0
+
+        self._cv = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"template-scheduler-{i}", daemon=True)
+            for i in range(max(1, int(workers)))
+        ]
+        for t in self._threads:
+            t.start()
+
+    # ------------------------------------------------------------
+    # public API
+    # ------------------------------------------------------------
+    def submit(self, inp: TemplateInput, priority: str = "bulk", deadline_s: Optional[float] = None) -> Future:
+        """
+        요청을 큐에 넣고 Future를 반환.
+        deadline_s: 제출 시점 기준 상대 초. 지나면 호출 전에 버려짐.
+        """
+        q = self._classes.get(priority)
+        if q is None:
+            raise ValueError(f"unknown priority class: {priority} (known={list(self._classes)})")
+
+        now = time.monotonic()
+        fut: Future = Future()
+        job = _Job(
+            inp=inp,
+            future=fut,
+            enqueued_at=now,
+            deadline_at=(now + deadline_s) if deadline_s is not None else None,
+        )
+
+        with self._cv:
+            if self._closed:
+                raise RuntimeError("scheduler is shut down")
+            if not q.jobs:
+                # 유휴 상태였던 클래스가 밀린 몫을 한꺼번에 쓰지 않도록 가상시간 정렬
+                q.pass_value = max(q.pass_value, self._vtime)
+            q.jobs.append(job)
+            self._cv.notify()
+        return fut
+
+    def run(self, inp: TemplateInput, priority: str = "realtime", deadline_s: Optional[float] = None) -> TemplateOutput:
+        """submit + 결과 대기(동기 호출용)"""
+        return self.submit(inp, priority=priority, deadline_s=deadline_s).result()
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        with self._cv:
+            return {
+                q.name: {
+                    "weight": q.weight,
+                    "queue_depth": len(q.jobs),
+                    "dispatched": q.dispatched,
+                    "dropped_deadline": q.dropped,
+                    "queue_wait_hist": q.hist.snapshot(),
+                }
+                for q in self._ranked
+            }
+
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False) -> None:
+        with self._cv:
+            self._closed = True
+            if cancel_pending:
+                for q in self._ranked:
+                    while q.jobs:
+                        q.jobs.popleft().future.cancel()
+            self._cv.notify_all()
+        if wait:
+            for t in self._threads:
+                t.join()
+
+    def __enter__(self) -> "TemplateScheduler":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown(wait=True)
+
+    # ------------------------------------------------------------
+    # internals
+    # ------------------------------------------------------------
+    def _eligible(self) -> List[_ClassQueue]:
+        """
+        dispatch 가능한 클래스 목록.
+        상위 클래스의 큐 깊이가 preempt_depth 이상이면 그보다 하위 클래스는 양보.
+        """
+        out: List[_ClassQueue] = []
+        for q in self._ranked:
+            if q.jobs:
+                out.append(q)
+                if len(q.jobs) >= self.preempt_depth:
+                    break
+        return out
+
+    def _next_job(self) -> Optional[Tuple[_ClassQueue, _Job]]:
+        """lock 보유 상태에서 호출. deadline 지난 작업은 여기서 버림."""
+        while True:
+            cands = self._eligible()
+            if not cands:
+                return None
+
+            # stride scheduling: pass 값이 가장 작은 클래스 선택(동률이면 높은 우선순위)
+            q = min(cands, key=lambda c: c.pass_value)
+            job = q.jobs.popleft()
+
+            # 호출자가 이미 cancel한 Future는 set_exception 불가(InvalidStateError) → 먼저 RUNNING 전환
+            if not job.future.set_running_or_notify_cancel():
+                continue
+
+            now = time.monotonic()
+            if job.deadline_at is not None and now > job.deadline_at:
+                q.dropped += 1
+                job.future.set_exception(
+                    DeadlineExceeded(f"deadline passed before dispatch (class={q.name}, waited={now - job.enqueued_at:.3f}s)")
+                )
+                continue
+
+            self._vtime = max(self._vtime, q.pass_value)
+            q.pass_value += 1.0 / q.weight
+            q.dispatched += 1
+            q.hist.observe(now - job.enqueued_at)
+            return q, job
+
+    def _worker(self) -> None:
+        while True:
+            with self._cv:
+                picked = self._next_job()
+                while picked is None:
+                    if self._closed:
+                        return
+                    self._cv.wait()
+                    picked = self._next_job()
+
+            _, job = picked
+            try:
+                job.future.set_result(self._run(job.inp))
+            except Exception as e:  # noqa: BLE001 - 호출자 Future로 그대로 전달
+                job.future.set_exception(e)
@@ -11,8 +11,25 @@ class Settings:
     temperature: float = float(os.getenv("TEMPERATURE", "0.7"))
     max_output_tokens: int = int(os.getenv("MAX_OUTPUT_TOKENS", "1200"))
 
-def get_settings() -> Settings:
+    # 동시성/레이트리밋 (dry-run 추정 등에서 사용)
+    llm_concurrency: int = int(os.getenv("LLM_CONCURRENCY", "4"))
+    llm_rpm: int = int(os.getenv("LLM_RPM", "500"))
+    llm_tpm: int = int(os.getenv("LLM_TPM", "200000"))
+
+    # 비용(USD / 1M tokens) 및 지연 모델
+    price_input_per_1m: float = float(os.getenv("PRICE_INPUT_PER_1M", "0.15"))
+    price_output_per_1m: float = float(os.getenv("PRICE_OUTPUT_PER_1M", "0.60"))
+    llm_base_latency_s: float = float(os.getenv("LLM_BASE_LATENCY_S", "0.6"))
+    llm_output_tps: float = float(os.getenv("LLM_OUTPUT_TPS", "60"))
+
+    def __post_init__(self):
+        # 0이면 처리율이 0이 되어 추정(호출 수 / 처리율)과 스케줄러 worker 수가 성립하지 않음
+        for name in ("llm_concurrency", "llm_rpm", "llm_tpm", "llm_output_tps"):
+            if getattr(self, name) <= 0:
+                raise ValueError(f"{name.upper()}는 0보다 커야 합니다. (현재 {getattr(self, name)})")
+
+def get_settings(require_api_key: bool = True) -> Settings:
     s = Settings()
-    if not s.openai_api_key:
+    if require_api_key and not s.openai_api_key:
         raise RuntimeError("OPENAI_API_KEY가 설정되지 않았습니다. .env파일을 확인하세요")
     return s
\ No newline at end of file
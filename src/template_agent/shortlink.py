@@ -0,0 +1,456 @@
+"""
+short_link 슬롯용 단축 링크 발급/조회
+
+- 발급: 저장소의 일련번호(id)를 비밀 키 기반 Feistel 순열(62^L 범위 안의 전단사)로 섞은 뒤 base62 고정길이 코드로 변환
+  -> id가 유일하므로 코드 충돌 없음, 키 없이는 연속 발급된 코드끼리 관계가 보이지 않아 다른 코드를 추측/열거할 수 없음
+- 저장: links.bin에 고정길이 레코드(prod_sn, customer, campaign, step)를 append-only로 기록
+  -> 코드 -> id -> 오프셋 계산만으로 mmap에서 O(1) 조회
+- 같은 (prod_sn, customer, campaign, step)을 다시 발급하면 기존 코드를 그대로 반환 (재실행/재발송에도 링크 불변)
+- 렌더링: 출력 slot_map의 {{ short_link }}를 발급된 단축 URL로 치환
+- meta.json: 순열 키, campaign/step intern 테이블, 커밋된 레코드 수(쓰기 완료 후 원자적 교체)
+  -> 키가 들어 있으므로 외부에 공개하지 않음
+
+단일 writer 전제(캠페인 배치 발급). 조회(resolve)는 여러 프로세스에서 동시에 가능.
+
+python -m src.template_agent.shortlink mint --store ./shortlinks --campaign cart_recovery_1019 --step S1 --pairs pairs.csv --out links.csv
+python -m src.template_agent.shortlink render --store ./shortlinks --campaign cart_recovery_1019 --outputs output.json --prod-sn 51234 --customer 1001 --out rendered.json
+python -m src.template_agent.shortlink serve --store ./shortlinks --port 8080
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import re
+import secrets
+import struct
+import threading
+from functools import lru_cache
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .schemas import TemplateOutput
+from .utils.io import read_json, write_json
+
+ALPHABET = b"0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz"
+_ALPHABET_NP = np.frombuffer(ALPHABET, dtype=np.uint8)
+_DECODE = {c: i for i, c in enumerate(ALPHABET.decode("ascii"))}
+
+CODE_LEN = 7  # 62^7 ≈ 3.5조 개
+STORE_VERSION = 2
+# Feistel 라운드 수 (짝수: 끝나면 왼쪽/오른쪽 자릿수가 처음과 같아짐)
+FEISTEL_ROUNDS = 10
+
+RECORD_DTYPE = np.dtype([
+    ("prod_sn", "<u8"),
+    ("customer", "<u8"),
+    ("campaign", "<u4"),
+    ("step", "<u2"),
+    ("reserved", "<u2"),
+])
+_RECORD = struct.Struct("<QQIHH")
+
+DEFAULT_TARGET = (
+    "https://www.amoremall.com/kr/ko/product/detail?onlineProdSn={prod_sn}"
+    "&utm_source=crm&utm_campaign={campaign}&utm_content={step}&cid={customer}"
+)
+
+MINT_CHUNK = 5_000_000
+
+_SHORT_LINK_RE = re.compile(r"\{\{\s*short_link\s*\}\}")
+
+
+@lru_cache(maxsize=None)
+def _round_keys(key: str) -> Tuple[np.uint64, ...]:
+    raw = bytes.fromhex(key)
+    return tuple(
+        np.uint64(int.from_bytes(hashlib.blake2b(bytes([i]), key=raw, digest_size=8).digest(), "little"))
+        for i in range(FEISTEL_ROUNDS)
+    )
+
+
+def _round_fn(x: np.ndarray, k: np.uint64) -> np.ndarray:
+    """키 섞은 splitmix64 finalizer (uint64 곱셈은 배열 연산에서 wrap)"""
+    z = x ^ k
+    z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return z ^ (z >> np.uint64(31))
+
+
+def _feistel(x: np.ndarray, key: str, code_len: int, inverse: bool = False) -> np.ndarray:
+    """
+    [0, 62^code_len) 위의 키 기반 순열 (자릿수가 다른 두 반쪽을 번갈아 쓰는 FF1식 Feistel).
+    x = A * 62^v + B (A: u자리, B: v자리), 라운드 i: A, B = B, (A + F_i(B)) mod 62^m (m = u, v 번갈아)
+    """
+    u = code_len // 2
+    v = code_len - u
+    mods = (np.uint64(62 ** u), np.uint64(62 ** v))
+    keys = _round_keys(key)
+
+    a, b = x // mods[1], x % mods[1]
+    rounds = range(FEISTEL_ROUNDS - 1, -1, -1) if inverse else range(FEISTEL_ROUNDS)
+    for i in rounds:
+        m = mods[i % 2]
+        if inverse:
+            # (A', B') = (B, (A + F(B)) mod m) 의 역
+            a, b = (b + m - _round_fn(a, keys[i]) % m) % m, a
+        else:
+            a, b = b, (a + _round_fn(b, keys[i]) % m) % m
+    return a * mods[1] + b
+
+
+def encode_ids(ids: np.ndarray, key: str, code_len: int = CODE_LEN) -> np.ndarray:
+    """id 배열 -> 고정길이 base62 코드 배열(bytes, dtype=S{code_len})"""
+    x = _feistel(np.asarray(ids, dtype=np.uint64), key, code_len)
+
+    digits = np.empty((len(x), code_len), dtype=np.uint8)
+    for j in range(code_len - 1, -1, -1):
+        digits[:, j] = _ALPHABET_NP[x % np.uint64(62)]
+        x //= np.uint64(62)
+    return digits.view(f"S{code_len}").ravel()
+
+
+def decode_code(code: str, key: str, code_len: int = CODE_LEN) -> Optional[int]:
+    """코드 -> id (형식이 틀리면 None)"""
+    if len(code) != code_len:
+        return None
+    x = 0
+    for ch in code:
+        d = _DECODE.get(ch)
+        if d is None:
+            return None
+        x = x * 62 + d
+    return int(_feistel(np.array([x], dtype=np.uint64), key, code_len, inverse=True)[0])
+
+
+def render_short_link(slot_map: Dict[str, str], short_url: str) -> Dict[str, str]:
+    """slot_map의 {{ short_link }} 플레이스홀더를 실제 단축 URL로 치환"""
+    return {k: _SHORT_LINK_RE.sub(short_url, v) if isinstance(v, str) else v for k, v in slot_map.items()}
+
+
+def _first_of_runs(prod: np.ndarray, cust: np.ndarray, order: np.ndarray) -> np.ndarray:
+    """order로 정렬된 (prod, cust)에서 새 값이 시작되는 위치 마스크"""
+    p, c = prod[order], cust[order]
+    head = np.ones(len(order), dtype=bool)
+    head[1:] = (p[1:] != p[:-1]) | (c[1:] != c[:-1])
+    return head
+
+
+class ShortLinkStore:
+    """
+    디렉터리 하나 = 저장소 하나 (links.bin + meta.json)
+    """
+
+    def __init__(self, path: Union[str, Path], base_url: str = "http://localhost:8080/", target_template: str = DEFAULT_TARGET):
+        self.path = Path(path)
+        self.path.mkdir(parents=True, exist_ok=True)
+        self.bin_path = self.path / "links.bin"
+        self.meta_path = self.path / "meta.json"
+
+        if self.meta_path.exists():
+            self.meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+            if self.meta.get("version") != STORE_VERSION:
+                raise RuntimeError(
+                    f"지원하지 않는 단축 링크 저장소 버전입니다: {self.meta.get('version')} (필요: {STORE_VERSION})"
+                )
+        else:
+            self.meta = {
+                "version": STORE_VERSION,
+                "code_len": CODE_LEN,
+                "key": secrets.token_hex(16),
+                "base_url": base_url,
+                "target_template": target_template,
+                "campaigns": [],
+                "steps": [],
+                "count": 0,
+            }
+            self._write_meta()
+            self.bin_path.touch()
+
+        self._campaign_idx = {c: i for i, c in enumerate(self.meta["campaigns"])}
+        self._step_idx = {s: i for i, s in enumerate(self.meta["steps"])}
+        # (mmap, 커밋된 레코드 수, meta mtime) - 조회 스레드는 이 튜플을 한 번에 읽음
+        self._view: Tuple[Optional[mmap.mmap], int, int] = (None, 0, 0)
+        self._refresh_lock = threading.Lock()
+
+    # ------------------------------------------------------------
+    # mint
+    # ------------------------------------------------------------
+    def mint(
+        self,
+        prod_sn: Union[int, np.ndarray, List[int]],
+        customer: Union[int, np.ndarray, List[int]],
+        campaign: str,
+        step: str,
+    ) -> np.ndarray:
+        """
+        (prod_sn, customer) 쌍마다 코드를 반환(str 배열). prod_sn/customer 중 하나가 스칼라면 broadcast.
+        같은 campaign/step에서 이미 발급된 쌍은 기존 코드를 그대로 돌려주고, 처음 보는 쌍만 새로 기록.
+        """
+        prod = np.asarray(prod_sn, dtype=np.uint64)
+        cust = np.asarray(customer, dtype=np.uint64)
+        prod, cust = np.broadcast_arrays(prod.reshape(-1), cust.reshape(-1))
+        if len(prod) == 0:
+            return np.empty(0, dtype=str)
+
+        c_idx = self._intern(self._campaign_idx, self.meta["campaigns"], campaign)
+        s_idx = self._intern(self._step_idx, self.meta["steps"], step)
+
+        # 입력 안의 중복 쌍은 하나로 합침 (inverse로 원래 순서 복원)
+        order = np.lexsort((cust, prod))
+        head = _first_of_runs(prod, cust, order)
+        inverse = np.empty(len(order), dtype=np.int64)
+        inverse[order] = np.cumsum(head) - 1
+        uniq = order[head]
+
+        start = int(self.meta["count"])
+        ids = self._existing_ids(prod[uniq], cust[uniq], c_idx, s_idx, start)
+        new = np.flatnonzero(ids < 0)
+        n = len(new)
+        if start + n > 62 ** int(self.meta["code_len"]):
+            raise RuntimeError("short link code space exhausted")
+
+        if n:
+            ids[new] = np.arange(start, start + n, dtype=np.int64)
+            new_prod, new_cust = prod[uniq[new]], cust[uniq[new]]
+            with open(self.bin_path, "r+b") as f:
+                # 커밋되지 않은 꼬리(이전 실패 쓰기)는 덮어씀
+                f.seek(start * RECORD_DTYPE.itemsize)
+                for lo in range(0, n, MINT_CHUNK):
+                    hi = min(n, lo + MINT_CHUNK)
+                    rec = np.zeros(hi - lo, dtype=RECORD_DTYPE)
+                    rec["prod_sn"] = new_prod[lo:hi]
+                    rec["customer"] = new_cust[lo:hi]
+                    rec["campaign"] = c_idx
+                    rec["step"] = s_idx
+                    rec.tofile(f)
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+
+            # 레코드가 디스크에 반영된 뒤에만 count를 올림(커밋 지점)
+            self.meta["count"] = start + n
+            self._write_meta()
+
+        codes = []
+        for lo in range(0, len(inverse), MINT_CHUNK):
+            codes.append(self._encode(ids[inverse[lo:lo + MINT_CHUNK]].astype(np.uint64)))
+        return np.concatenate(codes).astype(str)
+
+    def render(
+        self,
+        outputs: List[TemplateOutput],
+        prod_sn: Union[int, List[int]],
+        customer: Union[int, List[int]],
+        campaign: str,
+    ) -> List[TemplateOutput]:
+        """
+        outputs[i] 후보들의 {{ short_link }}를 (prod_sn[i], customer[i], campaign, outputs[i].step_id) 단축 URL로 치환한 사본.
+        step별로 한 번에 발급하며, 이미 발급된 조합은 같은 URL이 들어감.
+        """
+        prod, cust = np.broadcast_arrays(
+            np.asarray(prod_sn, dtype=np.uint64).reshape(-1), np.asarray(customer, dtype=np.uint64).reshape(-1)
+        )
+        if len(prod) == 1:
+            prod, cust = np.broadcast_to(prod, len(outputs)), np.broadcast_to(cust, len(outputs))
+        if len(prod) != len(outputs):
+            raise ValueError(f"prod_sn/customer 길이({len(prod)})가 outputs 길이({len(outputs)})와 다릅니다")
+
+        urls: List[str] = [""] * len(outputs)
+        by_step: Dict[str, List[int]] = {}
+        for i, out in enumerate(outputs):
+            by_step.setdefault(out.step_id, []).append(i)
+        for step, idx in by_step.items():
+            for i, code in zip(idx, self.mint(prod[idx], cust[idx], campaign, step).tolist()):
+                urls[i] = self.short_url(code)
+
+        rendered = []
+        for out, url in zip(outputs, urls):
+            out = out.model_copy(deep=True)
+            for cand in out.candidates:
+                cand.slot_map = render_short_link(cand.slot_map, url)
+            rendered.append(out)
+        return rendered
+
+    def short_url(self, code: str) -> str:
+        return self.meta["base_url"].rstrip("/") + "/" + code
+
+    # ------------------------------------------------------------
+    # resolve
+    # ------------------------------------------------------------
+    def lookup(self, code: str) -> Optional[Tuple[int, int, str, str]]:
+        """코드 -> (prod_sn, customer, campaign, step). 없으면 None"""
+        i = decode_code(code, self.meta["key"], int(self.meta["code_len"]))
+        if i is None:
+            return None
+        mm, count, _ = self._view
+        if i >= count:
+            # 새로 발급된 레코드일 수 있음: meta가 바뀐 경우에만 다시 매핑(잘못된 코드 폭주에도 stat 1회)
+            mm, count, _ = self._refresh()
+            if i >= count:
+                return None
+
+        prod, cust, c_idx, s_idx, _ = _RECORD.unpack_from(mm, i * _RECORD.size)
+        meta = self.meta
+        return prod, cust, meta["campaigns"][c_idx], meta["steps"][s_idx]
+
+    def resolve(self, code: str) -> Optional[str]:
+        """코드 -> 리다이렉트 대상 URL"""
+        hit = self.lookup(code)
+        if hit is None:
+            return None
+        prod, cust, campaign, step = hit
+        return self.meta["target_template"].format(prod_sn=prod, customer=cust, campaign=campaign, step=step)
+
+    def close(self) -> None:
+        mm = self._view[0]
+        self._view = (None, 0, 0)
+        if mm is not None:
+            mm.close()
+
+    # ------------------------------------------------------------
+    # internals
+    # ------------------------------------------------------------
+    def _existing_ids(self, prod: np.ndarray, cust: np.ndarray, c_idx: int, s_idx: int, count: int) -> np.ndarray:
+        """
+        유일한 (prod, cust) 쌍마다 같은 campaign/step으로 이미 기록된 id (없으면 -1).
+        기존 레코드와 질의를 한 번에 정렬해 바로 앞 원소가 같은 쌍인 기존 레코드인지로 판정.
+        """
+        ids = np.full(len(prod), -1, dtype=np.int64)
+        if count == 0:
+            return ids
+        rec = np.memmap(self.bin_path, dtype=RECORD_DTYPE, mode="r", shape=(count,))
+        old = np.flatnonzero((rec["campaign"] == c_idx) & (rec["step"] == s_idx))
+        if len(old) == 0:
+            return ids
+
+        all_prod = np.concatenate([rec["prod_sn"][old], prod])
+        all_cust = np.concatenate([rec["customer"][old], cust])
+        is_query = np.concatenate([np.zeros(len(old), dtype=bool), np.ones(len(prod), dtype=bool)])
+        # 같은 쌍이면 기존 레코드(is_query=False)가 앞에 오도록
+        order = np.lexsort((is_query, all_cust, all_prod))
+        head = _first_of_runs(all_prod, all_cust, order)
+
+        pos = np.flatnonzero(is_query[order] & ~head)  # 앞에 같은 쌍이 있는 질의 = 기존 레코드 있음
+        q = order[pos] - len(old)
+        ids[q] = old[order[pos - 1]]
+        return ids
+
+    def _encode(self, ids: np.ndarray) -> np.ndarray:
+        return encode_ids(ids, self.meta["key"], int(self.meta["code_len"]))
+
+    def _intern(self, index: Dict[str, int], table: List[str], value: str) -> int:
+        i = index.get(value)
+        if i is None:
+            i = index[value] = len(table)
+            table.append(value)
+        return i
+
+    def _write_meta(self) -> None:
+        tmp = self.meta_path.with_suffix(".json.tmp")
+        tmp.write_text(json.dumps(self.meta, ensure_ascii=False), encoding="utf-8")
+        tmp.replace(self.meta_path)
+
+    def _refresh(self) -> Tuple[Optional[mmap.mmap], int, int]:
+        """다른 프로세스가 발급한 레코드를 보기 위해 meta/mmap 갱신"""
+        with self._refresh_lock:
+            mtime = os.stat(self.meta_path).st_mtime_ns
+            if self._view[0] is not None and mtime == self._view[2]:
+                return self._view
+
+            meta = json.loads(self.meta_path.read_text(encoding="utf-8"))
+            count = int(meta["count"])
+            mm = None
+            if count:
+                with open(self.bin_path, "rb") as f:
+                    mm = mmap.mmap(f.fileno(), count * _RECORD.size, access=mmap.ACCESS_READ)
+
+            self.meta = meta
+            self._campaign_idx = {c: i for i, c in enumerate(meta["campaigns"])}
+            self._step_idx = {s: i for i, s in enumerate(meta["steps"])}
+            # 이전 mmap은 진행 중인 조회가 있을 수 있어 닫지 않고 참조 해제(GC)
+            self._view = (mm, count, mtime)
+            return self._view
+
+
+# ============================================================
+# stand-in redirector
+# ============================================================
+def serve(store: ShortLinkStore, host: str = "127.0.0.1", port: int = 8080) -> None:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            target = store.resolve(self.path.lstrip("/").split("?", 1)[0])
+            if target is None:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(302)
+            self.send_header("Location", target)
+            self.end_headers()
+
+        def log_message(self, *args):
+            pass
+
+    ThreadingHTTPServer((host, port), Handler).serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    sub = parser.add_subparsers(dest="cmd", required=True)
+
+    p_mint = sub.add_parser("mint", help="(prod_sn, customer) CSV로부터 단축 링크 일괄 발급")
+    p_mint.add_argument("--store", required=True)
+    p_mint.add_argument("--campaign", required=True)
+    p_mint.add_argument("--step", required=True)
+    p_mint.add_argument("--pairs", required=True, help="헤더 포함 CSV: prod_sn,customer (정수)")
+    p_mint.add_argument("--out", required=True, help="prod_sn,customer,code,short_url CSV 저장 경로")
+    p_mint.add_argument("--base-url", default=os.getenv("SHORT_LINK_BASE", "http://localhost:8080/"))
+
+    p_render = sub.add_parser("render", help="출력 JSON의 {{ short_link }}를 단축 URL로 치환")
+    p_render.add_argument("--store", required=True)
+    p_render.add_argument("--campaign", required=True)
+    p_render.add_argument("--outputs", required=True, help="TemplateOutput JSON (단일 객체 또는 리스트)")
+    p_render.add_argument("--prod-sn", type=int, required=True)
+    p_render.add_argument("--customer", type=int, required=True)
+    p_render.add_argument("--out", required=True)
+    p_render.add_argument("--base-url", default=os.getenv("SHORT_LINK_BASE", "http://localhost:8080/"))
+
+    p_serve = sub.add_parser("serve", help="로컬 리다이렉터(302)")
+    p_serve.add_argument("--store", required=True)
+    p_serve.add_argument("--host", default="127.0.0.1")
+    p_serve.add_argument("--port", type=int, default=8080)
+
+    args = parser.parse_args()
+
+    if args.cmd == "mint":
+        store = ShortLinkStore(args.store, base_url=args.base_url)
+        pairs = np.loadtxt(args.pairs, delimiter=",", skiprows=1, dtype=np.uint64, ndmin=2)
+        codes = store.mint(pairs[:, 0], pairs[:, 1], args.campaign, args.step)
+        base = store.meta["base_url"].rstrip("/") + "/"
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write("prod_sn,customer,code,short_url\n")
+            for (prod, cust), code in zip(pairs.tolist(), codes.tolist()):
+                f.write(f"{prod},{cust},{code},{base}{code}\n")
+        print(f"minted={len(codes)} total={store.meta['count']} saved={args.out}")
+        return
+
+    if args.cmd == "render":
+        store = ShortLinkStore(args.store, base_url=args.base_url)
+        data = read_json(args.outputs)
+        single = isinstance(data, dict)
+        outputs = [TemplateOutput.model_validate(x) for x in ([data] if single else data)]
+        rendered = [o.model_dump() for o in store.render(outputs, args.prod_sn, args.customer, args.campaign)]
+        write_json(args.out, rendered[0] if single else rendered)
+        print(f"rendered={len(rendered)} total={store.meta['count']} saved={args.out}")
+        return
+
+    serve(ShortLinkStore(args.store), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
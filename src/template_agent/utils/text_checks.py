@@ -1,6 +1,16 @@
 from __future__ import annotations
+import re
 from typing import Iterable
 
+# is_emoji_char와 동일한 코드포인트 범위(유니코드 속성이 아닌 명시적 범위라 버전 영향 없음)
+_EMOJI_RANGES = (
+    (0x1F300, 0x1FAFF),
+    (0x2600, 0x26FF),
+    (0x2700, 0x27BF),
+    (0x1F1E6, 0x1F1FF),
+)
+_EMOJI_RE = re.compile("[" + "".join(f"{chr(lo)}-{chr(hi)}" for lo, hi in _EMOJI_RANGES) + "]")
+
 def is_emoji_char(ch: str) -> bool:
     """
     안정적인 '대략 이모지' 판별.
@@ -20,8 +30,8 @@ def is_emoji_char(ch: str) -> bool:
     )
 
 def count_emoji(s: str) -> int:
-    s = s or ""
-    return sum(1 for ch in s if is_emoji_char(ch))
+    # 문자 단위 파이썬 루프 대신 C 레벨 정규식 스캔
+    return len(_EMOJI_RE.findall(s or ""))
 
 def contains_banned_phrase(text: str, banned_list: Iterable[str]) -> str | None:
     t = (text or "").lower()
@@ -0,0 +1,7 @@
+import sys
+from pathlib import Path
+
+# `python -m src.template_agent...`와 같은 방식(저장소 루트에서 `src.` import)으로 테스트
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
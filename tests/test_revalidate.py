@@ -0,0 +1,102 @@
+import json
+from pathlib import Path
+
+import pytest
+
+from src.template_agent.revalidate import _offline_agent, make_record, revalidate_records
+from src.template_agent.schemas import TemplateInput
+
+FIXTURE = Path(__file__).parent / "fixtures" / "sample_inputs.json"
+BANNED = "완치"
+
+
+@pytest.fixture()
+def agent():
+    return _offline_agent()
+
+
+@pytest.fixture()
+def inp():
+    return TemplateInput.model_validate(json.loads(FIXTURE.read_text(encoding="utf-8"))[0])
+
+
+def _set_banned(agent, phrases):
+    agent.banned_phrases = list(phrases)
+    agent._banned_lower = [(b, b.lower()) for b in agent.banned_phrases]
+
+
+def _raw(agent, inp, texts):
+    slot = agent._get_allowed_slots(inp.campaign_goal, inp.channel)[0]
+    return {
+        "candidates": [
+            {
+                "candidate_id": f"C{i + 1}",
+                "variant_tag": "direct",
+                "slot_map": {slot: t},
+                "tags": {"benefit_claim": False, "urgency_level": 0, "length_hint": "short"},
+                "rationale": "",
+            }
+            for i, t in enumerate(texts)
+        ],
+        "warnings": [],
+    }
+
+
+def _generated(agent, inp, raw):
+    allowed_slots = agent._get_allowed_slots(inp.campaign_goal, inp.channel)
+    return agent._build_output(json.loads(json.dumps(raw)), inp, allowed_slots)
+
+
+def test_relaxed_rule_restores_candidate_from_raw(agent, inp):
+    raw = _raw(agent, inp, ["보습 가득", "산뜻한 마무리", f"{BANNED} 보장", "오늘만 만나보세요"])
+    _set_banned(agent, [BANNED])
+    out = _generated(agent, inp, raw)
+    assert len(out.candidates) == 3
+    rec = make_record(inp, out, agent.rules_fingerprint(), raw)
+
+    _set_banned(agent, [])
+    updated, regen, stats = revalidate_records([rec], agent=agent, workers=1)
+
+    assert stats["revalidated"] == 1 and stats["without_raw"] == 0
+    assert regen == []
+    assert [c["candidate_id"] for c in updated[0]["output"]["candidates"]] == ["C1", "C2", "C3", "C4"]
+    assert updated[0]["raw"] == raw
+    assert updated[0]["rules_fingerprint"] == agent.rules_fingerprint()
+
+
+def test_tightened_rule_marks_regeneration_from_raw(agent, inp):
+    raw = _raw(agent, inp, ["보습 가득", "산뜻한 마무리", "오늘만 만나보세요"])
+    _set_banned(agent, [])
+    rec = make_record(inp, _generated(agent, inp, raw), agent.rules_fingerprint(), raw)
+
+    _set_banned(agent, ["산뜻"])
+    updated, regen, _ = revalidate_records([rec], agent=agent, workers=1)
+
+    assert regen == [0]
+    assert updated[0]["needs_regeneration"] is True
+    assert len(updated[0]["output"]["candidates"]) == 2
+
+
+def test_record_without_raw_only_refilters_stored_candidates(agent, inp):
+    raw = _raw(agent, inp, ["보습 가득", "산뜻한 마무리", f"{BANNED} 보장", "오늘만 만나보세요"])
+    _set_banned(agent, [BANNED])
+    rec = make_record(inp, _generated(agent, inp, raw), agent.rules_fingerprint())
+    assert "raw" not in rec
+
+    _set_banned(agent, [])
+    updated, _, stats = revalidate_records([rec], agent=agent, workers=1)
+
+    # 이미 걸러진 후보는 저장돼 있지 않으므로 되살아나지 않음
+    assert stats["without_raw"] == 1
+    assert len(updated[0]["output"]["candidates"]) == 3
+    assert "raw" not in updated[0]
+
+
+def test_unchanged_fingerprint_is_skipped(agent, inp):
+    raw = _raw(agent, inp, ["보습 가득", "산뜻한 마무리", "오늘만 만나보세요"])
+    rec = make_record(inp, _generated(agent, inp, raw), agent.rules_fingerprint(), raw)
+
+    updated, regen, stats = revalidate_records([rec], agent=agent, workers=1)
+
+    assert stats["revalidated"] == 0
+    assert updated[0] is rec and regen == []
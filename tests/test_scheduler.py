@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from src.template_agent.scheduler import DeadlineExceeded, TemplateScheduler, WaitHistogram
+
+class _Gate:
+    """첫 작업("block")에서 worker를 붙잡아 두고 실행 순서를 기록하는 run_fn"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.started = threading.Event()
+        self.order = []
+
+    def __call__(self, x):
+        if x == "block":
+            self.started.set()
+            self.event.wait(5)
+        if isinstance(x, Exception):
+            raise x
+        self.order.append(x)
+        return x
+
+def _blocked_scheduler(**kw):
+    gate = _Gate()
+    sched = TemplateScheduler(None, workers=1, run_fn=gate, **kw)
+    sched.submit("block", priority="bulk")
+    assert gate.started.wait(5)
+    return sched, gate
+
+def test_stride_ordering_follows_weights():
+    sched, gate = _blocked_scheduler(weights={"realtime": 8, "bulk": 1}, preempt_depth=1000)
+    bulk = [sched.submit(f"b{i}", priority="bulk") for i in range(4)]
+    rt = [sched.submit(f"r{i}", priority="realtime") for i in range(40)]
+    gate.event.set()
+    for f in bulk + rt:
+        f.result(timeout=5)
+    sched.shutdown()
+
+    order = gate.order[1:]
+    bulk_pos = [i for i, x in enumerate(order) if x.startswith("b")]
+    # 두 큐 모두 밀려 있는 동안 bulk 1건마다 realtime 8건
+    assert [b - a for a, b in zip(bulk_pos, bulk_pos[1:])] == [9, 9, 9]
+    # 클래스 안에서는 FIFO
+    assert [x for x in order if x.startswith("r")] == [f"r{i}" for i in range(40)]
+    assert [x for x in order if x.startswith("b")] == [f"b{i}" for i in range(4)]
+
+def test_bulk_yields_when_realtime_queue_is_deep():
+    sched, gate = _blocked_scheduler(weights={"realtime": 8, "bulk": 1}, preempt_depth=2)
+    bulk = [sched.submit(f"b{i}", priority="bulk") for i in range(3)]
+    rt = [sched.submit(f"r{i}", priority="realtime") for i in range(5)]
+    gate.event.set()
+    for f in bulk + rt:
+        f.result(timeout=5)
+    sched.shutdown()
+
+    order = gate.order[1:]
+    # realtime 깊이가 2 미만으로 떨어지기 전까지 bulk는 dispatch되지 않음
+    assert order.index("b0") >= order.index("r3")
+
+def test_deadline_expiry_drops_before_run():
+    sched, gate = _blocked_scheduler()
+    late = sched.submit("late", priority="realtime", deadline_s=0.01)
+    ok = sched.submit("ok", priority="realtime", deadline_s=30)
+    time.sleep(0.05)
+    gate.event.set()
+
+    with pytest.raises(DeadlineExceeded):
+        late.result(timeout=5)
+    assert ok.result(timeout=5) == "ok"
+    assert "late" not in gate.order
+
+    st = sched.stats()
+    sched.shutdown()
+    assert st["realtime"]["dropped_deadline"] == 1
+    assert st["realtime"]["dispatched"] == 1
+
+def test_cancel_skips_job_and_keeps_worker_alive():
+    sched, gate = _blocked_scheduler()
+    cancelled = sched.submit("gone", priority="realtime")
+    expired_and_cancelled = sched.submit("gone2", priority="realtime", deadline_s=0.0)
+    after = sched.submit("after", priority="realtime")
+    assert cancelled.cancel()
+    assert expired_and_cancelled.cancel()
+    time.sleep(0.01)
+    gate.event.set()
+
+    assert after.result(timeout=5) == "after"
+    assert gate.order == ["block", "after"]
+    assert sched.stats()["realtime"]["dropped_deadline"] == 0
+    sched.shutdown()
+
+def test_run_errors_go_to_future():
+    sched = TemplateScheduler(None, workers=1, run_fn=lambda x: 1 / x)
+    with pytest.raises(ZeroDivisionError):
+        sched.run(0)
+    assert sched.run(2) == 0.5
+    sched.shutdown()
+
+def test_shutdown_cancel_pending():
+    sched, gate = _blocked_scheduler()
+    pending = sched.submit("p", priority="bulk")
+    sched.shutdown(wait=False, cancel_pending=True)
+    gate.event.set()
+    assert pending.cancelled()
+    with pytest.raises(RuntimeError):
+        sched.submit("x")
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        TemplateScheduler(None, weights={"realtime": 0}, run_fn=lambda x: x)
+    sched = TemplateScheduler(None, workers=1, run_fn=lambda x: x)
+    with pytest.raises(ValueError):
+        sched.submit("x", priority="nope")
+    sched.shutdown()
+
+def test_wait_histogram_buckets():
+    h = WaitHistogram(buckets=(0.1, 1.0))
+    for sec in (0.05, 0.1, 0.5, 2.0):
+        h.observe(sec)
+    snap = h.snapshot()
+    assert (snap["le_0.1"], snap["le_1"], snap["le_inf"]) == (2, 1, 1)
+    assert snap["count"] == 4 and snap["max"] == 2.0
@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+
+from src.template_agent.schemas import TemplateOutput
+from src.template_agent.shortlink import ShortLinkStore, decode_code, encode_ids, render_short_link
+
+def _output(step_id: str = "S1") -> TemplateOutput:
+    return TemplateOutput.model_validate({
+        "campaign_goal": "cart_recovery",
+        "channel": "SMS",
+        "step_id": step_id,
+        "persona_id": "value_seeker",
+        "tone_id": "Brand_Default_Friendly",
+        "allowed_slots": ["greeting", "cta", "short_link"],
+        "candidates": [
+            {
+                "candidate_id": f"c{i}",
+                "variant_tag": "direct",
+                "slot_map": {"greeting": "고객님", "cta": "지금 확인", "short_link": "{{ short_link }}"},
+                "tags": {"benefit_claim": False, "urgency_level": 0, "length_hint": "short"},
+                "rationale": "test",
+            }
+            for i in range(3)
+        ],
+    })
+
+def test_feistel_roundtrip():
+    key = "00" * 16
+    ids = np.array([0, 1, 2, 62 ** 7 - 1, 123456789], dtype=np.uint64)
+    codes = encode_ids(ids, key).astype(str)
+    assert len(set(codes.tolist())) == len(ids)
+    assert [decode_code(c, key) for c in codes] == ids.tolist()
+    assert decode_code("bad", key) is None
+    assert decode_code("!!!!!!!", key) is None
+
+def test_feistel_is_bijection_on_small_domain():
+    key = "ab" * 16
+    codes = encode_ids(np.arange(62 ** 3, dtype=np.uint64), key, code_len=3)
+    assert len(np.unique(codes)) == 62 ** 3
+
+def test_mint_lookup_roundtrip(tmp_path):
+    store = ShortLinkStore(tmp_path / "links")
+    prod = np.arange(1000, dtype=np.uint64) + 50000
+    cust = np.arange(1000, dtype=np.uint64) * 7
+    codes = store.mint(prod, cust, "camp_a", "S1")
+    assert len(set(codes.tolist())) == 1000
+
+    for i in (0, 1, 999):
+        assert store.lookup(codes[i]) == (int(prod[i]), int(cust[i]), "camp_a", "S1")
+    assert "onlineProdSn=50000" in store.resolve(codes[0])
+    store.close()
+
+    # 다른 프로세스(새 인스턴스)에서도 같은 결과
+    reopened = ShortLinkStore(tmp_path / "links")
+    assert reopened.lookup(codes[999]) == (int(prod[999]), int(cust[999]), "camp_a", "S1")
+
+def test_lookup_unknown_code(tmp_path):
+    store = ShortLinkStore(tmp_path / "links")
+    codes = store.mint([1, 2], 9, "camp_a", "S1")
+    unknown = encode_ids(np.array([5], dtype=np.uint64), store.meta["key"]).astype(str)[0]
+    assert store.lookup(unknown) is None
+    assert store.lookup(codes[0][:-1]) is None
+
+def test_mint_is_idempotent(tmp_path):
+    store = ShortLinkStore(tmp_path / "links")
+    first = store.mint([1, 2, 3], [10, 20, 30], "camp_a", "S1")
+    assert store.meta["count"] == 3
+
+    again = store.mint([3, 4, 1, 4], [30, 40, 10, 40], "camp_a", "S1")
+    assert again[0] == first[2] and again[2] == first[0]
+    assert again[1] == again[3]
+    assert store.meta["count"] == 4
+
+    # campaign/step이 다르면 별도 링크
+    other = store.mint([1], [10], "camp_a", "S2")
+    assert other[0] not in set(first.tolist())
+    assert store.meta["count"] == 5
+
+    reopened = ShortLinkStore(tmp_path / "links")
+    assert reopened.mint([2], [20], "camp_a", "S1")[0] == first[1]
+    assert reopened.meta["count"] == 5
+
+def test_render_outputs(tmp_path):
+    store = ShortLinkStore(tmp_path / "links", base_url="https://s.example/")
+    outputs = [_output("S1"), _output("S2"), _output("S1")]
+    rendered = store.render(outputs, [100, 100, 200], 7, "camp_a")
+
+    urls = [o.candidates[0].slot_map["short_link"] for o in rendered]
+    assert all(u.startswith("https://s.example/") for u in urls)
+    assert len(set(urls)) == 3
+    assert all(c.slot_map["short_link"] == urls[i] for i, o in enumerate(rendered) for c in o.candidates)
+    assert outputs[0].candidates[0].slot_map["short_link"] == "{{ short_link }}"  # 원본은 그대로
+
+    code = urls[1].rsplit("/", 1)[1]
+    assert store.lookup(code) == (100, 7, "camp_a", "S2")
+    assert store.render([_output("S1")], 100, 7, "camp_a")[0].candidates[0].slot_map["short_link"] == urls[0]
+
+    with pytest.raises(ValueError):
+        store.render(outputs, [1, 2], 7, "camp_a")
+
+def test_render_short_link_only_touches_placeholder():
+    out = render_short_link({"a": "{{short_link}} / {{ short_link }}", "b": "{{ product.name }}"}, "U")
+    assert out == {"a": "U / U", "b": "{{ product.name }}"}